@@ -10,7 +10,7 @@ from rest_framework.routers import SimpleRouter
 
 # Imports from apps
 from sam_store.users.api.views import UserViewSet
-from shop.api.views import CategoryViewSet, ProductViewSet
+from shop.api.views import CategoryViewSet, ProductLineViewSet, ProductViewSet
 
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
@@ -18,6 +18,7 @@ router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 router.register(r"users", UserViewSet,basename="users")
 router.register(r"categories", CategoryViewSet, "categories")
 router.register(r"product", ProductViewSet, "products")
+router.register(r"product-lines", ProductLineViewSet, "product-lines")
 
 
 app_name = "api"
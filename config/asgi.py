@@ -0,0 +1,29 @@
+# ruff: noqa
+"""
+ASGI config for Sam Store project.
+
+It exposes the ASGI callable as a module-level variable named ``application``,
+for async servers such as uvicorn:
+
+    gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+
+The async catalog read endpoints (``shop.api.async_views``) only free the
+worker while they wait on Postgres or Redis when served through this entry
+point; under WSGI every request still holds a worker.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/dev/howto/deployment/asgi/
+
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "sam_store"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+application = get_asgi_application()
@@ -53,6 +53,16 @@ DATABASES = {
     ),
 }
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Read replicas, as database URLs, serving the shop read endpoints
+# (shop.routers). Replicas never run ATOMIC_REQUESTS transactions.
+for _index, _url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+    DATABASES[f"replica_{_index}"] = {
+        **env.db_url_config(_url),
+        "ATOMIC_REQUESTS": False,
+        "TEST": {"MIRROR": "default"},
+    }
+SHOP_READ_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica_")]
+DATABASE_ROUTERS = ["shop.routers.ReplicaRouter"]
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -74,6 +84,7 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
     # "django.contrib.humanize", # Handy template tags
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
 ]
 THIRD_PARTY_APPS = [
@@ -151,6 +162,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "shop.instrumentation.QueryInstrumentationMiddleware",
+    "shop.routers.PrimaryStickinessMiddleware",
 ]
 
 # STATIC
@@ -350,3 +363,79 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Shop
+# ------------------------------------------------------------------------------
+# Per-request query count, DB time and duplicate statements. Off by default,
+# the middleware removes itself at startup when disabled.
+SHOP_QUERY_INSTRUMENTATION = env.bool("SHOP_QUERY_INSTRUMENTATION", default=False)
+# Where to report the statistics: "headers" (X-DB-*) and/or "log" (shop.queries).
+SHOP_QUERY_INSTRUMENTATION_EXPORT = env.list(
+    "SHOP_QUERY_INSTRUMENTATION_EXPORT",
+    default=["headers"],
+)
+# Response cache for the catalog read endpoints (shop.cache).
+SHOP_RESPONSE_CACHE = env.bool("SHOP_RESPONSE_CACHE", default=True)
+# Seconds before an entry is refreshed, and how long it may be served stale
+# while a single worker rebuilds it.
+SHOP_CACHE_TIMEOUT = env.int("SHOP_CACHE_TIMEOUT", default=300)
+SHOP_CACHE_GRACE = env.int("SHOP_CACHE_GRACE", default=60)
+# Rebuild lock lifetime and how long a cold miss waits for the lock holder.
+SHOP_CACHE_LOCK_TIMEOUT = 10
+SHOP_CACHE_LOCK_WAIT = 2
+# The category tree only changes on category writes, which invalidate it.
+SHOP_CATEGORY_TREE_TIMEOUT = env.int("SHOP_CATEGORY_TREE_TIMEOUT", default=86400)
+# What to do when a shop view action exceeds its query budget
+# (QueryBudgetMixin.query_budgets): "off", "log" or "raise".
+SHOP_QUERY_BUDGET_MODE = env("SHOP_QUERY_BUDGET_MODE", default="off")
+# How product detail is built: "documents" (precomputed ProductDocument rows)
+# or "json_agg" (one Postgres statement, see shop.api.json_detail).
+SHOP_PRODUCT_DETAIL_MODE = env("SHOP_PRODUCT_DETAIL_MODE", default="documents")
+# Seconds a stock reservation holds its units (shop.stock.reserve).
+SHOP_STOCK_RESERVATION_TTL = env.int("SHOP_STOCK_RESERVATION_TTL", default=900)
+# Product line ids decremented from Redis leases, and the Redis holding them.
+SHOP_STOCK_HOT_LINES = [int(pk) for pk in env.list("SHOP_STOCK_HOT_LINES", default=[])]
+SHOP_STOCK_REDIS_URL = env("SHOP_STOCK_REDIS_URL", default="")
+# Units leased from Postgres into Redis at a time for a hot line.
+SHOP_STOCK_LEASE_SIZE = env.int("SHOP_STOCK_LEASE_SIZE", default=50)
+# Batch SKU resolution (POST /api/product-lines/resolve/): SKUs per call and
+# seconds a resolved SKU is cached.
+SHOP_SKU_RESOLVE_MAX = env.int("SHOP_SKU_RESOLVE_MAX", default=500)
+SHOP_SKU_CACHE_TIMEOUT = env.int("SHOP_SKU_CACHE_TIMEOUT", default=30)
+# Celery limits of import_catalog_task, in seconds: imports run far longer
+# than CELERY_TASK_SOFT_TIME_LIMIT. Committed batches survive a kill.
+SHOP_IMPORT_SOFT_TIME_LIMIT = env.int("SHOP_IMPORT_SOFT_TIME_LIMIT", default=3 * 3600)
+SHOP_IMPORT_TIME_LIMIT = env.int("SHOP_IMPORT_TIME_LIMIT", default=3 * 3600 + 300)
+# Text search configuration of Product.search_vector (shop.search). Run
+# rebuild_search_vectors after changing it.
+SHOP_SEARCH_CONFIG = env("SHOP_SEARCH_CONFIG", default="english")
+# Replicas lagging more than this many seconds, or unreachable, are skipped
+# for SHOP_REPLICA_CHECK_INTERVAL seconds.
+SHOP_REPLICA_MAX_LAG = env.float("SHOP_REPLICA_MAX_LAG", default=2.0)
+SHOP_REPLICA_CHECK_INTERVAL = env.int("SHOP_REPLICA_CHECK_INTERVAL", default=5)
+# Seconds a client reads from the primary after one of its writes.
+SHOP_REPLICA_STICKY_SECONDS = env.int("SHOP_REPLICA_STICKY_SECONDS", default=10)
+# Responsive product image derivatives (shop.images): widths in pixels,
+# formats (AVIF needs pillow-avif-plugin), encoder quality and rendering
+# threads per image.
+SHOP_IMAGE_WIDTHS = env.list("SHOP_IMAGE_WIDTHS", cast=int, default=[320, 640, 1024])
+SHOP_IMAGE_FORMATS = env.list("SHOP_IMAGE_FORMATS", default=["webp", "avif"])
+SHOP_IMAGE_QUALITY = env.int("SHOP_IMAGE_QUALITY", default=80)
+SHOP_IMAGE_THREADS = env.int("SHOP_IMAGE_THREADS", default=4)
+# Cache warm-up (shop.warmup): access statistics are recorded in this Redis,
+# disabled when empty, and the hot set is the SHOP_WARMUP_PAGES most
+# requested pages of the last SHOP_ACCESS_STATS_DAYS days. Keep
+# pages / rate well under CELERY_TASK_SOFT_TIME_LIMIT.
+SHOP_ACCESS_STATS_REDIS_URL = env("SHOP_ACCESS_STATS_REDIS_URL", default="")
+SHOP_ACCESS_STATS_DAYS = env.int("SHOP_ACCESS_STATS_DAYS", default=3)
+# Seconds before a Redis call of the access statistics gives up.
+SHOP_ACCESS_STATS_TIMEOUT = env.float("SHOP_ACCESS_STATS_TIMEOUT", default=0.1)
+# Requests are counted in memory and written to Redis in the background every
+# SHOP_ACCESS_STATS_FLUSH_INTERVAL seconds, or once this many URLs are pending.
+SHOP_ACCESS_STATS_FLUSH_INTERVAL = env.float(
+    "SHOP_ACCESS_STATS_FLUSH_INTERVAL", default=5.0,
+)
+SHOP_ACCESS_STATS_BUFFER_SIZE = env.int("SHOP_ACCESS_STATS_BUFFER_SIZE", default=1000)
+SHOP_WARMUP_PAGES = env.int("SHOP_WARMUP_PAGES", default=500)
+SHOP_WARMUP_BATCH_SIZE = env.int("SHOP_WARMUP_BATCH_SIZE", default=50)
+SHOP_WARMUP_WORKERS = env.int("SHOP_WARMUP_WORKERS", default=4)
+SHOP_WARMUP_RATE = env.float("SHOP_WARMUP_RATE", default=50.0)
@@ -170,3 +170,5 @@ SPECTACULAR_SETTINGS["SERVERS"] = [
 ]
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Log shop view actions exceeding their query budget on the shop.queries logger.
+SHOP_QUERY_BUDGET_MODE = env("SHOP_QUERY_BUDGET_MODE", default="log")
@@ -36,3 +36,7 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 MEDIA_URL = "http://media.testserver"
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Tests opt into the response cache explicitly.
+SHOP_RESPONSE_CACHE = False
+# Fail the tests of any shop view action going over its query budget.
+SHOP_QUERY_BUDGET_MODE = "raise"
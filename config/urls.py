@@ -32,6 +32,8 @@ urlpatterns = [
 urlpatterns += [
     # API base url
     path("api/", include("config.api_router")),
+    # Async catalog reads, see config/asgi.py
+    path("api/async/", include("shop.api.async_urls")),
     # DRF auth token
     # path("auth-token/", obtain_auth_token),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
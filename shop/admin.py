@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
@@ -13,6 +15,7 @@ from .models import (
     ProductType,
 
 )
+from .validation import find_duplicate_attributes
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -23,13 +26,49 @@ class ProductImageInline(admin.TabularInline):
     model = ProductImage
 
 
+class LineAttributeValueFormSet(BaseInlineFormSet):
+    """
+    Reject two rows of the formset giving the line values of one attribute.
+
+    Each row's ``clean`` only sees the rows already saved, so two new rows
+    for the same attribute would otherwise reach the unique constraint and
+    fail with an IntegrityError. The whole formset is checked at once with
+    ``find_duplicate_attributes``, its saved rows being replaced, and the
+    per-row query of the model ``clean`` is skipped.
+    """
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        form.instance.attribute_check_deferred = True
+        return form
+
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+        pairs = []
+        replaced = []
+        for form in self.forms:
+            if form.instance.pk is not None:
+                replaced.append(form.instance.pk)
+            data = form.cleaned_data
+            if not data or data.get("DELETE") or data.get("attribute_value") is None:
+                continue
+            pairs.append((self.instance.pk, data["attribute_value"].pk))
+        if find_duplicate_attributes(pairs, exclude=replaced):
+            msg = "Duplicate attribute exists"
+            raise ValidationError(msg)
+
+
 class AttributeValueInline(admin.TabularInline):
     model = AttributeValue.product_line_attribute_value.through
+    formset = LineAttributeValueFormSet
 
 
 @admin.register(ProductLine)
 class ProductLineAdmin(admin.ModelAdmin):
     inlines = [ProductImageInline, AttributeValueInline]
+    ordering = ["product", "order"]
 
 
 class EditLinkInline(object):
@@ -48,6 +87,7 @@ class EditLinkInline(object):
 class ProductLineInline(EditLinkInline,admin.TabularInline):
     model = ProductLine
     readonly_fields = ["edit"]
+    ordering = ["order"]
 
 
 class AttributeValueProductInline(admin.TabularInline):
@@ -0,0 +1,17 @@
+# Core Django imports
+from django.urls import path
+
+# Imports from apps
+from shop.api import async_views
+
+app_name = "async_api"
+urlpatterns = [
+    path("categories/", async_views.category_list, name="category-list"),
+    path("categories/tree/", async_views.category_tree, name="category-tree"),
+    path("product/<slug:slug>/", async_views.product_detail, name="product-detail"),
+    path(
+        "product/category/<slug:slug>/",
+        async_views.category_products,
+        name="product-category",
+    ),
+]
@@ -0,0 +1,237 @@
+"""
+Async versions of the catalog read endpoints.
+
+Plain Django async views over the async ORM and async cache API, returning
+the same payloads and validators as their DRF counterparts. Served through
+``config/asgi.py`` a request waiting on Postgres or Redis no longer holds a
+worker, so one process serves many concurrent reads. Mounted under
+``/api/async/`` by ``shop.api.async_urls``.
+
+Async views cannot run inside ``ATOMIC_REQUESTS`` transactions, hence
+``non_atomic_requests``; they only read, from a healthy replica like the
+DRF viewsets (``shop.routers.aread_from_replica``) unless the client wrote
+recently.
+"""
+
+# Stdlib imports
+import functools
+
+# Core Django imports
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.http import HttpResponse
+from django.http import HttpResponseNotAllowed
+from django.http import HttpResponseNotModified
+from django.http import JsonResponse
+from django.utils.http import parse_etags
+
+# Third-party app imports
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+# Imports from apps
+from shop.api.json_detail import product_detail_json
+from shop.api.pagination import CategoryPagination
+from shop.api.views import category_page
+from shop.api.views import price_param
+from shop.cache import CATEGORIES_TAG
+from shop.cache import acached
+from shop.cache import category_tag
+from shop.cache import product_tag
+from shop.category_tree import aget_category_tree
+from shop.conditional import aconditional_get
+from shop.documents import get_product_documents
+from shop.facets import parse_filters
+from shop.models import Category
+from shop.models import Product
+from shop.models import ProductDocument
+from shop.routers import STICKY_COOKIE
+from shop.routers import aread_from_replica
+
+# Same bytes as DRF's JSONRenderer.
+JSON_PARAMS = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def read_only(view):
+    """
+    Answer ``GET``/``HEAD`` only, opt out of ``ATOMIC_REQUESTS`` and read
+    from a replica, see ``shop.routers.ReplicaReadMixin``.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+        if STICKY_COOKIE in request.COOKIES:
+            return await view(request, *args, **kwargs)
+        async with aread_from_replica():
+            return await view(request, *args, **kwargs)
+
+    return transaction.non_atomic_requests(wrapper)
+
+
+async def _product_documents(slug):
+    documents = [
+        data
+        async for data in ProductDocument.objects.filter(
+            slug=slug,
+            active=True,
+        ).values_list("data", flat=True)
+    ]
+    if documents:
+        return documents
+    # Builds and stores the missing documents, rare enough to stay sync.
+    return await sync_to_async(get_product_documents)(slug)
+
+
+@read_only
+async def product_detail(request, slug):
+    """
+    Async ``ProductViewSet.retrieve``.
+    """
+
+    async def respond():
+        if getattr(settings, "SHOP_PRODUCT_DETAIL_MODE", "documents") == "json_agg":
+            body = await acached(
+                "product_json",
+                (slug,),
+                [product_tag(slug)],
+                sync_to_async(functools.partial(product_detail_json, slug)),
+            )
+            return HttpResponse(body, content_type="application/json")
+        data = await acached(
+            "product",
+            (slug,),
+            [product_tag(slug)],
+            lambda: _product_documents(slug),
+        )
+        return JsonResponse(data, safe=False, json_dumps_params=JSON_PARAMS)
+
+    async def last_modified():
+        aggregate = await ProductDocument.objects.filter(
+            slug=slug,
+            active=True,
+        ).aaggregate(modified=Max("updated"))
+        return aggregate["modified"]
+
+    return await aconditional_get(
+        request,
+        "product",
+        (slug,),
+        [product_tag(slug)],
+        last_modified,
+        respond,
+    )
+
+
+@read_only
+async def category_products(request, slug):
+    """
+    Async ``ProductViewSet.list_product_by_category_slug``.
+
+    The page and its facets are built by the same ``category_page`` in a
+    thread, the validators and the cache lookups are async.
+    """
+    drf_request = Request(request)
+    descendants = request.GET.get("descendants") in ("1", "true")
+    filters = parse_filters(request.GET.getlist("attr"))
+    try:
+        min_price = price_param(drf_request, "min_price")
+        max_price = price_param(drf_request, "max_price")
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, status=400)
+    parts = (slug, request.build_absolute_uri())
+    tags = [category_tag(slug)]
+    products = Product.objects.all().isactive()
+
+    def build():
+        return category_page(
+            drf_request,
+            products,
+            CategoryPagination(),
+            slug,
+            descendants=descendants,
+            filters=filters,
+            min_price=min_price,
+            max_price=max_price,
+        )
+
+    async def respond():
+        try:
+            data = await acached(
+                "category_products",
+                parts,
+                tags,
+                sync_to_async(build),
+            )
+        except NotFound as exc:
+            return JsonResponse({"detail": exc.detail}, status=404)
+        return JsonResponse(data, json_dumps_params=JSON_PARAMS)
+
+    async def last_modified():
+        aggregate = await products.in_category(
+            slug,
+            descendants=descendants,
+        ).aaggregate(modified=Max("document__updated"))
+        return aggregate["modified"]
+
+    return await aconditional_get(
+        request,
+        "category_products",
+        parts,
+        tags,
+        last_modified,
+        respond,
+    )
+
+
+async def _categories():
+    return [
+        {"name": name, "slug": slug, "parent": parent}
+        async for name, slug, parent in Category.objects.order_by("name").values_list(
+            "name",
+            "slug",
+            "parent_id",
+        )
+    ]
+
+
+@read_only
+async def category_list(request):
+    """
+    Async ``CategoryViewSet.list``.
+    """
+
+    async def respond():
+        data = await acached("categories", (), [CATEGORIES_TAG], _categories)
+        return JsonResponse(data, safe=False, json_dumps_params=JSON_PARAMS)
+
+    async def last_modified():
+        aggregate = await Category.objects.aaggregate(modified=Max("updated"))
+        return aggregate["modified"]
+
+    return await aconditional_get(
+        request,
+        "categories",
+        (),
+        [CATEGORIES_TAG],
+        last_modified,
+        respond,
+    )
+
+
+@read_only
+async def category_tree(request):
+    """
+    Async ``CategoryViewSet.tree``.
+    """
+    tree = await aget_category_tree()
+    if tree["etag"] in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(tree["body"], content_type="application/json")
+    response["ETag"] = tree["etag"]
+    return response
@@ -0,0 +1,256 @@
+"""
+Read-only serialization straight from ``values_list`` tuples.
+
+The functions below produce exactly the JSON of ``ProductSerializer`` and
+``ProductCategorySerializer`` (without a request in the serializer context)
+but skip model instantiation, field introspection and the nested
+``to_representation`` chain. Every relation is fetched with one ``__in``
+query and stitched together in dicts. The DRF serializers remain the source
+of truth for the API schema; keep both in sync when the shape changes.
+"""
+
+# Stdlib imports
+from collections import defaultdict
+from decimal import Decimal
+
+# Core Django imports
+from django.core.files.storage import default_storage
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.utils import timezone as dj_timezone
+
+# Imports from apps
+from shop.images import srcset
+from shop.models import Product
+from shop.models import ProductImage
+from shop.models import ProductLine
+from shop.models import ProductLineAttributeValue
+from shop.models import ProductTypeAttribute
+
+CENT = Decimal("0.01")
+
+
+def _price(value):
+    """
+    Same output as ``DecimalField(decimal_places=2).to_representation``.
+    """
+    return f"{value.quantize(CENT):f}"
+
+
+def _datetime(value):
+    """
+    Same output as ``DateTimeField.to_representation`` with ``USE_TZ``.
+    """
+    text = dj_timezone.localtime(value).isoformat()
+    if text.endswith("+00:00"):
+        text = text[:-6] + "Z"
+    return text
+
+
+def _image_url(name):
+    """
+    Same output as ``ImageField.to_representation`` without a request.
+    """
+    return default_storage.url(name) if name else None
+
+
+def _images_by_line(line_ids, **filters):
+    images = defaultdict(list)
+    rows = (
+        ProductImage.objects.filter(product_line_id__in=line_ids, **filters)
+        .order_by("order")
+        .values_list(
+            "product_line_id",
+            "created",
+            "updated",
+            "image_url",
+            "alt_text",
+            "order",
+            "variants",
+        )
+    )
+    for line_id, created, updated, image_url, alt_text, order, variants in rows:
+        images[line_id].append(
+            {
+                "created": _datetime(created),
+                "updated": _datetime(updated),
+                "image_url": _image_url(image_url),
+                "alt_text": alt_text,
+                "order": order,
+                "srcset": srcset(variants),
+            },
+        )
+    return images
+
+
+def serialize_products(product_ids):
+    """
+    Serialize products in the ``ProductSerializer`` shape.
+
+    Runs five queries whatever the number of products, lines, images and
+    attributes: products, lines, images, line attribute values and product
+    type attributes.
+
+    Args:
+        product_ids (Iterable[int]): Ids of the products.
+
+    Returns:
+        dict: Product id to its serialized payload.
+    """
+    product_ids = list(product_ids)
+    products = Product.objects.filter(id__in=product_ids).values_list(
+        "id",
+        "name",
+        "slug",
+        "description",
+        "category__name",
+        "product_type_id",
+    )
+    lines = (
+        ProductLine.objects.filter(product_id__in=product_ids)
+        .order_by("order")
+        .values_list("id", "product_id", "price", "sku", "stock_qty", "order")
+    )
+    lines_by_product = defaultdict(list)
+    for line in lines:
+        lines_by_product[line[1]].append(line)
+    line_ids = [line[0] for group in lines_by_product.values() for line in group]
+
+    images = _images_by_line(line_ids)
+    specifications = defaultdict(dict)
+    rows = ProductLineAttributeValue.objects.filter(
+        product_line_id__in=line_ids,
+    ).values_list(
+        "product_line_id",
+        "attribute_value__product_attribute_id",
+        "attribute_value__value",
+    )
+    for line_id, attribute_id, value in rows:
+        specifications[line_id][attribute_id] = value
+
+    products = list(products)
+    type_specifications = defaultdict(dict)
+    rows = ProductTypeAttribute.objects.filter(
+        product_type_id__in={product[5] for product in products} - {None},
+    ).values_list("product_type_id", "attribute_id", "attribute__name")
+    for type_id, attribute_id, name in rows:
+        type_specifications[type_id][attribute_id] = name
+
+    return {
+        product_id: {
+            "name": name,
+            "slug": slug,
+            "description": description,
+            "category_name": category_name,
+            "product_line": [
+                {
+                    "price": _price(price),
+                    "sku": sku,
+                    "stock_qty": stock_qty,
+                    "order": order,
+                    "images": images[line_id],
+                    "specification": specifications[line_id],
+                }
+                for line_id, _, price, sku, stock_qty, order in lines_by_product[
+                    product_id
+                ]
+            ],
+            "type specification": type_specifications[type_id],
+        }
+        for product_id, name, slug, description, category_name, type_id in products
+    }
+
+
+# Product columns and precomputed card of a listing row, see ``ProductCard``.
+CARD_FIELDS = (
+    "id",
+    "name",
+    "slug",
+    "uuid",
+    "created",
+    "card__price",
+    "card__in_stock",
+    "card__image",
+)
+
+
+def build_product_cards(product_ids):
+    """
+    Compute the listing cards of products, as stored in ``ProductCard``.
+
+    Runs two queries: the first line (lowest ``order``) of every product
+    with ``DISTINCT ON``, annotated with whether any active line has stock,
+    and the images with ``order=1`` of those lines.
+
+    Args:
+        product_ids (Iterable[int]): Ids of the products.
+
+    Returns:
+        dict: Product id to its ``price``, ``in_stock`` and ``image``.
+    """
+    product_ids = list(product_ids)
+    in_stock = ProductLine.objects.filter(
+        product_id=OuterRef("product_id"),
+        active=True,
+        stock_qty__gt=0,
+    ).order_by()
+    rows = (
+        ProductLine.objects.filter(product_id__in=product_ids)
+        .annotate(in_stock=Exists(in_stock))
+        .order_by("product_id", "order")
+        .distinct("product_id")
+        .values_list("id", "product_id", "price", "in_stock")
+    )
+    first_lines = {row[1]: row for row in rows}
+    images = _images_by_line([row[0] for row in first_lines.values()], order=1)
+    cards = {}
+    for product_id in product_ids:
+        line = first_lines.get(product_id)
+        if line is None:
+            cards[product_id] = {"price": None, "in_stock": False, "image": []}
+        else:
+            line_id, _, price, line_in_stock = line
+            cards[product_id] = {
+                "price": price,
+                "in_stock": line_in_stock,
+                "image": images[line_id],
+            }
+    return cards
+
+
+def serialize_product_cards(products):
+    """
+    Serialize listing rows in the ``ProductCategorySerializer`` shape.
+
+    The rows carry the product's ``ProductCard``, so no further query is
+    needed. Products without a card yet are computed with
+    ``build_product_cards``.
+
+    Args:
+        products (list[dict]): Rows of ``Product.objects.values(*CARD_FIELDS)``.
+
+    Returns:
+        list: The serialized products, in the order of ``products``.
+    """
+    built = build_product_cards(
+        [product["id"] for product in products if product["card__in_stock"] is None],
+    )
+    data = []
+    for product in products:
+        card = {
+            "name": product["name"],
+            "slug": product["slug"],
+            "uuid": str(product["uuid"]),
+            "created": _datetime(product["created"]),
+        }
+        stored = built.get(product["id"]) or {
+            "price": product["card__price"],
+            "in_stock": product["card__in_stock"],
+            "image": product["card__image"],
+        }
+        card["in_stock"] = stored["in_stock"]
+        if stored["price"] is not None:
+            card["price"] = _price(stored["price"])
+            card["image"] = stored["image"]
+        data.append(card)
+    return data
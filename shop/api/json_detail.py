@@ -0,0 +1,107 @@
+"""
+Product detail built entirely by Postgres.
+
+One statement assembles the ``ProductSerializer`` JSON of every active
+product matching a slug with ``json_build_object``/``json_agg`` correlated
+subqueries, and the text is handed to the response untouched: no model is
+instantiated and nothing is serialized in Python. Enabled with
+``SHOP_PRODUCT_DETAIL_MODE = "json_agg"``.
+
+Image URLs are the storage ``base_url`` followed by the stored name, which is
+what ``FileSystemStorage`` returns for plain file names; keep the default
+``"documents"`` mode with storages that sign or rewrite URLs.
+"""
+
+# Core Django imports
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db import router
+
+# Imports from apps
+from shop.models import Product
+
+
+def _timestamp(column):
+    """
+    Returns the SQL rendering ``column`` like ``DateTimeField`` does in UTC:
+    ISO 8601 with a ``Z`` suffix, microseconds only when there are any.
+    """
+    return (
+        f"to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS')"
+        f" || CASE WHEN date_part('microseconds', {column})::int %% 1000000 = 0"
+        f" THEN '' ELSE to_char({column} AT TIME ZONE 'UTC', '.US') END || 'Z'"
+    )
+
+
+PRODUCT_DETAIL_SQL = f"""
+SELECT COALESCE(json_agg(json_build_object(
+    'name', p.name,
+    'slug', p.slug,
+    'description', p.description,
+    'category_name', c.name,
+    'product_line', (
+        SELECT COALESCE(json_agg(json_build_object(
+            'price', l.price::text,
+            'sku', l.sku,
+            'stock_qty', l.stock_qty,
+            'order', l."order",
+            'images', (
+                SELECT COALESCE(json_agg(json_build_object(
+                    'created', {_timestamp("i.created")},
+                    'updated', {_timestamp("i.updated")},
+                    'image_url', CASE WHEN i.image_url = '' THEN NULL
+                        ELSE %(media_url)s || i.image_url END,
+                    'alt_text', i.alt_text,
+                    'order', i."order",
+                    'srcset', (
+                        SELECT COALESCE(json_object_agg(f.key, (
+                            SELECT json_object_agg(w.key, %(media_url)s || w.value)
+                            FROM jsonb_each_text(f.value) w
+                        )), '{{}}'::json)
+                        FROM jsonb_each(i.variants -> 'formats') f
+                    )
+                ) ORDER BY i."order"), '[]'::json)
+                FROM shop_productimage i
+                WHERE i.product_line_id = l.id
+            ),
+            'specification', (
+                SELECT COALESCE(
+                    json_object_agg(v.product_attribute_id, v.value), '{{}}'::json
+                )
+                FROM shop_productlineattributevalue lv
+                JOIN shop_attributevalue v ON v.id = lv.attribute_value_id
+                WHERE lv.product_line_id = l.id
+            )
+        ) ORDER BY l."order"), '[]'::json)
+        FROM shop_productline l
+        WHERE l.product_id = p.id
+    ),
+    'type specification', (
+        SELECT COALESCE(json_object_agg(a.id, a.name), '{{}}'::json)
+        FROM shop_producttypeattribute ta
+        JOIN shop_productattribute a ON a.id = ta.attribute_id
+        WHERE ta.product_type_id = p.product_type_id
+    )
+) ORDER BY p.id), '[]'::json)::text
+FROM shop_product p
+LEFT JOIN shop_category c ON c.id = p.category_id
+WHERE p.slug = %(slug)s AND p.active
+"""  # noqa: S608
+
+
+def product_detail_json(slug):
+    """
+    Returns the JSON array of the active products matching ``slug``.
+
+    Args:
+        slug (str): The product slug.
+
+    Returns:
+        str: The encoded payload, ready to be used as a response body.
+    """
+    with connections[router.db_for_read(Product)].cursor() as cursor:
+        cursor.execute(
+            PRODUCT_DETAIL_SQL,
+            {"slug": slug, "media_url": default_storage.base_url},
+        )
+        return cursor.fetchone()[0]
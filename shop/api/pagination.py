@@ -0,0 +1,357 @@
+# Stdlib imports
+import base64
+import json
+from decimal import Decimal
+from decimal import InvalidOperation
+
+# Core Django imports
+from django.db.models import BooleanField
+from django.db.models import Expression
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import Value
+from django.utils.dateparse import parse_datetime
+
+# Third-party app imports
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed set of orderings.
+
+    Every ordering ends with ``id`` as a tie-breaker so positions are unique
+    and the cursor is the tuple of ordering values of the last row returned.
+    Pages are fetched with ``WHERE (a, id) > (x, y) ORDER BY a, id LIMIT n``,
+    which the matching composite index answers without an offset, so a deep
+    page costs the same as the first one.
+
+    Query parameters:
+        cursor: Opaque position returned in ``next``/``previous``.
+        page_size: Number of items, capped at ``max_page_size``.
+        ordering: One of the keys of ``orderings``.
+    """
+
+    page_size = 24
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering_query_param = "ordering"
+    orderings = {
+        "newest": ("-created", "-id"),
+        "name": ("name", "id"),
+    }
+    default_ordering = "newest"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns the page of ``queryset`` selected by the request parameters.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        cursor = self.decode_cursor(request)
+        self.reverse = cursor is not None and cursor["r"]
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(_invert(field) for field in ordering)
+        if cursor is not None:
+            queryset = queryset.filter(_after(ordering, cursor["v"]))
+        rows = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not self.reverse else cursor is not None
+        self.has_previous = cursor is not None if not self.reverse else has_more
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request):
+        name = request.query_params.get(self.ordering_query_param)
+        return self.orderings.get(name, self.orderings[self.default_ordering])
+
+    def decode_cursor(self, request):
+        """
+        Returns the decoded cursor of the request, or None on the first page.
+
+        Raises:
+            NotFound: If the cursor cannot be decoded.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            # zip(strict=True) rejects a cursor of another ordering.
+            values = [
+                _parse(field, value)
+                for field, value in zip(self.ordering, cursor["v"], strict=True)
+            ]
+            reverse = bool(cursor["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message) from None
+        return {"v": values, "r": reverse}
+
+    def encode_cursor(self, obj, *, reverse):
+        values = [
+            _dump(obj[name] if isinstance(obj, dict) else getattr(obj, name))
+            for name in (field.lstrip("-") for field in self.ordering)
+        ]
+        encoded = base64.urlsafe_b64encode(
+            json.dumps({"v": values, "r": reverse}).encode(),
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.last is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first, reverse=True)
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Result ordering.",
+                "schema": {"type": "string", "enum": list(self.orderings)},
+            },
+        ]
+
+
+class SearchPagination(KeysetPagination):
+    """
+    Keyset pagination of search results, by relevance by default.
+
+    Expects the queryset to be annotated with ``rank``, see
+    ``shop.search.search_products``.
+    """
+
+    orderings = {
+        "relevance": ("-rank", "-id"),
+        "newest": ("-created", "-id"),
+    }
+    default_ordering = "relevance"
+
+
+class CategoryPagination(KeysetPagination):
+    """
+    Keyset pagination of category listings, with price sorts.
+
+    ``sort=price`` orders by the lowest price of a product and ``-price`` by
+    its highest, both answered by the ``(category, min_price, id)`` and
+    ``(category, -max_price, -id)`` indexes. Products without a price are
+    left out of the price sorts. ``sort`` takes precedence over
+    ``ordering``, kept for existing clients.
+
+    Expects the queryset rows to carry ``min_price`` and ``max_price``.
+    """
+
+    sort_query_param = "sort"
+    orderings = {
+        **KeysetPagination.orderings,
+        "price": ("min_price", "id"),
+        "-price": ("-max_price", "-id"),
+    }
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request)
+        price = ordering[0].lstrip("-")
+        if price in PRICE_FIELDS:
+            queryset = queryset.filter(**{f"{price}__isnull": False})
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_ordering(self, request):
+        params = request.query_params
+        name = params.get(self.sort_query_param) or params.get(
+            self.ordering_query_param,
+        )
+        return self.orderings.get(name, self.orderings[self.default_ordering])
+
+    def get_paginated_response_schema(self, schema):
+        """
+        Document the ``facets`` the category listing returns with every
+        page, see ``shop.facets.compute_facets``.
+        """
+        paginated = super().get_paginated_response_schema(schema)
+        paginated["properties"]["facets"] = {
+            "type": "object",
+            "description": "Attribute name to its values in the listing.",
+            "additionalProperties": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ["id", "value", "count"],
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "value": {"type": "string"},
+                        "count": {"type": "integer"},
+                    },
+                },
+            },
+        }
+        return paginated
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        return [
+            *parameters,
+            {
+                "name": self.sort_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Result ordering, takes precedence over `ordering`.",
+                "schema": {"type": "string", "enum": list(self.orderings)},
+            },
+        ]
+
+
+PRICE_FIELDS = ("min_price", "max_price")
+
+
+def _invert(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+class RowAfter(Expression):
+    """
+    Row value comparison ``(a, b, ...) > (x, y, ...)``, or ``<`` when
+    ``descending``.
+
+    Postgres answers it as a range scan of the composite index of the
+    ordering, unlike the equivalent ``OR`` of its expansion.
+    """
+
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, fields, values, *, descending=False):
+        super().__init__()
+        self.lhs = [F(name) for name in fields]
+        self.rhs = [Value(value) for value in values]
+        self.descending = descending
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        self.lhs, self.rhs = exprs[: len(self.lhs)], exprs[len(self.lhs) :]
+
+    def as_sql(self, compiler, connection):
+        params = []
+        sides = []
+        for side in (self.lhs, self.rhs):
+            sqls = []
+            for expression in side:
+                sql, expression_params = compiler.compile(expression)
+                sqls.append(sql)
+                params.extend(expression_params)
+            sides.append(f"({', '.join(sqls)})")
+        operator = "<" if self.descending else ">"
+        return f"{sides[0]} {operator} {sides[1]}", params
+
+
+def _after(ordering, values):
+    """
+    Returns the filter selecting the rows positioned after ``values`` in
+    ``ordering``.
+
+    Orderings in a single direction give a ``RowAfter`` comparison, mixed
+    ones fall back to ``(a > x) OR (a = x AND b > y) ...``.
+    """
+    directions = {field.startswith("-") for field in ordering}
+    if len(directions) == 1:
+        return RowAfter(
+            [field.lstrip("-") for field in ordering],
+            values,
+            descending=directions.pop(),
+        )
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values, strict=True):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _dump(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _parse(field, value):
+    if field.lstrip("-") in ("created", "updated"):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+    if field.lstrip("-") in PRICE_FIELDS:
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise ValueError(value) from None
+    return value
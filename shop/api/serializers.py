@@ -1,11 +1,13 @@
 # Stdlib imports
 
 # Core Django imports
+from django.conf import settings
 from rest_framework import serializers
 
 # Third-party app imports
 
 # Imports from apps
+from shop.images import srcset
 from ..models import  Category, Product, ProductImage, ProductLine, AttributeValue , ProductAttribute
 
 
@@ -22,11 +24,18 @@ class ProductImageSerailizer(serializers.ModelSerializer):
     """
     Serializer for Image model.
 
+    ``srcset`` maps format and width to the URL of each derivative, read
+    from the stored names without touching the files.
     """
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductImage  # Specifies the model to be serialized
-        exclude = ("id","product_line") # Fields to be excluded in the serialization
+        # Fields to be excluded in the serialization
+        exclude = ("id","product_line","variants")
+
+    def get_srcset(self, obj) -> dict:
+        return srcset(obj.variants)
 
 
 class ProductAttributeSerializer(serializers.ModelSerializer):
@@ -81,7 +90,6 @@ class ProductLineSerializer(serializers.ModelSerializer):
         av_data = data.pop("attribute_value")
         attr_values = {}
         for key in av_data:
-            print(key)
             attr_values.update({key["product_attribute"]["id"]: key["value"]})
         data.update({"specification": attr_values})
 
@@ -93,7 +101,7 @@ class ProductSerializer(serializers.ModelSerializer):
     Serializer for Product model.
     """
 
-    category_name = serializers.CharField(source="category.name")
+    category_name = serializers.CharField(source="category.name", allow_null=True)
     product_line = ProductLineSerializer(many=True)
     attributes = serializers.SerializerMethodField()
     class Meta:
@@ -111,7 +119,8 @@ class ProductSerializer(serializers.ModelSerializer):
         """
         get the attributes of the product.
         """
-        # TODO: check of attribute exist
+        if obj.product_type is None:
+            return []
         attributes = obj.product_type.attribute.all()
         return ProductAttributeSerializer(attributes, many=True).data
 
@@ -153,6 +162,7 @@ class ProductCategorySerializer(serializers.ModelSerializer):
     It specifies the fields to be included in the serialization of a Product object.
     """
     product_line = ProductLineCategorySerializer(many=True)
+    in_stock = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -161,9 +171,18 @@ class ProductCategorySerializer(serializers.ModelSerializer):
             "slug",
             "uuid",
             "created",
+            "in_stock",
             "product_line",
         )
 
+    def get_in_stock(self, obj) -> bool:
+        """
+            Whether an active line of the product has stock.
+        """
+        return any(
+            line.active and line.stock_qty > 0 for line in obj.product_line.all()
+        )
+
     def to_representation(self, instance):
         """
             Change data representation 
@@ -178,3 +197,38 @@ class ProductCategorySerializer(serializers.ModelSerializer):
             data.update({"image": image})
 
         return data
+
+
+class SkuResolveSerializer(serializers.Serializer):
+
+    """
+    Input of the batch SKU resolution endpoint.
+    """
+
+    skus = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        allow_empty=False,
+        max_length=settings.SHOP_SKU_RESOLVE_MAX,
+    )
+
+
+class ResolvedSkuSerializer(serializers.Serializer):
+
+    """
+    A product line resolved from its SKU.
+    """
+
+    sku = serializers.CharField()
+    price = serializers.DecimalField(max_digits=30, decimal_places=2)
+    stock_qty = serializers.IntegerField()
+    product_slug = serializers.SlugField()
+
+
+class SkuResolveResponseSerializer(serializers.Serializer):
+
+    """
+    Output of the batch SKU resolution endpoint.
+    """
+
+    results = ResolvedSkuSerializer(many=True)
+    missing = serializers.ListField(child=serializers.CharField())
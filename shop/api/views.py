@@ -1,25 +1,118 @@
 # Stdlib imports
+from decimal import Decimal, InvalidOperation
 
 # Core Django imports
-from django.db import connection
-from django.db.models import Prefetch
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router
+from django.db.models import Max
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
 
 # Third-party app imports
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny,IsAuthenticated
-from pygments import highlight
-from pygments.formatters import TerminalFormatter
-from pygments.lexers import SqlLexer
-from sqlparse import format
+from rest_framework.permissions import AllowAny,IsAdminUser,IsAuthenticated
 
-from shop.models import Category, Product, ProductImage, ProductLine
-from shop.api.serializers import CategorySerializer, ProductCategorySerializer, ProductSerializer
+from shop.api.fast_serializers import CARD_FIELDS, serialize_product_cards
+from shop.api.json_detail import product_detail_json
+from shop.api.pagination import CategoryPagination, SearchPagination
+from shop.catalog_export import CONTENT_TYPES, WRITERS, aiter_chunks, export_rows
+from shop.category_tree import get_category_tree
+from shop.cache import CATEGORIES_TAG, SEARCH_TAG, cached, category_tag, product_tag
+from shop.conditional import conditional_get
+from shop.documents import get_product_documents
+from shop.facets import compute_facets, parse_filters
+from shop.instrumentation import QueryBudgetMixin
+from shop.models import Category, Product, ProductDocument, ProductLine
+from shop.api.serializers import (
+    CategorySerializer,
+    ProductCategorySerializer,
+    ProductSerializer,
+    SkuResolveResponseSerializer,
+    SkuResolveSerializer,
+)
+from shop.routers import ReplicaReadMixin
+from shop.search import search_products
+from shop.sku import resolve_skus
+from shop.warmup import AccessStatsMixin
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def price_param(request, name):
+    """
+    Returns the decimal query parameter ``name``, or None when absent.
+
+    Raises:
+        ValidationError: If the parameter is not a finite number.
+    """
+    raw = request.query_params.get(name, "").strip()
+    if not raw:
+        return None
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise ValidationError({name: "A valid number is required."})
+    return value
+
+
+def category_page(  # noqa: PLR0913
+    request,
+    queryset,
+    paginator,
+    slug,
+    *,
+    descendants,
+    filters,
+    min_price,
+    max_price,
+):
+    """
+    Returns a page of a category listing with its facets.
+
+    Shared by ``ProductViewSet.list_product_by_category_slug`` and its async
+    version.
+
+    Args:
+        request (Request): The DRF request, read by the paginator.
+        queryset (QuerySet): The listable products.
+        paginator (CategoryPagination): Paginates the listing.
+        slug (str): The category slug.
+        descendants (bool): Include the products of the whole subtree.
+        filters (dict): Output of ``parse_filters``.
+        min_price (Decimal | None): Lowest price, see ``price_param``.
+        max_price (Decimal | None): Highest price.
+
+    Returns:
+        dict: The paginated cards and the ``facets``.
+    """
+    matching, facets = compute_facets(
+        slug,
+        filters,
+        descendants=descendants,
+        min_price=min_price,
+        max_price=max_price,
+    )
+    queryset = queryset.in_category(slug, descendants=descendants)
+    if matching is not None:
+        queryset = queryset.filter(matching)
+    if min_price is not None:
+        queryset = queryset.filter(max_price__gte=min_price)
+    if max_price is not None:
+        queryset = queryset.filter(min_price__lte=max_price)
+    page = paginator.paginate_queryset(
+        queryset.values(*CARD_FIELDS, "min_price", "max_price"), request,
+    )
+    data = serialize_product_cards(page)
+    return {**paginator.get_paginated_data(data), "facets": facets}
+
+
+class CategoryViewSet(QueryBudgetMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing categories.
 
@@ -28,6 +121,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
     Usage:
     - GET /api/categories/ : Retrieve a list of all categories.
+    - GET /api/categories/tree/ : Retrieve the nested category tree.
     - POST /api/categories/ : Create a new category.
     - GET /api/categories/{id}/ : Retrieve details of a specific category.
     - PUT /api/categories/{id}/ : Update details of a specific category.
@@ -37,9 +131,61 @@ class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
+    # Last-Modified aggregate, categories
+    query_budgets = {"list": 2, "tree": 1}
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return all categories, served from the response cache.
+
+        Conditional requests are answered with a 304 from the tag versions
+        and ``MAX(updated)`` of the categories.
+        """
+        def respond():
+            return Response(
+                cached(
+                    "categories",
+                    (),
+                    [CATEGORIES_TAG],
+                    lambda: super(CategoryViewSet, self)
+                    .list(request, *args, **kwargs)
+                    .data,
+                ),
+            )
+
+        return conditional_get(
+            request,
+            "categories",
+            (),
+            [CATEGORIES_TAG],
+            lambda: Category.objects.aggregate(modified=Max("updated"))["modified"],
+            respond,
+        )
+
+    @extend_schema(
+        description="The full category tree, nested through `children`.",
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(methods=["get"], detail=False, url_path="tree")
+    def tree(self, request):
+        """
+        Return the nested category tree.
+
+        The tree is served pre-encoded from the cache with an ETag, and a
+        matching ``If-None-Match`` gets an empty 304.
+        """
+        tree = get_category_tree()
+        if tree["etag"] in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(tree["body"], content_type="application/json")
+        response["ETag"] = tree["etag"]
+        return response
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(
+    QueryBudgetMixin, AccessStatsMixin, ReplicaReadMixin, viewsets.ModelViewSet,
+):
 
     """
         A viewset for viewing and manipulating product instances.
@@ -48,6 +194,26 @@ class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
     lookup_field = "slug"
+    # Hot set of the cache warm-up, see shop.warmup.
+    access_stats_actions = ("retrieve", "list_product_by_category_slug")
+    access_stats_params = (
+        "descendants",
+        "attr",
+        "min_price",
+        "max_price",
+        "sort",
+        "ordering",
+        "page_size",
+        "cursor",
+    )
+    # Last-Modified aggregate, then the documents (retrieve) or facets and
+    # products with their cards (listing), plus the first lines and images
+    # of products whose card is not built yet
+    query_budgets = {
+        "retrieve": 2,
+        "list_product_by_category_slug": 5,
+        "search": 3,
+    }
 
     @extend_schema(
         description="More descriptive text",
@@ -57,7 +223,10 @@ class ProductViewSet(viewsets.ModelViewSet):
         Retrieve a product by its slug.
 
         This endpoint returns a product instance matching the provided slug.
-        It also prefetches related data for performance optimization.
+        The payload is served from the precomputed ``ProductDocument`` table
+        through the response cache, or with ``SHOP_PRODUCT_DETAIL_MODE =
+        "json_agg"`` built by a single SQL statement whose JSON text is
+        returned as is.
 
         Args:
             request (Request): The request object.
@@ -66,22 +235,35 @@ class ProductViewSet(viewsets.ModelViewSet):
         Returns:
             Response: The response object containing product data.
         """
-        # Filter the queryset by slug and prefetch related data
-        queryset = (
-            self.queryset.filter(slug=slug)
-            .select_related("category")
-            .prefetch_related(Prefetch("product_line__images"))
-            .prefetch_related(Prefetch("product_line__attribute_value__product_attribute"))
+        def respond():
+            if getattr(settings, "SHOP_PRODUCT_DETAIL_MODE", "documents") == "json_agg":
+                body = cached(
+                    "product_json",
+                    (slug,),
+                    [product_tag(slug)],
+                    lambda: product_detail_json(slug),
+                )
+                return HttpResponse(body, content_type="application/json")
+            data = cached(
+                "product",
+                (slug,),
+                [product_tag(slug)],
+                lambda: get_product_documents(slug),
+            )
+            return Response(data)
+
+        # Documents are rebuilt on every change to the product, its lines,
+        # images and attributes, so their ``updated`` is the product's.
+        return conditional_get(
+            request,
+            "product",
+            (slug,),
+            [product_tag(slug)],
+            lambda: ProductDocument.objects.filter(slug=slug, active=True).aggregate(
+                modified=Max("updated"),
+            )["modified"],
+            respond,
         )
-        # Serialize the queryset
-        serializer = self.serializer_class(queryset, many=True)
-        data = Response(serializer.data)
-        q = list(connection.queries)
-        print(len(q))
-        for qs in q:
-            sqlformatted = format(str(qs["sql"]), reindent=True)
-            print(highlight(sqlformatted, SqlLexer(), TerminalFormatter()))
-        return data
 
     # @action(
     #     methods=["get"],
@@ -97,26 +279,186 @@ class ProductViewSet(viewsets.ModelViewSet):
     #     serializer = self.serializer_class(queryset, many=True)
     #     return Response(serializer.data)
 
+    @extend_schema(
+        responses={200: ProductCategorySerializer(many=True)},
+        parameters=[
+            OpenApiParameter(
+                "descendants",
+                OpenApiTypes.BOOL,
+                description="Include the products of every subcategory.",
+            ),
+            OpenApiParameter(
+                "attr",
+                OpenApiTypes.STR,
+                many=True,
+                description="Attribute filter as `name:value`, repeatable.",
+            ),
+            OpenApiParameter(
+                "min_price",
+                OpenApiTypes.DECIMAL,
+                description="Only products with a line priced at least this.",
+            ),
+            OpenApiParameter(
+                "max_price",
+                OpenApiTypes.DECIMAL,
+                description="Only products with a line priced at most this.",
+            ),
+        ],
+    )
     @action(
         methods=["get"],
         detail=False,
         url_path=r"category/(?P<slug>[\w-]+)",
+        pagination_class=CategoryPagination,
     )
     def list_product_by_category_slug(self, request, slug=None):
         """
-        An endpoint to return products by category
+        An endpoint to return products by category, one keyset page at a time.
+
+        With ``?descendants=true`` the products of every subcategory are
+        included as well. ``?attr=color:red&attr=size:L`` filters by attribute
+        values and the response carries the facet counts under ``facets``.
+
+        ``?min_price=&max_price=`` keep the products whose price range
+        (over their active lines) overlaps the given one, and
+        ``?sort=price|-price|newest|name`` orders the page, see
+        ``CategoryPagination``.
         """
-        serializer = ProductCategorySerializer(
-            self.queryset.filter(category__slug=slug)
-            .prefetch_related(
-                Prefetch("product_line", queryset=ProductLine.objects.order_by("order"))
+        descendants = request.query_params.get("descendants") in ("1", "true")
+        filters = parse_filters(request.query_params.getlist("attr"))
+        min_price = price_param(request, "min_price")
+        max_price = price_param(request, "max_price")
+
+        def build():
+            return category_page(
+                request,
+                self.queryset,
+                self.paginator,
+                slug,
+                descendants=descendants,
+                filters=filters,
+                min_price=min_price,
+                max_price=max_price,
             )
-            .prefetch_related(
-                Prefetch(
-                    "product_line__images",
-                    queryset=ProductImage.objects.filter(order=1),
-                )
+
+        parts = (slug, request.build_absolute_uri())
+        return conditional_get(
+            request,
+            "category_products",
+            parts,
+            [category_tag(slug)],
+            lambda: self.queryset.in_category(slug, descendants=descendants).aggregate(
+                modified=Max("document__updated"),
+            )["modified"],
+            lambda: Response(
+                cached("category_products", parts, [category_tag(slug)], build),
+            ),
+        )
+
+    @extend_schema(
+        responses={200: ProductCategorySerializer(many=True)},
+        parameters=[
+            OpenApiParameter(
+                "q",
+                OpenApiTypes.STR,
+                required=True,
+                description="Search text, web search syntax.",
             ),
-            many=True,
+        ],
+    )
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path="search",
+        pagination_class=SearchPagination,
+    )
+    def search(self, request):
+        """
+        Full-text search over product name, category, attribute values and
+        description, ranked and paginated by keyset.
+
+        Misspelled names still match through trigram similarity.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": "This query parameter is required."})
+
+        def build():
+            queryset = search_products(self.queryset, text)
+            paginator = self.paginator
+            page = paginator.paginate_queryset(
+                queryset.values(*CARD_FIELDS, "rank"), request, view=self,
+            )
+            return paginator.get_paginated_data(serialize_product_cards(page))
+
+        data = cached(
+            "product_search", (request.build_absolute_uri(),), [SEARCH_TAG], build,
         )
-        return Response(serializer.data)
+        return Response(data)
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[
+            OpenApiParameter(
+                "fmt",
+                OpenApiTypes.STR,
+                enum=list(WRITERS),
+                description="`jsonl` (default) or `csv`.",
+            ),
+        ],
+    )
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path="export",
+        permission_classes=[IsAdminUser],
+    )
+    def export(self, request):
+        """
+        Stream the whole catalog, one product line per row, in the format
+        read by the ``import_catalog`` command.
+
+        Rows are read through a server-side cursor and sent as they are
+        encoded, so memory stays constant whatever the catalog size. The
+        read database is pinned here because the body is produced after the
+        view returns. Under ASGI the body is an async iterator, a sync one
+        would be read whole before the first byte is sent.
+        """
+        fmt = request.query_params.get("fmt", "jsonl")
+        if fmt not in WRITERS:
+            raise ValidationError({"fmt": f"Expected one of {', '.join(WRITERS)}."})
+        rows = export_rows(using=router.db_for_read(ProductLine))
+        chunks = WRITERS[fmt](rows)
+        if isinstance(request._request, ASGIRequest):  # noqa: SLF001
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="catalog.{fmt}"'
+        return response
+
+
+class ProductLineViewSet(QueryBudgetMixin, viewsets.GenericViewSet):
+
+    """
+        Read endpoints for product lines addressed by SKU.
+    """
+    permission_classes = [AllowAny]
+    query_budgets = {"resolve": 1}
+
+    @extend_schema(
+        request=SkuResolveSerializer,
+        responses={200: SkuResolveResponseSerializer},
+    )
+    @action(methods=["post"], detail=False, url_path="resolve")
+    def resolve(self, request):
+        """
+        Resolve a batch of SKUs to price, stock and product slug.
+
+        Takes ``{"skus": [...]}`` with up to ``SHOP_SKU_RESOLVE_MAX`` SKUs
+        and answers with the active lines found, in request order, and the
+        SKUs that matched nothing under ``missing``. Lookups go through a
+        per-SKU read-through cache and one ``sku = ANY(...)`` query.
+        """
+        serializer = SkuResolveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results, missing = resolve_skus(serializer.validated_data["skus"])
+        return Response({"results": results, "missing": missing})
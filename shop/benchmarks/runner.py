@@ -0,0 +1,114 @@
+# Stdlib imports
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+# Core Django imports
+from django.test import Client
+
+# Imports from apps
+from shop.instrumentation import track_queries
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Relative slowdown allowed before a latency metric counts as a regression.
+DEFAULT_TOLERANCE = 0.25
+
+
+def percentile(samples, pct):
+    """
+    Returns the ``pct`` percentile of ``samples`` (nearest rank).
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(client, url, iterations):
+    """
+    Request ``url`` ``iterations`` times after one warm-up request.
+
+    Returns:
+        dict: ``p50_ms``, ``p99_ms``, ``mean_ms``, ``queries`` (of the last
+            request) and ``alloc_kb`` (peak traced allocation per request).
+    """
+    response = client.get(url)
+    if response.status_code != 200:  # noqa: PLR2004
+        msg = f"{url} returned {response.status_code}"
+        raise RuntimeError(msg)
+
+    latencies = []
+    peaks = []
+    queries = 0
+    for _ in range(iterations):
+        tracemalloc.start()
+        with track_queries() as stats:
+            start = time.perf_counter()
+            client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        queries = stats.count
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "queries": queries,
+        "alloc_kb": round(statistics.fmean(peaks), 1),
+    }
+
+
+def run(endpoints, iterations=50):
+    """
+    Measure every ``{name: url}`` of ``endpoints``.
+
+    Note that tracemalloc slows requests down, compare latencies against a
+    baseline recorded by this same runner only.
+
+    Returns:
+        dict: Name to the metrics returned by ``measure``.
+    """
+    client = Client(HTTP_HOST="localhost")
+    return {name: measure(client, url, iterations) for name, url in endpoints.items()}
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare ``results`` against a stored ``baseline``.
+
+    Query counts must not grow at all; latencies and allocations may grow by
+    ``tolerance`` (relative) before they count as a regression.
+
+    Returns:
+        list[str]: Human readable regressions, empty when there are none.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if metrics["queries"] > reference["queries"]:
+            regressions.append(
+                f"{name}: queries {reference['queries']} -> {metrics['queries']}",
+            )
+        for key in ("p50_ms", "p99_ms", "alloc_kb"):
+            limit = reference[key] * (1 + tolerance)
+            if metrics[key] > limit:
+                regressions.append(
+                    f"{name}: {key} {reference[key]} -> {metrics[key]} "
+                    f"(limit {limit:.3f})",
+                )
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    Path(path).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
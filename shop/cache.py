@@ -0,0 +1,257 @@
+# Stdlib imports
+import asyncio
+import contextlib
+import hashlib
+import math
+import time
+from contextvars import ContextVar
+
+# Core Django imports
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = "shop"
+
+_refreshing = ContextVar("shop_cache_refreshing", default=False)
+
+
+@contextlib.contextmanager
+def refreshing():
+    """
+    Make ``cached``/``acached`` rebuild their entries even when fresh, for
+    the cache warm-up. Applies to the current thread or task only.
+    """
+    token = _refreshing.set(True)  # noqa: FBT003
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+
+def _tag_key(tag):
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _touched_key(tag):
+    return f"{KEY_PREFIX}:tag:{tag}:at"
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def get_versions(tags):
+    """
+    Returns the current version of every tag, in order.
+
+    Missing tags (never invalidated, or evicted) get a fresh time based
+    version so an eviction can never resurrect an older entry.
+
+    Args:
+        tags (list[str]): The dependency tags.
+
+    Returns:
+        list[int | None]: The versions, None when the cache is unavailable.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(tags):
+    """
+    Async version of ``get_versions``.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, _new_version(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*tags):
+    """
+    Invalidate every cached entry depending on one of ``tags``.
+
+    Entries are never deleted, bumping the tag version changes the key of
+    every dependent entry and the old ones expire on their own. The time of
+    the bump is kept too, see ``invalidated_at``.
+    """
+    for key in {_tag_key(tag) for tag in tags}:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+    now = math.ceil(time.time())
+    cache.set_many({_touched_key(tag): now for tag in tags}, timeout=None)
+
+
+def invalidated_at(tags):
+    """
+    Returns when one of ``tags`` was last invalidated, as a Unix timestamp
+    rounded up to the second, or None when none of them ever was.
+
+    Writes that leave no ``updated`` behind (deletes, deactivations, moves)
+    still bump their tags, so this is the lower bound of ``Last-Modified``.
+    """
+    touched = cache.get_many([_touched_key(tag) for tag in tags])
+    return max(touched.values(), default=None)
+
+
+async def ainvalidated_at(tags):
+    """
+    Async version of ``invalidated_at``.
+    """
+    touched = await cache.aget_many([_touched_key(tag) for tag in tags])
+    return max(touched.values(), default=None)
+
+
+def make_key(name, parts, tags):
+    """
+    Returns the cache key of an entry from its name, the request specific
+    ``parts`` and the current versions of its dependency ``tags``.
+    """
+    return versioned_key(name, parts, get_versions(tags))
+
+
+def versioned_key(name, parts, versions):
+    raw = repr((parts, versions))
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    return f"{KEY_PREFIX}:resp:{name}:{digest}"
+
+
+def cached(name, parts, tags, builder, timeout=None):  # noqa: PLR0911
+    """
+    Return the cached result of ``builder`` or build and cache it.
+
+    Entries carry a soft expiry at ``timeout`` and are kept for
+    ``SHOP_CACHE_GRACE`` more seconds. Rebuilds are single-flight: the first
+    caller takes a short lock and rebuilds while the others keep serving the
+    stale entry, or, when there is nothing to serve yet, wait for the lock
+    holder for up to ``SHOP_CACHE_LOCK_WAIT`` seconds. When the cache is
+    unavailable every caller builds right away. Under ``refreshing()`` fresh
+    entries are rebuilt too, unless another caller already is.
+
+    Args:
+        name (str): Entry namespace, e.g. ``"product"``.
+        parts (tuple): Request specific key parts, e.g. the slug.
+        tags (list[str]): Dependency tags invalidating the entry.
+        builder (Callable[[], Any]): Builds the value on a miss.
+        timeout (int, optional): Soft expiry in seconds, defaults to
+            ``SHOP_CACHE_TIMEOUT``.
+
+    Returns:
+        Any: The value.
+    """
+    if not getattr(settings, "SHOP_RESPONSE_CACHE", True):
+        return builder()
+    if timeout is None:
+        timeout = getattr(settings, "SHOP_CACHE_TIMEOUT", 300)
+    grace = getattr(settings, "SHOP_CACHE_GRACE", 60)
+    key = make_key(name, parts, tags)
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    fresh = entry is not None and entry["refresh_at"] > time.time()
+    if fresh and not _refreshing.get():
+        return entry["value"]
+
+    lock_timeout = getattr(settings, "SHOP_CACHE_LOCK_TIMEOUT", 10)
+    locked = cache.add(lock_key, 1, timeout=lock_timeout)
+    if locked is None:
+        # The backend is down (django-redis IGNORE_EXCEPTIONS), nobody can
+        # hold the lock or fill the entry: waiting would only add latency.
+        return builder()
+    if not locked:
+        if entry is not None:
+            return entry["value"]
+        deadline = time.monotonic() + getattr(settings, "SHOP_CACHE_LOCK_WAIT", 2)
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry["value"]
+        return builder()
+
+    try:
+        value = builder()
+        cache.set(
+            key,
+            {"value": value, "refresh_at": time.time() + timeout},
+            timeout=timeout + grace,
+        )
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+async def amake_key(name, parts, tags):
+    """
+    Async version of ``make_key``.
+    """
+    return versioned_key(name, parts, await aget_versions(tags))
+
+
+async def acached(name, parts, tags, builder, timeout=None):  # noqa: PLR0911
+    """
+    Async version of ``cached`` sharing its entries, ``builder`` is a
+    coroutine function.
+    """
+    if not getattr(settings, "SHOP_RESPONSE_CACHE", True):
+        return await builder()
+    if timeout is None:
+        timeout = getattr(settings, "SHOP_CACHE_TIMEOUT", 300)
+    grace = getattr(settings, "SHOP_CACHE_GRACE", 60)
+    key = await amake_key(name, parts, tags)
+    lock_key = f"{key}:lock"
+
+    entry = await cache.aget(key)
+    fresh = entry is not None and entry["refresh_at"] > time.time()
+    if fresh and not _refreshing.get():
+        return entry["value"]
+
+    lock_timeout = getattr(settings, "SHOP_CACHE_LOCK_TIMEOUT", 10)
+    locked = await cache.aadd(lock_key, 1, timeout=lock_timeout)
+    if locked is None:
+        # The backend is down (django-redis IGNORE_EXCEPTIONS), nobody can
+        # hold the lock or fill the entry: waiting would only add latency.
+        return await builder()
+    if not locked:
+        if entry is not None:
+            return entry["value"]
+        deadline = time.monotonic() + getattr(settings, "SHOP_CACHE_LOCK_WAIT", 2)
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await cache.aget(key)
+            if entry is not None:
+                return entry["value"]
+        return await builder()
+
+    try:
+        value = await builder()
+        await cache.aset(
+            key,
+            {"value": value, "refresh_at": time.time() + timeout},
+            timeout=timeout + grace,
+        )
+    finally:
+        await cache.adelete(lock_key)
+    return value
+
+
+def product_tag(slug):
+    return f"product:{slug}"
+
+
+def category_tag(slug):
+    return f"category:{slug}"
+
+
+CATEGORIES_TAG = "categories"
+SEARCH_TAG = "search"
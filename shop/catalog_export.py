@@ -0,0 +1,213 @@
+"""
+Streaming catalog export, the counterpart of ``shop.catalog_import``.
+
+Rows have the normalized shape read by the importer, one per product line,
+so an export can be imported again. Lines are walked in ``(product,
+order)`` order through a server-side cursor, ``chunk_size`` at a time, with
+their product joined in and their attributes and images prefetched per
+chunk. The writers yield encoded chunks of about ``FLUSH_SIZE`` bytes, so
+memory stays constant whatever the size of the catalog.
+
+Under ASGI, Django drains a synchronous streaming body into a list before
+sending it; wrap the writer in ``aiter_chunks`` there.
+"""
+
+# Stdlib imports
+import csv
+import io
+import json
+from itertools import chain
+
+# Core Django imports
+from asgiref.sync import sync_to_async
+from django.db import router
+from django.db import transaction
+from django.db.models import Prefetch
+
+# Imports from apps
+from shop.models import AttributeValue
+from shop.models import ProductImage
+from shop.models import ProductLine
+
+CHUNK_SIZE = 2000
+FLUSH_SIZE = 64 * 1024
+
+CSV_COLUMNS = (
+    "product_slug",
+    "product_name",
+    "product_description",
+    "category",
+    "sku",
+    "price",
+    "stock_qty",
+    "weight",
+    "attributes",
+    "images",
+)
+
+
+def export_rows(chunk_size=CHUNK_SIZE, using=None):
+    """
+    Stream the product lines in the normalized import shape.
+
+    The cursor is read inside a transaction: outside of one, Postgres
+    materializes a server-side cursor's whole result when it is declared.
+
+    Args:
+        chunk_size (int): Lines fetched, and prefetched for, at a time.
+        using (str, optional): Database alias, the read database of
+            ``ProductLine`` by default.
+
+    Yields:
+        dict: One row per product line, see ``shop.catalog_import.read_csv``.
+    """
+    using = using or router.db_for_read(ProductLine)
+    lines = (
+        ProductLine.objects.using(using)
+        .select_related("product__category")
+        .only(
+            "sku",
+            "price",
+            "stock_qty",
+            "weight",
+            "product__slug",
+            "product__name",
+            "product__description",
+            "product__category__slug",
+        )
+        .prefetch_related(
+            Prefetch(
+                "attribute_value",
+                queryset=AttributeValue.objects.select_related(
+                    "product_attribute",
+                ).only("value", "product_attribute__name"),
+            ),
+            Prefetch(
+                "images",
+                queryset=ProductImage.objects.order_by("order").only(
+                    "product_line",
+                    "image_url",
+                    "alt_text",
+                ),
+            ),
+        )
+        .order_by("product_id", "order")
+    )
+    with transaction.atomic(using=using):
+        for line in lines.iterator(chunk_size=chunk_size):
+            product = line.product
+            yield {
+                "product": {
+                    "slug": product.slug,
+                    "name": product.name,
+                    "description": product.description,
+                    "category": product.category.slug if product.category else None,
+                },
+                "sku": line.sku,
+                "price": str(line.price),
+                "stock_qty": line.stock_qty,
+                "weight": line.weight,
+                "attributes": {
+                    value.product_attribute.name: value.value
+                    for value in line.attribute_value.all()
+                },
+                "images": [
+                    {"url": image.image_url.name, "alt_text": image.alt_text}
+                    for image in line.images.all()
+                    if image.image_url
+                ],
+            }
+
+
+def _flushed(pieces):
+    """
+    Join ``pieces`` of text into UTF-8 chunks of about ``FLUSH_SIZE`` bytes.
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= FLUSH_SIZE:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def write_jsonl(rows):
+    """
+    Encode ``rows`` as JSON Lines.
+
+    Yields:
+        bytes: Chunks of whole lines.
+    """
+    return _flushed(
+        json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def _csv_record(row):
+    product = row["product"]
+    attributes = row["attributes"]
+    return (
+        product["slug"],
+        product["name"],
+        product["description"],
+        product["category"] or "",
+        row["sku"],
+        row["price"],
+        row["stock_qty"],
+        "" if row["weight"] is None else row["weight"],
+        "|".join(f"{name}:{value}" for name, value in attributes.items()),
+        "|".join(image["url"] for image in row["images"]),
+    )
+
+
+def _csv_pieces(rows):
+    stream = io.StringIO()
+    writer = csv.writer(stream)
+    for record in chain([CSV_COLUMNS], map(_csv_record, rows)):
+        writer.writerow(record)
+        yield stream.getvalue()
+        stream.seek(0)
+        stream.truncate()
+
+
+def write_csv(rows):
+    """
+    Encode ``rows`` as CSV with the columns read by
+    ``shop.catalog_import.read_csv``.
+
+    Yields:
+        bytes: Chunks of whole records.
+    """
+    return _flushed(_csv_pieces(rows))
+
+
+async def aiter_chunks(chunks):
+    """
+    Iterate the chunks of a writer asynchronously.
+
+    Every chunk is produced by ``sync_to_async`` in the thread sensitive
+    executor, so the whole export runs on one thread and one database
+    connection, and the writer is closed there when the client goes away.
+
+    Args:
+        chunks (Iterator[bytes]): A writer, e.g. ``write_jsonl(rows)``.
+
+    Yields:
+        bytes: The chunks of ``chunks``.
+    """
+    produce = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await produce(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
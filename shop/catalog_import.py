@@ -0,0 +1,380 @@
+# Stdlib imports
+import csv
+import json
+from decimal import Decimal
+from decimal import InvalidOperation
+from itertools import islice
+
+# Core Django imports
+from django.db import transaction
+
+# Imports from apps
+from shop.models import AttributeValue
+from shop.models import Category
+from shop.models import Product
+from shop.models import ProductAttribute
+from shop.models import ProductImage
+from shop.models import ProductLine
+from shop.models import ProductLineAttributeValue
+from shop.signals import refresh_products
+from shop.validation import find_duplicate_attributes
+
+
+class CatalogImportError(Exception):
+    """
+    Raised when a row of a catalog file cannot be imported.
+
+    The batch holding the row is rolled back, the previous ones stay.
+
+    Attributes:
+        row (int): Number of the row in the file, from 1, header excluded.
+        field (str): The missing or invalid field.
+        batches (int): The number of batches already committed.
+    """
+
+    def __init__(self, row, field, message):
+        self.row = row
+        self.field = field
+        self.message = message
+        self.batches = 0
+        super().__init__(message)
+
+    def __str__(self):
+        return (
+            f"Row {self.row}, {self.field}: {self.message}. "
+            f"Batches committed before it: {self.batches}."
+        )
+
+
+def _split(raw, sep):
+    return [item.strip() for item in (raw or "").split(sep) if item.strip()]
+
+
+def read_csv(stream):
+    """
+    Stream normalized rows from a CSV file with the columns ``product_slug``,
+    ``product_name``, ``product_description``, ``category``, ``sku``,
+    ``price``, ``stock_qty``, ``weight``, ``attributes`` (``name:value``
+    pairs separated by ``|``) and ``images`` (paths separated by ``|``).
+    """
+    for record in csv.DictReader(stream):
+        yield {
+            "product": {
+                "slug": record.get("product_slug"),
+                "name": record.get("product_name") or record.get("product_slug"),
+                "description": record.get("product_description", ""),
+                "category": record.get("category") or None,
+            },
+            "sku": record.get("sku"),
+            "price": record.get("price"),
+            "stock_qty": record.get("stock_qty") or 0,
+            "weight": record.get("weight") or None,
+            "attributes": dict(
+                pair.split(":", 1)
+                for pair in _split(record.get("attributes"), "|")
+                if ":" in pair
+            ),
+            "images": [{"url": url} for url in _split(record.get("images"), "|")],
+        }
+
+
+def read_jsonl(stream):
+    """
+    Stream rows from a JSON Lines file, one product line per line, already
+    in the normalized shape (see ``read_csv``).
+    """
+    lines = (line for line in stream if line.strip())
+    for number, line in enumerate(lines, start=1):
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            raise CatalogImportError(number, "line", f"invalid JSON ({exc})") from exc
+
+
+def _clean_row(row, number):
+    """
+    Check the required fields of a normalized row and convert its numbers.
+
+    Returns:
+        dict: The row, with ``number`` set and ``price``, ``stock_qty`` and
+            ``weight`` converted.
+
+    Raises:
+        CatalogImportError: If a field is missing or invalid.
+    """
+    if not isinstance(row, dict):
+        raise CatalogImportError(number, "line", "not an object")
+    product = row.get("product") or {}
+    for field, value in (
+        ("product_slug", product.get("slug")),
+        ("sku", row.get("sku")),
+        ("price", row.get("price")),
+    ):
+        if value in (None, ""):
+            raise CatalogImportError(number, field, "missing")
+    converters = (
+        ("price", lambda value: Decimal(str(value))),
+        ("stock_qty", lambda value: int(value or 0)),
+        ("weight", lambda value: None if value in (None, "") else float(value)),
+    )
+    cleaned = {**row, "number": number}
+    for field, convert in converters:
+        try:
+            cleaned[field] = convert(row.get(field))
+        except (InvalidOperation, TypeError, ValueError):
+            raise CatalogImportError(
+                number,
+                field,
+                f"invalid value {row.get(field)!r}",
+            ) from None
+    return cleaned
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+class CatalogImporter:
+    """
+    Batched catalog loader.
+
+    Rows are grouped in batches of ``batch_size`` and every batch is written
+    with a constant number of queries: lookups by ``__in`` and
+    ``bulk_create`` for products, lines, attribute links and images.
+    ``order`` values are reserved with ``OrderField.assign``, one statement
+    for all the parents of a batch, so neither the per-row
+    ``OrderField.pre_save`` counters nor the ``full_clean`` calls of the
+    model ``save`` methods run. Attribute links are checked per batch with
+    ``find_duplicate_attributes``, other duplicates are rejected by the
+    unique constraints.
+
+    Rows are validated before their batch is written, a bad one raises
+    ``CatalogImportError`` with its number and field.
+
+    Args:
+        batch_size (int): Number of rows per batch and transaction.
+        refresh (bool): Rebuild documents, facets and caches of the touched
+            products after each batch. Disable for an initial load and run
+            the rebuild commands afterwards.
+    """
+
+    def __init__(self, batch_size=1000, *, refresh=True):
+        self.batch_size = batch_size
+        self.refresh = refresh
+        self.categories = {}
+        self.attributes = {}
+        self.values = {}
+        self.stats = {"products": 0, "lines": 0, "skipped": 0, "batches": 0}
+        self.rows_read = 0
+
+    def reset(self):
+        """
+        Forget the cached lookups.
+        """
+        self.categories.clear()
+        self.attributes.clear()
+        self.values.clear()
+
+    def run(self, rows):
+        """
+        Import every row of ``rows`` and return the counters.
+        """
+        rows = iter(rows)
+        try:
+            while batch := list(islice(rows, self.batch_size)):
+                self.import_batch(batch)
+        except CatalogImportError as exc:
+            exc.batches = self.stats["batches"]
+            raise
+        return self.stats
+
+    def import_batch(self, rows):
+        """
+        Import one batch in its own transaction.
+        """
+        first = self.rows_read + 1
+        self.rows_read += len(rows)
+        rows = [_clean_row(row, number) for number, row in enumerate(rows, first)]
+        try:
+            with transaction.atomic():
+                product_ids = self._import_batch(rows)
+        except Exception:
+            # Ids cached during the rolled back batch no longer exist.
+            self.reset()
+            raise
+        self.stats["batches"] += 1
+        if self.refresh and product_ids:
+            refresh_products(product_ids)
+
+    def _import_batch(self, rows):
+        skus = [row["sku"] for row in rows]
+        existing = set(
+            ProductLine.objects.filter(sku__in=skus).values_list("sku", flat=True),
+        )
+        seen = set()
+        fresh = []
+        for row in rows:
+            if row["sku"] in existing or row["sku"] in seen:
+                self.stats["skipped"] += 1
+                continue
+            seen.add(row["sku"])
+            fresh.append(row)
+        if not fresh:
+            return set()
+
+        products = self._products(fresh)
+        lines = [
+            ProductLine(
+                product_id=products[row["product"]["slug"]],
+                sku=row["sku"],
+                price=row["price"],
+                stock_qty=row["stock_qty"],
+                weight=row["weight"],
+            )
+            for row in fresh
+        ]
+        ProductLine._meta.get_field("order").assign(lines)  # noqa: SLF001
+        lines = ProductLine.objects.bulk_create(lines)
+        self._attributes(fresh, lines)
+        self._images(fresh, lines)
+        self.stats["lines"] += len(lines)
+        return set(products.values())
+
+    def _products(self, rows):
+        """
+        Returns slug to id of the products of ``rows``, creating the missing
+        ones with a single ``bulk_create``.
+        """
+        specs = {row["product"]["slug"]: row["product"] for row in rows}
+        products = dict(
+            Product.objects.filter(slug__in=specs)
+            .order_by("-id")
+            .values_list("slug", "id"),
+        )
+        missing = [spec for slug, spec in specs.items() if slug not in products]
+        category_ids = self._categories(
+            {spec["category"] for spec in missing if spec.get("category")},
+        )
+        created = Product.objects.bulk_create(
+            Product(
+                slug=spec["slug"],
+                name=spec.get("name") or spec["slug"],
+                description=spec.get("description") or "",
+                category_id=category_ids.get(spec.get("category")),
+            )
+            for spec in missing
+        )
+        self.stats["products"] += len(created)
+        products.update((product.slug, product.id) for product in created)
+        return products
+
+    def _categories(self, slugs):
+        unknown = slugs - self.categories.keys()
+        if unknown:
+            self.categories.update(
+                Category.objects.filter(slug__in=unknown).values_list("slug", "id"),
+            )
+        return self.categories
+
+    def _attributes(self, rows, lines):
+        """
+        Link the lines to their attribute values, creating missing attributes
+        and values. A row maps attribute names to a single value, so the
+        one-value-per-attribute rule holds by construction.
+        """
+        names = {name for row in rows for name in row.get("attributes", {})}
+        unknown = names - self.attributes.keys()
+        if unknown:
+            self.attributes.update(
+                ProductAttribute.objects.filter(name__in=unknown).values_list(
+                    "name",
+                    "id",
+                ),
+            )
+            created = ProductAttribute.objects.bulk_create(
+                ProductAttribute(name=name) for name in unknown - self.attributes.keys()
+            )
+            self.attributes.update((a.name, a.id) for a in created)
+
+        pairs = {
+            (self.attributes[name], str(value))
+            for row in rows
+            for name, value in row.get("attributes", {}).items()
+        }
+        unknown = pairs - self.values.keys()
+        if unknown:
+            self.values.update(
+                ((attribute_id, value), value_id)
+                for value_id, attribute_id, value in AttributeValue.objects.filter(
+                    product_attribute_id__in={a for a, _ in unknown},
+                    value__in={v for _, v in unknown},
+                ).values_list("id", "product_attribute_id", "value")
+            )
+            created = AttributeValue.objects.bulk_create(
+                AttributeValue(product_attribute_id=attribute_id, value=value)
+                for attribute_id, value in unknown - self.values.keys()
+            )
+            self.values.update(
+                ((v.product_attribute_id, v.value), v.id) for v in created
+            )
+
+        links = [
+            ProductLineAttributeValue(
+                product_line_id=line.id,
+                attribute_value_id=self.values[self.attributes[name], str(value)],
+            )
+            for row, line in zip(rows, lines, strict=True)
+            for name, value in row.get("attributes", {}).items()
+        ]
+        duplicates = find_duplicate_attributes(
+            (link.product_line_id, link.attribute_value_id) for link in links
+        )
+        if duplicates:
+            line_id, _ = min(duplicates)
+            numbers = {
+                line.id: row["number"] for row, line in zip(rows, lines, strict=False)
+            }
+            raise CatalogImportError(
+                numbers[line_id],
+                "attributes",
+                "two values of one attribute",
+            )
+        ProductLineAttributeValue.objects.bulk_create(links)
+
+    def _images(self, rows, lines):
+        images = [
+            (line.id, image)
+            for row, line in zip(rows, lines, strict=True)
+            for image in row.get("images", [])
+        ]
+        images = [
+            ProductImage(
+                product_line_id=line_id,
+                image_url=image["url"],
+                alt_text=image.get("alt_text", ""),
+            )
+            for line_id, image in images
+        ]
+        ProductImage._meta.get_field("order").assign(images)  # noqa: SLF001
+        ProductImage.objects.bulk_create(images)
+
+
+def import_catalog(path, fmt=None, batch_size=1000, *, refresh=True):
+    """
+    Import a CSV or JSON Lines catalog file.
+
+    Args:
+        path (str): Path of the file.
+        fmt (str, optional): ``"csv"`` or ``"jsonl"``, guessed from the
+            extension when omitted.
+        batch_size (int): Rows per batch.
+        refresh (bool): See ``CatalogImporter``.
+
+    Returns:
+        dict: Counters of created products and lines, skipped rows and
+            committed batches.
+    """
+    fmt = fmt or ("csv" if str(path).endswith(".csv") else "jsonl")
+    with open(path, newline="", encoding="utf-8") as stream:  # noqa: PTH123
+        return CatalogImporter(batch_size=batch_size, refresh=refresh).run(
+            READERS[fmt](stream),
+        )
@@ -0,0 +1,93 @@
+# Stdlib imports
+import hashlib
+import json
+
+# Core Django imports
+from django.conf import settings
+
+# Imports from apps
+from shop.cache import CATEGORIES_TAG
+from shop.cache import acached
+from shop.cache import cached
+from shop.models import Category
+
+CATEGORY_ROWS = Category.objects.order_by("tree_id", "lft").values_list(
+    "name",
+    "slug",
+    "level",
+)
+
+
+def _nest(rows):
+    roots = []
+    stack = []
+    for name, slug, level in rows:
+        node = {"name": name, "slug": slug, "children": []}
+        del stack[level:]
+        (stack[-1]["children"] if stack else roots).append(node)
+        stack.append(node)
+    return roots
+
+
+def _encode(tree):
+    body = json.dumps(tree, separators=(",", ":")).encode()
+    etag = hashlib.sha1(body, usedforsecurity=False).hexdigest()
+    return {"etag": f'"{etag}"', "body": body}
+
+
+def build_category_tree():
+    """
+    Build the nested category tree from a single ordered MPTT query.
+
+    Rows ordered by ``(tree_id, lft)`` come out in depth-first order, so
+    each node is appended to the children of the last open node one level
+    above it.
+
+    Returns:
+        list: The root categories, each with a nested ``children`` list.
+    """
+    return _nest(CATEGORY_ROWS.all())
+
+
+async def abuild_category_tree():
+    """
+    Async version of ``build_category_tree``.
+    """
+    return _nest([row async for row in CATEGORY_ROWS.all()])
+
+
+def get_category_tree():
+    """
+    Returns the encoded category tree and its ETag.
+
+    The tree is serialized once and cached under the ``categories`` tag,
+    which the ``Category`` receivers in ``shop.signals`` bump on every
+    change, so it is only rebuilt after a category is written.
+
+    Returns:
+        dict: ``{"etag": str, "body": bytes}``.
+    """
+    return cached(
+        "category_tree",
+        (),
+        [CATEGORIES_TAG],
+        lambda: _encode(build_category_tree()),
+        timeout=getattr(settings, "SHOP_CATEGORY_TREE_TIMEOUT", 86400),
+    )
+
+
+async def aget_category_tree():
+    """
+    Async version of ``get_category_tree``, sharing its cache entry.
+    """
+
+    async def build():
+        return _encode(await abuild_category_tree())
+
+    return await acached(
+        "category_tree",
+        (),
+        [CATEGORIES_TAG],
+        build,
+        timeout=getattr(settings, "SHOP_CATEGORY_TREE_TIMEOUT", 86400),
+    )
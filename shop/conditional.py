@@ -0,0 +1,116 @@
+# Core Django imports
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.http import quote_etag
+
+# Imports from apps
+from shop.cache import acached
+from shop.cache import aget_versions
+from shop.cache import ainvalidated_at
+from shop.cache import cached
+from shop.cache import get_versions
+from shop.cache import invalidated_at
+from shop.cache import versioned_key
+
+
+def make_etag(name, parts, tags):
+    """
+    Returns a strong ETag for an entry of the response cache.
+
+    The tag versions already change on every write affecting the entry
+    (including deletes), so the digest of the cache key is a validator that
+    costs no database query.
+
+    Returns:
+        str | None: The ETag, or None when the versions cannot be read (the
+            cache is down) and would not change on writes.
+    """
+    return _etag(name, parts, get_versions(tags))
+
+
+def _etag(name, parts, versions):
+    if None in versions:
+        return None
+    return quote_etag(versioned_key(name, parts, versions).rsplit(":", 1)[-1])
+
+
+def conditional_get(request, name, parts, tags, last_modified, respond):  # noqa: PLR0913
+    """
+    Answer a conditional GET without building the payload when possible.
+
+    The ETag comes from the tag versions (see ``make_etag``) and
+    ``Last-Modified`` from ``last_modified``, a cheap ``MAX(updated)``
+    aggregate raised to the last invalidation of the tags, so deletes and
+    moves count too, kept in the response cache under the same tags. A
+    matching ``If-None-Match`` or a fresh ``If-Modified-Since`` gets an empty
+    304 and ``respond`` is never called.
+
+    Args:
+        request (HttpRequest): The request.
+        name (str): Entry namespace, as passed to ``cached``.
+        parts (tuple): Request specific key parts.
+        tags (list[str]): Dependency tags of the response.
+        last_modified (Callable[[], datetime | None]): Returns the time of
+            the last change, or None when unknown.
+        respond (Callable[[], HttpResponse]): Builds the full response.
+
+    Returns:
+        HttpResponse: The 304 or the full response, with validators.
+    """
+    etag = make_etag(name, parts, tags)
+    timestamp = cached(
+        f"{name}_last_modified",
+        parts,
+        tags,
+        lambda: _latest(last_modified(), invalidated_at(tags)),
+    )
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=timestamp,
+    )
+    if response is None:
+        response = respond()
+    return _set_validators(response, etag, timestamp)
+
+
+async def aconditional_get(request, name, parts, tags, last_modified, respond):  # noqa: PLR0913
+    """
+    Async version of ``conditional_get``, ``last_modified`` and ``respond``
+    are coroutine functions.
+    """
+    etag = _etag(name, parts, await aget_versions(tags))
+
+    async def latest():
+        return _latest(await last_modified(), await ainvalidated_at(tags))
+
+    timestamp = await acached(f"{name}_last_modified", parts, tags, latest)
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=timestamp,
+    )
+    if response is None:
+        response = await respond()
+    return _set_validators(response, etag, timestamp)
+
+
+def _latest(modified, invalidated):
+    """
+    Returns the later of the ``modified`` datetime and the ``invalidated``
+    timestamp, as a Unix timestamp, or None when both are unknown.
+    """
+    timestamps = [int(modified.timestamp())] if modified is not None else []
+    if invalidated is not None:
+        timestamps.append(invalidated)
+    return max(timestamps, default=None)
+
+
+def _set_validators(response, etag, timestamp):
+    if etag is not None:
+        response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    return response
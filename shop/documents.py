@@ -0,0 +1,144 @@
+# Core Django imports
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models import OuterRef
+from django.db.models import Subquery
+
+# Imports from apps
+from shop.api.fast_serializers import build_product_cards
+from shop.api.fast_serializers import serialize_products
+from shop.models import Product
+from shop.models import ProductCard
+from shop.models import ProductDocument
+from shop.models import ProductLine
+
+
+def rebuild_product_documents(product_ids):
+    """
+    Rebuild the documents of the given products.
+
+    Products that no longer exist simply have no row left (the document is
+    deleted with its product), so only existing ids are written. Payloads
+    come from the ``values_list`` based ``serialize_products``, a constant
+    number of queries for the whole set.
+
+    Args:
+        product_ids (Iterable[int]): Ids of the products to rebuild.
+
+    Returns:
+        int: The number of documents written.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+    payloads = serialize_products(product_ids)
+    active = dict(
+        Product.objects.filter(id__in=list(payloads)).values_list("id", "active"),
+    )
+    documents = [
+        ProductDocument(
+            product_id=product_id,
+            slug=data["slug"],
+            active=active[product_id],
+            data=data,
+        )
+        for product_id, data in payloads.items()
+        if product_id in active
+    ]
+    ProductDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["slug", "active", "data", "updated"],
+    )
+    return len(documents)
+
+
+def rebuild_product_cards(product_ids):
+    """
+    Rebuild the listing cards of the given products.
+
+    Like ``rebuild_product_documents``, only existing products are written.
+
+    Args:
+        product_ids (Iterable[int]): Ids of the products to rebuild.
+
+    Returns:
+        int: The number of cards written.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+    existing = Product.objects.filter(id__in=product_ids).values_list("id", flat=True)
+    cards = [
+        ProductCard(product_id=product_id, **card)
+        for product_id, card in build_product_cards(existing).items()
+    ]
+    ProductCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["price", "in_stock", "image", "updated"],
+    )
+    return len(cards)
+
+
+def rebuild_price_ranges(product_ids):
+    """
+    Recompute ``Product.min_price``/``max_price`` from the active lines.
+
+    One ``UPDATE`` for the whole set, through the queryset so the product
+    signals do not fire again. Products without an active line get NULLs.
+
+    Args:
+        product_ids (Iterable[int]): Ids of the products.
+
+    Returns:
+        int: The number of products updated.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return 0
+    lines = (
+        ProductLine.objects.filter(product_id=OuterRef("pk"), active=True)
+        .order_by()
+        .values("product_id")
+    )
+    return Product.objects.filter(id__in=product_ids).update(
+        min_price=Subquery(lines.annotate(value=Min("price")).values("value")),
+        max_price=Subquery(lines.annotate(value=Max("price")).values("value")),
+    )
+
+
+def get_product_documents(slug):
+    """
+    Returns the serialized active products matching ``slug``.
+
+    Served from ``ProductDocument`` with a single indexed lookup. Products
+    without a document yet (e.g. created before the table existed) are built
+    on the fly and stored for the next request.
+
+    Args:
+        slug (str): The product slug.
+
+    Returns:
+        list: The serialized products.
+    """
+    documents = list(
+        ProductDocument.objects.filter(slug=slug, active=True).values_list(
+            "data",
+            flat=True,
+        ),
+    )
+    if documents:
+        return documents
+    missing = Product.objects.isactive().filter(slug=slug).values_list("id", flat=True)
+    if rebuild_product_documents(missing):
+        # Read back from the primary, a replica may not have the rows yet.
+        return list(
+            ProductDocument.objects.using(DEFAULT_DB_ALIAS)
+            .filter(slug=slug, active=True)
+            .values_list("data", flat=True),
+        )
+    return []
@@ -0,0 +1,311 @@
+# Stdlib imports
+from collections import defaultdict
+
+# Core Django imports
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connections
+from django.db import models
+from django.db import router
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Imports from apps
+from shop.models import AttributeValue
+from shop.models import Category
+from shop.models import FacetIndex
+from shop.models import Product
+from shop.models import ProductAttributeValue
+from shop.models import ProductLineAttributeValue
+
+
+def parse_filters(values):
+    """
+    Parse ``attr`` query parameters of the form ``name:value``.
+
+    Args:
+        values (list[str]): The raw parameters, e.g. ``["color:red"]``.
+
+    Returns:
+        dict: Lower-cased attribute name to the set of lower-cased values.
+            Malformed parameters are ignored.
+    """
+    filters = defaultdict(set)
+    for raw in values:
+        name, sep, value = raw.partition(":")
+        if sep and name and value:
+            filters[name.strip().lower()].add(value.strip().lower())
+    return dict(filters)
+
+
+def facet_categories(slug, *, descendants=False):
+    """
+    Returns the categories whose facet rows make up the listing of ``slug``.
+    """
+    node = Category.objects.filter(slug=slug)
+    if not descendants:
+        return node
+    return Category.objects.filter(
+        tree_id=models.Subquery(node.values("tree_id")[:1]),
+        lft__gte=models.Subquery(node.values("lft")[:1]),
+        lft__lte=models.Subquery(node.values("rght")[:1]),
+    )
+
+
+FACET_TABLE = FacetIndex._meta.db_table  # noqa: SLF001
+PRODUCT_TABLE = Product._meta.db_table  # noqa: SLF001
+
+# Products of the ``{categories}`` subquery carrying one of the given values
+# of an attribute, both compared lower-cased.
+MATCHING_SQL = f"""
+SELECT unnest(product_ids) FROM {FACET_TABLE}
+WHERE category_id IN ({{categories}}) AND lower(attribute_name) = %s
+AND lower(value) = ANY(%s)
+"""
+
+# Facet counts without filters: a product belongs to one category, so the
+# row sizes add up to distinct products and no array is unnested.
+FACET_TOTALS_SQL = f"""
+SELECT attribute_value_id, attribute_name, value, SUM(cardinality(product_ids))
+FROM {FACET_TABLE}
+WHERE category_id IN ({{categories}})
+GROUP BY attribute_value_id, attribute_name, value
+ORDER BY value
+"""
+
+# Facet counts of the ``{categories}`` subquery, ``{price}`` keeping the
+# products whose price range overlaps the requested one and ``{conditions}``
+# restricting every entry to the products matching the filters on the other
+# attributes.
+FACET_COUNTS_SQL = f"""
+WITH entries AS (
+    SELECT f.attribute_value_id, f.attribute_name, f.value, u.id AS product_id
+    FROM {FACET_TABLE} f CROSS JOIN LATERAL unnest(f.product_ids) AS u(id)
+    {{price}}
+    WHERE f.category_id IN ({{categories}})
+)
+SELECT e.attribute_value_id, e.attribute_name, e.value,
+    COUNT(DISTINCT e.product_id)
+FROM entries e
+WHERE {{conditions}}
+GROUP BY e.attribute_value_id, e.attribute_name, e.value
+ORDER BY e.value
+"""  # noqa: S608
+
+PRICE_JOIN_SQL = f"JOIN {PRODUCT_TABLE} p ON p.id = u.id"
+
+FACET_CONDITION_SQL = """(
+    lower(e.attribute_name) = %s OR e.product_id IN (
+        SELECT product_id FROM entries
+        WHERE lower(attribute_name) = %s AND lower(value) = ANY(%s)
+    )
+)"""
+
+
+def compute_facets(
+    slug,
+    filters,
+    *,
+    descendants=False,
+    min_price=None,
+    max_price=None,
+):
+    """
+    Filter a category listing by attribute values and count its facets.
+
+    Values of the same attribute are OR-ed and attributes are AND-ed. The
+    count of a value is the number of products it would match given the
+    filters on the *other* attributes, so selecting a color does not hide
+    the other colors. With a price range only the products overlapping it,
+    as in the listing, are counted.
+
+    The counts take one statement, the categories of the listing being a
+    subquery of it. Without filters the array sizes are added up, otherwise
+    Postgres unnests and intersects the ``product_ids`` arrays. The listing
+    is filtered with one subquery per filtered attribute, no id set is
+    loaded into Python.
+
+    Args:
+        slug (str): The category slug.
+        filters (dict): Output of ``parse_filters``.
+        descendants (bool): Include the products of the whole subtree.
+        min_price (Decimal, optional): Lowest price of the listing.
+        max_price (Decimal, optional): Highest price of the listing.
+
+    Returns:
+        tuple: The ``Q`` selecting the matching products, or None when there
+            are no filters, and the facets as ``{attribute: [{"id",
+            "value", "count"}]}``.
+    """
+    using = router.db_for_read(FacetIndex)
+    categories, category_params = (
+        facet_categories(slug, descendants=descendants)
+        .values("id")
+        .query.get_compiler(using=using)
+        .as_sql()
+    )
+    filters = {name: sorted(values) for name, values in filters.items()}
+
+    if not filters and min_price is None and max_price is None:
+        sql = FACET_TOTALS_SQL.format(categories=categories)
+        params = [*category_params]
+    else:
+        price = []
+        params = []
+        if min_price is not None or max_price is not None:
+            price.append(PRICE_JOIN_SQL)
+        if min_price is not None:
+            price.append("AND p.max_price >= %s")
+            params.append(min_price)
+        if max_price is not None:
+            price.append("AND p.min_price <= %s")
+            params.append(max_price)
+        params.extend(category_params)
+        for name, values in filters.items():
+            params.extend((name, name, values))
+        sql = FACET_COUNTS_SQL.format(
+            price=" ".join(price),
+            categories=categories,
+            conditions=" AND ".join([FACET_CONDITION_SQL] * len(filters) or ["TRUE"]),
+        )
+    facets = defaultdict(list)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        for value_id, name, value, count in cursor:
+            facets[name].append({"id": value_id, "value": value, "count": count})
+
+    if not filters:
+        return None, dict(facets)
+    matching = Q()
+    for name, values in filters.items():
+        matching &= Q(
+            id__in=RawSQL(  # noqa: S611
+                MATCHING_SQL.format(categories=categories),
+                (*category_params, name, values),
+            ),
+        )
+    return matching, dict(facets)
+
+
+def _index_rows(category_ids, product_ids=None):
+    """
+    Returns the facet entries of ``category_ids`` as ``{(category_id,
+    attribute_value_id): product ids}``, restricted to ``product_ids`` when
+    given.
+
+    Two grouped queries collect the active products carrying each value on
+    the product or on an active line.
+    """
+    line_values = ProductLineAttributeValue.objects.filter(
+        product_line__product__category_id__in=category_ids,
+        product_line__product__active=True,
+        product_line__active=True,
+    )
+    product_values = ProductAttributeValue.objects.filter(
+        product__category_id__in=category_ids,
+        product__active=True,
+    )
+    if product_ids is not None:
+        line_values = line_values.filter(product_line__product_id__in=product_ids)
+        product_values = product_values.filter(product_id__in=product_ids)
+    line_rows = (
+        line_values.values("product_line__product__category_id", "attribute_value_id")
+        .annotate(ids=ArrayAgg("product_line__product_id", distinct=True))
+        .values_list("product_line__product__category_id", "attribute_value_id", "ids")
+    )
+    product_rows = (
+        product_values.values("product__category_id", "attribute_value_id")
+        .annotate(ids=ArrayAgg("product_id", distinct=True))
+        .values_list("product__category_id", "attribute_value_id", "ids")
+    )
+    index = defaultdict(set)
+    for rows in (line_rows, product_rows):
+        for category_id, value_id, ids in rows:
+            index[category_id, value_id].update(ids)
+    return index
+
+
+def _value_names(value_ids):
+    return {
+        value_id: (name, value)
+        for value_id, value, name in AttributeValue.objects.filter(
+            id__in=value_ids,
+        ).values_list("id", "value", "product_attribute__name")
+    }
+
+
+def rebuild_facet_index(category_ids, product_ids=None):
+    """
+    Recompute the facet rows of the given categories.
+
+    Rebuilds of a category are serialized by locking its row, so concurrent
+    writers queue up instead of racing on ``shop_facet_category_value_uniq``.
+    With ``product_ids`` only the entries of those products are replaced,
+    in the rows they leave or join, so a write costs the size of its
+    products' attributes rather than of the whole category.
+
+    Args:
+        category_ids (Iterable[int]): Ids of the categories to rebuild.
+        product_ids (Iterable[int], optional): Ids of the changed products,
+            which may have left the categories or no longer exist. The whole
+            categories are rebuilt when omitted.
+    """
+    category_ids = set(category_ids) - {None}
+    if not category_ids:
+        return
+    with transaction.atomic():
+        list(
+            Category.objects.select_for_update()
+            .filter(id__in=category_ids)
+            .order_by("id")
+            .values_list("id", flat=True),
+        )
+        if product_ids is None:
+            index = _index_rows(category_ids)
+            FacetIndex.objects.filter(category_id__in=category_ids).delete()
+        else:
+            product_ids = set(product_ids)
+            index = _index_rows(category_ids, product_ids)
+            _merge_rows(category_ids, product_ids, index)
+        names = _value_names({value_id for _, value_id in index})
+        FacetIndex.objects.bulk_create(
+            FacetIndex(
+                category_id=category_id,
+                attribute_value_id=value_id,
+                attribute_name=names[value_id][0],
+                value=names[value_id][1],
+                product_ids=sorted(ids),
+            )
+            for (category_id, value_id), ids in index.items()
+        )
+
+
+def _merge_rows(category_ids, product_ids, index):
+    """
+    Replace the entries of ``product_ids`` in the existing rows by those of
+    ``index``, consuming the entries of ``index`` that found a row.
+    """
+    rows = list(
+        FacetIndex.objects.filter(category_id__in=category_ids).filter(
+            Q(product_ids__overlap=sorted(product_ids))
+            | Q(attribute_value_id__in={value_id for _, value_id in index}),
+        ),
+    )
+    names = _value_names({row.attribute_value_id for row in rows})
+    changed = []
+    emptied = []
+    for row in rows:
+        ids = set(row.product_ids) - product_ids
+        ids |= index.pop((row.category_id, row.attribute_value_id), set())
+        if not ids:
+            emptied.append(row.pk)
+            continue
+        row.product_ids = sorted(ids)
+        row.attribute_name, row.value = names[row.attribute_value_id]
+        changed.append(row)
+    FacetIndex.objects.filter(pk__in=emptied).delete()
+    FacetIndex.objects.bulk_update(
+        changed,
+        ["product_ids", "attribute_name", "value"],
+        batch_size=500,
+    )
@@ -1,6 +1,12 @@
+from collections import Counter
+from itertools import count
+
+from django.apps import apps
 from django.core import checks
-from django.core.exceptions import ObjectDoesNotExist
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
 from django.db import models
+from django.db import router
 
 
 class OrderField(models.PositiveIntegerField):
@@ -13,6 +19,10 @@ class OrderField(models.PositiveIntegerField):
     Attributes:
         description (str): A description of the field.
 
+    Values are allocated per parent from ``shop.models.OrderCounter``. The
+    uniqueness itself must be declared as a ``UniqueConstraint`` on
+    ``(unique_for_field, order)`` in the model's ``Meta``.
+
     Example:
         class MyModel(models.Model):
             order = OrderField(unique_for_field='category')
@@ -68,32 +78,144 @@ class OrderField(models.PositiveIntegerField):
             ]
         return []
 
-    def pre_save(self, model_instance, add):
+    @property
+    def counter_scope(self):
         """
-            Calculate the value of field based on previous values
-        
-        """
-
-        if getattr(model_instance, self.attname) is None:
-            qs = self.model.objects.all() #type: ignore
-            try:
-                query = {
-                    self.unique_for_field: getattr(
-                        model_instance, self.unique_for_field
-                    )
-                }
-                qs = qs.filter(**query)
-                last_item = qs.latest(self.attname)
-                value = last_item.order + 1
-            except ObjectDoesNotExist:
-                value = 1
-            return value
-        else:
+        Returns the name under which the counters of this field are stored.
+        """
+        return f"{self.model._meta.label_lower}.{self.attname}"  # noqa: SLF001
 
-            return super().pre_save(model_instance, add)
+    def allocate(self, counts, using=DEFAULT_DB_ALIAS):
+        """
+        Reserve consecutive order values for one or more parents.
 
+        The counters live in ``OrderCounter``, one row per parent, and are
+        bumped with a single ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``
+        statement. The row lock taken by the upsert serializes concurrent
+        writers of the same parent only, and values are never handed out
+        twice, so no ``MAX(order)`` scan is needed.
 
+        Args:
+            counts (dict): Parent id to the number of values to reserve.
+            using (str): Database alias.
 
+        Returns:
+            dict: Parent id to the first reserved value; the values of a
+                parent are ``first .. first + count - 1``.
+        """
+        counts = {parent: n for parent, n in counts.items() if n > 0}
+        if not counts:
+            return {}
+        table = apps.get_model("shop", "OrderCounter")._meta.db_table  # noqa: SLF001
+        rows = ", ".join(["(%s, %s, %s)"] * len(counts))
+        params = [
+            value
+            for parent, n in sorted(counts.items())
+            for value in (self.counter_scope, parent, n)
+        ]
+        sql = (
+            f"INSERT INTO {table} AS c (scope, parent_id, last) VALUES {rows} "  # noqa: S608
+            "ON CONFLICT (scope, parent_id) "
+            "DO UPDATE SET last = c.last + EXCLUDED.last "
+            "RETURNING parent_id, last"
+        )
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, params)
+            return {parent: last - counts[parent] + 1 for parent, last in cursor}
+
+    def advance(self, values, using=DEFAULT_DB_ALIAS):
+        """
+        Move the counters of one or more parents past explicit values, in a
+        single statement.
 
+        Values set by hand (an admin inline, a fixture) never go through
+        ``allocate``; the counter is raised to them with ``GREATEST`` in the
+        same kind of upsert, so the next allocated value does not collide.
 
+        Args:
+            values (dict): Parent id to an order value already in use.
+            using (str): Database alias.
+        """
+        if not values:
+            return
+        table = apps.get_model("shop", "OrderCounter")._meta.db_table  # noqa: SLF001
+        rows = ", ".join(["(%s, %s, %s)"] * len(values))
+        params = [
+            value
+            for parent, last in sorted(values.items())
+            for value in (self.counter_scope, parent, last)
+        ]
+        sql = (
+            f"INSERT INTO {table} AS c (scope, parent_id, last) VALUES {rows} "  # noqa: S608
+            "ON CONFLICT (scope, parent_id) "
+            "DO UPDATE SET last = GREATEST(c.last, EXCLUDED.last)"
+        )
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, params)
+
+    @property
+    def counted_attr(self):
+        """
+        Returns the instance attribute flagging a value already accounted for
+        in the counters, see ``assign``.
+        """
+        return f"_{self.attname}_counted"
+
+    def assign(self, instances, using=DEFAULT_DB_ALIAS):
+        """
+        Prepare unsaved instances for ``bulk_create``.
+
+        Unset values are allocated with one ``allocate`` statement and the
+        counters are moved past the explicit ones with one ``advance``
+        statement, whatever the number of instances and parents. The
+        instances are flagged so ``pre_save``, which ``bulk_create`` calls
+        per row, does not touch the counters again.
+
+        Args:
+            instances (list[Model]): Unsaved instances of the model.
+            using (str): Database alias.
+        """
+        parent_attname = self.model._meta.get_field(self.unique_for_field).attname  # noqa: SLF001
+        missing = Counter()
+        explicit = {}
+        for instance in instances:
+            parent = getattr(instance, parent_attname)
+            value = getattr(instance, self.attname)
+            if value is None:
+                missing[parent] += 1
+            else:
+                explicit[parent] = max(explicit.get(parent, 0), value)
+        first = self.allocate(missing, using=using)
+        self.advance(explicit, using=using)
+        values = {parent: count(start) for parent, start in first.items()}
+        for instance in instances:
+            if getattr(instance, self.attname) is None:
+                parent = getattr(instance, parent_attname)
+                setattr(instance, self.attname, next(values[parent]))
+            setattr(instance, self.counted_attr, True)
+
+    def pre_save(self, model_instance, add):
+        """
+            Allocate the next value from the parent's counter when unset, or,
+            on insert, advance the counter past an explicit value.
 
+            Updates and instances prepared by ``assign`` leave the counters
+            alone. See ``allocate`` and ``advance``.
+        """
+        value = getattr(model_instance, self.attname)
+        if value is not None and (
+            not add or getattr(model_instance, self.counted_attr, False)
+        ):
+            return super().pre_save(model_instance, add)
+        parent_field = self.model._meta.get_field(self.unique_for_field)  # noqa: SLF001
+        parent = getattr(model_instance, parent_field.attname)
+        using = model_instance._state.db or router.db_for_write(  # noqa: SLF001
+            self.model,
+            instance=model_instance,
+        )
+        if value is None:
+            value = self.allocate({parent: 1}, using=using)[parent]
+            setattr(model_instance, self.attname, value)
+            return value
+        self.advance({parent: value}, using=using)
+        return super().pre_save(model_instance, add)
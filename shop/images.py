@@ -0,0 +1,186 @@
+"""
+Responsive derivatives of product images.
+
+``build_image_variants`` renders every original at the widths of
+``SHOP_IMAGE_WIDTHS`` in the formats of ``SHOP_IMAGE_FORMATS`` supported by
+the installed Pillow (AVIF needs ``pillow-avif-plugin``) and records their
+names in ``ProductImage.variants``. It runs in Celery, triggered by the
+``ProductImage`` receiver in ``shop.signals`` with every image saved in a
+transaction, so requests only ever read the stored names.
+``build_images_variants`` refreshes the documents of each product once,
+however many of its images were rendered.
+
+Derivatives of one image are rendered by threads: Pillow releases the GIL
+while resizing and encoding, and Celery prefork workers are daemonic
+processes, which may not start a process pool of their own. The
+``build_image_variants`` command, run outside Celery, spreads the images
+over a process pool instead.
+
+Derivative names start with a hash of the original bytes and the encoder
+settings: a name always designates the same bytes and can be cached forever,
+and a new upload or quality setting gets new names.
+"""
+
+# Stdlib imports
+import contextlib
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+# Core Django imports
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Third-party app imports
+from PIL import Image
+from PIL import ImageOps
+
+# Imports from apps
+from shop.models import ProductImage
+
+with contextlib.suppress(ImportError):
+    import pillow_avif  # noqa: F401
+
+VARIANTS_DIR = "products/variants"
+
+
+def supported_formats():
+    """
+    Returns the configured formats Pillow can encode.
+    """
+    Image.init()
+    return [fmt for fmt in settings.SHOP_IMAGE_FORMATS if fmt.upper() in Image.SAVE]
+
+
+def render_variant(data, width, fmt, quality):
+    """
+    Returns ``data`` resized to ``width`` pixels and encoded as ``fmt``.
+
+    Args:
+        data (bytes): The original image.
+        width (int): Target width, the height keeps the aspect ratio.
+        fmt (str): Pillow format name, e.g. ``"webp"``.
+        quality (int): Encoder quality.
+
+    Returns:
+        bytes: The encoded derivative.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, fmt.upper(), quality=quality)
+        return output.getvalue()
+
+
+def variant_widths(data):
+    """
+    Returns the configured widths below the width of ``data``, or the
+    original width when it is smaller than all of them. Images are never
+    upscaled.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        width = ImageOps.exif_transpose(original).width
+    widths = [w for w in settings.SHOP_IMAGE_WIDTHS if w < width]
+    return widths or [width]
+
+
+def build_image_variants(image_id, threads=None, *, refresh=True):
+    """
+    Render and store the derivatives of one product image.
+
+    Derivatives already in storage are not rendered again. They are
+    rendered by a thread pool of ``threads`` (``SHOP_IMAGE_THREADS`` by
+    default), see the module docstring.
+
+    Args:
+        image_id (int): The ``ProductImage`` id.
+        threads (int, optional): Size of the rendering pool.
+        refresh (bool): Refresh the documents of the image's product. Pass
+            False when rendering several images and refresh their products
+            once afterwards.
+
+    Returns:
+        dict: The new ``variants`` value, empty when the image has no file.
+    """
+    row = (
+        ProductImage.objects.filter(pk=image_id)
+        .values_list("image_url", "product_line__product_id")
+        .first()
+    )
+    if row is None or not row[0]:
+        return {}
+    source, product_id = row
+    with default_storage.open(source, "rb") as file:
+        data = file.read()
+
+    quality = settings.SHOP_IMAGE_QUALITY
+    digest = hashlib.sha256(data + f":{quality}".encode()).hexdigest()[:20]
+
+    def render(job):
+        width, fmt = job
+        name = f"{VARIANTS_DIR}/{digest[:2]}/{digest}-{width}w.{fmt}"
+        if not default_storage.exists(name):
+            content = ContentFile(render_variant(data, width, fmt, quality))
+            name = default_storage.save(name, content)
+        return fmt, width, name
+
+    jobs = [(w, fmt) for fmt in supported_formats() for w in variant_widths(data)]
+    with ThreadPoolExecutor(threads or settings.SHOP_IMAGE_THREADS) as pool:
+        rendered = list(pool.map(render, jobs))
+
+    formats = {}
+    for fmt, width, name in rendered:
+        formats.setdefault(fmt, {})[str(width)] = name
+    variants = {"source": source, "formats": formats}
+    ProductImage.objects.filter(pk=image_id, image_url=source).update(variants=variants)
+
+    if refresh:
+        # shop.signals imports this module through the serializers.
+        from shop.signals import refresh_documents
+
+        refresh_documents([product_id])
+    return variants
+
+
+def build_images_variants(image_ids, threads=None):
+    """
+    Render the derivatives of several product images, then refresh the
+    documents of their products once.
+
+    Args:
+        image_ids (Iterable[int]): The ``ProductImage`` ids.
+        threads (int, optional): Size of the rendering pool of each image.
+
+    Returns:
+        int: The number of images with derivatives.
+    """
+    from shop.signals import refresh_documents
+
+    image_ids = list(image_ids)
+    built = sum(
+        bool(build_image_variants(image_id, threads, refresh=False))
+        for image_id in image_ids
+    )
+    refresh_documents(
+        ProductImage.objects.filter(pk__in=image_ids).values_list(
+            "product_line__product_id",
+            flat=True,
+        ),
+    )
+    return built
+
+
+def srcset(variants):
+    """
+    Returns the public URLs of ``variants`` by format and width, e.g.
+    ``{"webp": {"320": "https://.../ab12-320w.webp"}}``.
+    """
+    return {
+        fmt: {width: default_storage.url(name) for width, name in widths.items()}
+        for fmt, widths in (variants or {}).get("formats", {}).items()
+    }
@@ -0,0 +1,187 @@
+# Stdlib imports
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextlib import contextmanager
+
+# Core Django imports
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
+
+logger = logging.getLogger("shop.queries")
+
+
+class QueryStats:
+    """
+    Aggregated query statistics for a block of code.
+
+    Attributes:
+        count (int): Number of statements executed.
+        duration (float): Total time spent in the database, in seconds.
+        statements (Counter): Executed SQL grouped by statement text.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    @property
+    def duplicates(self):
+        """
+        Returns the number of statements that were executed more than once.
+        """
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: PLR0913
+        """
+        Execute wrapper recording the statement and its duration.
+
+        See https://docs.djangoproject.com/en/4.2/topics/db/instrumentation/
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def as_headers(self):
+        """
+        Returns the statistics as a dict of HTTP response headers.
+        """
+        return {
+            "X-DB-Query-Count": str(self.count),
+            "X-DB-Query-Time": f"{self.duration * 1000:.2f}",
+            "X-DB-Duplicate-Queries": str(self.duplicates),
+        }
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dict suitable for structured logging.
+        """
+        return {
+            "db_query_count": self.count,
+            "db_query_time_ms": round(self.duration * 1000, 2),
+            "db_duplicate_queries": self.duplicates,
+        }
+
+
+@contextmanager
+def track_queries(using=None):
+    """
+    Count queries, database time and duplicate statements inside the block.
+
+    Unlike ``connection.queries`` this works with ``DEBUG = False`` and keeps
+    no per-statement history besides the statement text.
+
+    Args:
+        using (str | list, optional): Database alias or aliases to track.
+            Defaults to the default database.
+
+    Yields:
+        QueryStats: The statistics, filled in as the block runs.
+
+    Example:
+        with track_queries() as stats:
+            Product.objects.count()
+        assert stats.count == 1
+    """
+    if using is None:
+        using = [DEFAULT_DB_ALIAS]
+    elif isinstance(using, str):
+        using = [using]
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for alias in using:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Report per-request query statistics.
+
+    Disabled unless ``SHOP_QUERY_INSTRUMENTATION`` is set, in which case
+    Django drops the middleware at startup and requests pay nothing.
+    ``SHOP_QUERY_INSTRUMENTATION_EXPORT`` selects where the statistics go:
+    ``"headers"``, ``"log"`` or both.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SHOP_QUERY_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        export = getattr(settings, "SHOP_QUERY_INSTRUMENTATION_EXPORT", ["headers"])
+        self.export_headers = "headers" in export
+        self.export_log = "log" in export
+
+    def __call__(self, request):
+        with track_queries(using=list(connections)) as stats:
+            response = self.get_response(request)
+        if self.export_headers:
+            for header, value in stats.as_headers().items():
+                response[header] = value
+        if self.export_log:
+            logger.info(
+                "%s %s",
+                request.method,
+                request.path,
+                extra={
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    **stats.as_dict(),
+                },
+            )
+        return response
+
+
+class QueryBudgetExceeded(Exception):  # noqa: N818
+    """
+    Raised when a view action runs more queries than its budget allows.
+    """
+
+
+class QueryBudgetMixin:
+    """
+    Enforce a maximum number of queries per viewset action.
+
+    ``query_budgets`` maps action names to the number of queries the action
+    may run, independent of the number of rows involved. What happens when
+    an action goes over its budget depends on ``SHOP_QUERY_BUDGET_MODE``:
+    ``"raise"`` raises ``QueryBudgetExceeded`` (tests), ``"log"`` logs a
+    warning on the ``shop.queries`` logger (production alerting) and
+    ``"off"`` skips the tracking altogether.
+    """
+
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        mode = getattr(settings, "SHOP_QUERY_BUDGET_MODE", "off")
+        action = getattr(self, "action_map", {}).get(request.method.lower())
+        budget = self.query_budgets.get(action)
+        if mode == "off" or budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        with track_queries(using=list(connections)) as stats:
+            response = super().dispatch(request, *args, **kwargs)
+        if stats.count > budget:
+            name = f"{type(self).__name__}.{action}"
+            msg = f"{name} ran {stats.count} queries, budget is {budget}"
+            if mode == "raise":
+                raise QueryBudgetExceeded(msg)
+            logger.warning(
+                msg,
+                extra={
+                    "view": name,
+                    "path": request.path,
+                    "budget": budget,
+                    **stats.as_dict(),
+                },
+            )
+        return response
@@ -0,0 +1,96 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from shop.benchmarks import runner
+from shop.documents import rebuild_product_documents
+from shop.facets import rebuild_facet_index
+from shop.tests.factories import create_catalog
+
+
+class Rollback(Exception):  # noqa: N818
+    """Raised to discard the seeded catalog."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog, benchmark the shop read endpoints and compare "
+        "the results against the stored baseline. Run against a disposable "
+        "database: the catalog is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--depth", type=int, default=3)
+        parser.add_argument("--fanout", type=int, default=3)
+        parser.add_argument("--products", type=int, default=20)
+        parser.add_argument("--lines", type=int, default=3)
+        parser.add_argument("--images", type=int, default=2)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=runner.DEFAULT_TOLERANCE,
+            help="Allowed relative latency/allocation growth.",
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the response cache enabled (measures cache hits).",
+        )
+        parser.add_argument("--baseline", default=str(runner.BASELINE_PATH))
+        parser.add_argument(
+            "--record",
+            "--save-baseline",
+            action="store_true",
+            dest="record",
+            help="Store the results as the new baseline instead of comparing.",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if not options["record"]:
+            baseline = runner.load_baseline(options["baseline"])
+            if baseline is None:
+                msg = f"No baseline at {options['baseline']}, create one with --record."
+                raise CommandError(msg)
+        results = {}
+        try:
+            with transaction.atomic():
+                catalog = create_catalog(
+                    depth=options["depth"],
+                    fanout=options["fanout"],
+                    products_per_category=options["products"],
+                    lines_per_product=options["lines"],
+                    images_per_line=options["images"],
+                )
+                rebuild_product_documents(p.id for p in catalog["products"])
+                rebuild_facet_index(c.id for c in catalog["categories"])
+                root = catalog["categories"][0]
+                endpoints = {
+                    "retrieve": f"/api/product/{catalog['products'][0].slug}/",
+                    "list_product_by_category_slug": (
+                        f"/api/product/category/{root.slug}/"
+                    ),
+                    "list_product_by_category_slug_subtree": (
+                        f"/api/product/category/{root.slug}/?descendants=true"
+                    ),
+                    "category_list": "/api/categories/",
+                }
+                with override_settings(SHOP_RESPONSE_CACHE=options["cache"]):
+                    results = runner.run(endpoints, options["iterations"])
+                raise Rollback  # noqa: TRY301
+        except Rollback:
+            pass
+
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+        if options["record"]:
+            runner.save_baseline(results, options["baseline"])
+            self.stdout.write(self.style.SUCCESS("Baseline saved."))
+            return
+        regressions = runner.compare(results, baseline, options["tolerance"])
+        if regressions:
+            raise CommandError("Regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions."))
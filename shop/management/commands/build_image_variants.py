@@ -0,0 +1,52 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from shop.images import build_image_variants
+from shop.models import ProductImage
+from shop.signals import refresh_documents
+
+# Images rendered between two refreshes of their products' documents.
+CHUNK_SIZE = 1000
+
+
+def _build(image_id):
+    return bool(build_image_variants(image_id, threads=1, refresh=False))
+
+
+class Command(BaseCommand):
+    help = "Render the responsive derivatives of product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of rendering processes, defaults to the CPU count.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only images without derivatives.",
+        )
+
+    def handle(self, *args, **options):
+        images = ProductImage.objects.exclude(image_url="").order_by("id")
+        if options["missing"]:
+            images = images.filter(variants={})
+        ids = list(images.values_list("id", flat=True))
+        built = 0
+        with ProcessPoolExecutor(options["workers"]) as pool:
+            for start in range(0, len(ids), CHUNK_SIZE):
+                chunk = ids[start : start + CHUNK_SIZE]
+                # Forked workers must open their own connections.
+                connections.close_all()
+                built += sum(pool.map(_build, chunk, chunksize=16))
+                refresh_documents(
+                    ProductImage.objects.filter(pk__in=chunk).values_list(
+                        "product_line__product_id",
+                        flat=True,
+                    ),
+                )
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives of {built} images."))
@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from shop.catalog_export import CHUNK_SIZE
+from shop.catalog_export import WRITERS
+from shop.catalog_export import export_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Export every product line to a CSV or JSON Lines file readable by "
+        "import_catalog, streaming in constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Output file, - for standard output.")
+        parser.add_argument(
+            "--format",
+            choices=list(WRITERS),
+            help="File format, guessed from the extension by default.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Number of product lines fetched per round trip.",
+        )
+        parser.add_argument(
+            "--database",
+            help="Database alias to read from, the shop read database by default.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        chunks = WRITERS[fmt](
+            export_rows(options["chunk_size"], using=options["database"]),
+        )
+        try:
+            if path == "-":
+                sys.stdout.buffer.writelines(chunks)
+                return
+            with open(path, "wb") as file:  # noqa: PTH123
+                file.writelines(chunks)
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(f"Exported the catalog to {path}."))
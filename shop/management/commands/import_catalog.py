@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+
+from shop.catalog_import import CatalogImportError
+from shop.catalog_import import import_catalog
+
+
+class Command(BaseCommand):
+    help = "Import product lines from a CSV or JSON Lines file in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON Lines file.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="File format, guessed from the extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows written per batch.",
+        )
+        parser.add_argument(
+            "--no-refresh",
+            action="store_true",
+            help=(
+                "Do not rebuild documents, facets and caches after each batch. "
+                "Run rebuild_product_documents, rebuild_facet_index and "
+                "rebuild_search_vectors afterwards."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = import_catalog(
+                options["path"],
+                fmt=options["format"],
+                batch_size=options["batch_size"],
+                refresh=not options["no_refresh"],
+            )
+        except (OSError, IntegrityError, CatalogImportError) as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Imported {lines} product lines, {products} new products, "
+                "skipped {skipped} rows in {batches} batches.".format(**stats),
+            ),
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from shop.facets import rebuild_facet_index
+from shop.models import Category
+
+
+class Command(BaseCommand):
+    help = "Rebuild the attribute facet index of every category."
+
+    def handle(self, *args, **options):
+        category_ids = list(Category.objects.values_list("id", flat=True))
+        for category_id in category_ids:
+            rebuild_facet_index([category_id])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt facets of {len(category_ids)} categories."),
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from shop.documents import rebuild_price_ranges
+from shop.documents import rebuild_product_cards
+from shop.documents import rebuild_product_documents
+from shop.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the precomputed product documents served by the detail endpoint, "
+        "and the listing cards and price ranges of the category and search "
+        "endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of products rebuilt per batch.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        ids = Product.objects.order_by("id").values_list("id", flat=True)
+        batch = []
+        total = 0
+        for product_id in ids.iterator(chunk_size=batch_size):
+            batch.append(product_id)
+            if len(batch) == batch_size:
+                total += rebuild_product_documents(batch)
+                rebuild_product_cards(batch)
+                rebuild_price_ranges(batch)
+                batch = []
+        total += rebuild_product_documents(batch)
+        rebuild_product_cards(batch)
+        rebuild_price_ranges(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {total} product documents and cards."),
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from shop.models import Product
+from shop.search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute the full-text search vectors of every product."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of products updated per statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        ids = Product.objects.order_by("id").values_list("id", flat=True)
+        batch = []
+        total = 0
+        for product_id in ids.iterator(chunk_size=batch_size):
+            batch.append(product_id)
+            if len(batch) == batch_size:
+                total += rebuild_search_vectors(batch)
+                batch = []
+        total += rebuild_search_vectors(batch)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} search vectors."))
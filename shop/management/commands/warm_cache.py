@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from shop.warmup import get_access_stats
+from shop.warmup import warm_hot_pages
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the most requested product and category pages into the response "
+        "cache, e.g. after a deploy or a cache flush."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=settings.SHOP_WARMUP_PAGES,
+            help="Number of hot pages to render.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SHOP_WARMUP_BATCH_SIZE,
+            help="Number of pages rendered per parallel batch.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.SHOP_WARMUP_WORKERS,
+            help="Number of threads per batch.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=settings.SHOP_WARMUP_RATE,
+            help="Maximum pages per second, 0 for no limit.",
+        )
+
+    def handle(self, *args, **options):
+        if get_access_stats() is None:
+            msg = "Access statistics are disabled, set SHOP_ACCESS_STATS_REDIS_URL."
+            raise CommandError(msg)
+        warmed = warm_hot_pages(
+            options["pages"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            rate=options["rate"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Warmed {warmed} pages."))
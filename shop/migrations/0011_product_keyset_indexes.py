@@ -0,0 +1,26 @@
+# Generated by Django 4.2.10 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0010_productdocument"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "-created", "-id"],
+                name="shop_prod_cat_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "name", "id"], name="shop_prod_cat_name_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.10 on 2026-10-17 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0011_product_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["tree_id", "lft"],
+                include=["id", "rght"],
+                name="shop_cat_tree_lft_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.10 on 2026-10-17 11:20
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0012_category_tree_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FacetIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("attribute_name", models.CharField(max_length=120)),
+                ("value", models.CharField(max_length=100)),
+                (
+                    "product_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.BigIntegerField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "attribute_value",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="facets",
+                        to="shop.attributevalue",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="facets",
+                        to="shop.category",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="facetindex",
+            constraint=models.UniqueConstraint(
+                fields=("category", "attribute_value"),
+                name="shop_facet_category_value_uniq",
+            ),
+        ),
+    ]
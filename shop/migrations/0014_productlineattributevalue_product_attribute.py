@@ -0,0 +1,80 @@
+# Generated by Django 4.2.10 on 2026-10-17 12:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+FILL_PRODUCT_ATTRIBUTE = """
+UPDATE shop_productlineattributevalue AS plav
+SET product_attribute_id = av.product_attribute_id
+FROM shop_attributevalue AS av
+WHERE av.id = plav.attribute_value_id;
+"""
+
+CREATE_TRIGGERS = """
+CREATE FUNCTION shop_plav_set_product_attribute() RETURNS trigger AS $$
+BEGIN
+    SELECT product_attribute_id INTO NEW.product_attribute_id
+    FROM shop_attributevalue WHERE id = NEW.attribute_value_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER shop_plav_set_product_attribute
+BEFORE INSERT OR UPDATE OF attribute_value_id, product_attribute_id
+ON shop_productlineattributevalue
+FOR EACH ROW EXECUTE FUNCTION shop_plav_set_product_attribute();
+
+CREATE FUNCTION shop_av_sync_product_attribute() RETURNS trigger AS $$
+BEGIN
+    UPDATE shop_productlineattributevalue
+    SET product_attribute_id = NEW.product_attribute_id
+    WHERE attribute_value_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER shop_av_sync_product_attribute
+AFTER UPDATE OF product_attribute_id ON shop_attributevalue
+FOR EACH ROW WHEN (OLD.product_attribute_id IS DISTINCT FROM NEW.product_attribute_id)
+EXECUTE FUNCTION shop_av_sync_product_attribute();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS shop_av_sync_product_attribute ON shop_attributevalue;
+DROP FUNCTION IF EXISTS shop_av_sync_product_attribute();
+DROP TRIGGER IF EXISTS shop_plav_set_product_attribute
+    ON shop_productlineattributevalue;
+DROP FUNCTION IF EXISTS shop_plav_set_product_attribute();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0013_facetindex"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productlineattributevalue",
+            name="product_attribute",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="through_pl_av",
+                to="shop.productattribute",
+            ),
+        ),
+        migrations.RunSQL(FILL_PRODUCT_ATTRIBUTE, migrations.RunSQL.noop),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.AddConstraint(
+            model_name="productlineattributevalue",
+            constraint=models.UniqueConstraint(
+                fields=("product_line", "product_attribute"),
+                name="shop_plav_line_attribute_uniq",
+                violation_error_message="Duplicate attribute exists",
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.10 on 2026-10-17 13:10
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+FILL_COUNTERS = """
+INSERT INTO shop_ordercounter (scope, parent_id, last)
+SELECT 'shop.productline.order', product_id, MAX("order")
+FROM shop_productline GROUP BY product_id
+UNION ALL
+SELECT 'shop.productimage.order', product_line_id, MAX("order")
+FROM shop_productimage GROUP BY product_line_id;
+"""
+
+
+def renumber_duplicates(apps, schema_editor):
+    """
+    Move rows sharing an order with a sibling to the end of their parent, so
+    the unique constraints below can be added. The lowest id keeps its value.
+    """
+    for model_name, parent in (
+        ("ProductLine", "product_id"),
+        ("ProductImage", "product_line_id"),
+    ):
+        model = apps.get_model("shop", model_name)
+        duplicates = (
+            model.objects.values(parent, "order")
+            .annotate(n=Count("id"))
+            .filter(n__gt=1)
+        )
+        for duplicate in duplicates:
+            siblings = model.objects.filter(**{parent: duplicate[parent]})
+            last = siblings.aggregate(last=Max("order"))["last"]
+            rows = siblings.filter(order=duplicate["order"]).order_by("id")[1:]
+            for row in rows:
+                last += 1
+                row.order = last
+                row.save(update_fields=["order"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0014_productlineattributevalue_product_attribute"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("scope", models.CharField(max_length=100)),
+                ("parent_id", models.BigIntegerField()),
+                ("last", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="ordercounter",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "parent_id"), name="shop_ordercounter_uniq"
+            ),
+        ),
+        migrations.RunPython(renumber_duplicates, migrations.RunPython.noop),
+        migrations.RunSQL(FILL_COUNTERS, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="productline",
+            constraint=models.UniqueConstraint(
+                fields=("product", "order"),
+                name="shop_productline_product_order_uniq",
+                violation_error_message="Duplicate value.",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="productimage",
+            constraint=models.UniqueConstraint(
+                fields=("product_line", "order"),
+                name="shop_productimage_line_order_uniq",
+                violation_error_message="Duplicate value.",
+            ),
+        ),
+    ]
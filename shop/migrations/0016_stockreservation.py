@@ -0,0 +1,58 @@
+# Generated by Django 4.2.10 on 2026-10-17 14:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0015_ordercounter_and_order_constraints"),
+    ]
+
+    operations = [
+        # Rows oversold before the constraint existed would fail it.
+        migrations.RunSQL(
+            "UPDATE shop_productline SET stock_qty = 0 WHERE stock_qty < 0",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="productline",
+            constraint=models.CheckConstraint(
+                check=models.Q(stock_qty__gte=0),
+                name="shop_productline_stock_qty_gte_0",
+            ),
+        ),
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.UUIDField(db_index=True)),
+                ("quantity", models.PositiveIntegerField()),
+                ("expires", models.DateTimeField(db_index=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "product_line",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="shop.productline",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="stockreservation",
+            constraint=models.UniqueConstraint(
+                fields=("token", "product_line"), name="shop_reservation_line_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.10 on 2026-10-17 14:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def suffix_duplicate_skus(apps, schema_editor):
+    """
+    Rename product lines sharing a SKU to ``<sku>-<id>``, cut to fit the
+    100 characters of the column, so the unique constraint below can be
+    added. The lowest id keeps the SKU.
+    """
+    ProductLine = apps.get_model("shop", "ProductLine")
+    duplicates = (
+        ProductLine.objects.values("sku")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("sku", flat=True)
+    )
+    for sku in duplicates:
+        rows = ProductLine.objects.filter(sku=sku).order_by("id")[1:]
+        for row in rows:
+            suffix = f"-{row.id}"
+            new_sku = sku[: 100 - len(suffix)] + suffix
+            if ProductLine.objects.filter(sku=new_sku).exists():
+                raise RuntimeError(
+                    f"Cannot rename duplicate SKU {sku!r} of product line "
+                    f"{row.id} to {new_sku!r}, which is taken. Rename it "
+                    "by hand and migrate again."
+                )
+            row.sku = new_sku
+            row.save(update_fields=["sku"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0016_stockreservation"),
+    ]
+
+    operations = [
+        migrations.RunPython(suffix_duplicate_skus, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="productline",
+            name="shop_produc_sku_2ad1fa_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="productline",
+            constraint=models.UniqueConstraint(
+                fields=("sku",), name="shop_productline_sku_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.10 on 2026-10-17 15:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Same vector as shop.search.SEARCH_VECTOR_SQL, for every product. Weights:
+# name A, category name B, attribute values C, description D.
+BACKFILL_SQL = """
+UPDATE shop_product p
+SET search_vector =
+    setweight(to_tsvector(%(config)s::regconfig, p.name), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(
+        (SELECT c.name FROM shop_category c WHERE c.id = p.category_id), ''
+    )), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+        SELECT string_agg(DISTINCT v.value, ' ')
+        FROM shop_attributevalue v
+        WHERE v.id IN (
+            SELECT lv.attribute_value_id
+            FROM shop_productlineattributevalue lv
+            JOIN shop_productline l ON l.id = lv.product_line_id
+            WHERE l.product_id = p.id
+            UNION
+            SELECT pv.attribute_value_id
+            FROM shop_productattributevalue pv
+            WHERE pv.product_id = p.id
+        )
+    ), '')), 'C')
+    || setweight(to_tsvector(%(config)s::regconfig, p.description), 'D')
+"""
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """
+    Index the existing products, new writes go through the signals.
+    """
+    config = getattr(settings, "SHOP_SEARCH_CONFIG", "english")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(BACKFILL_SQL, {"config": config})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0017_productline_sku_uniq"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="shop_prod_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="shop_prod_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.10 on 2026-10-17 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0020_productcard"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="productline",
+            options={},
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="min_price",
+            field=models.DecimalField(
+                decimal_places=2, editable=False, max_digits=30, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="max_price",
+            field=models.DecimalField(
+                decimal_places=2, editable=False, max_digits=30, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "min_price", "id"], name="shop_prod_cat_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "-max_price", "-id"],
+                name="shop_prod_cat_price_desc_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.10 on 2026-10-17 19:05
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0021_product_price_range"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="facetindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["product_ids"], name="shop_facet_product_ids_idx"
+            ),
+        ),
+    ]
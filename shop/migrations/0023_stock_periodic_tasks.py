@@ -0,0 +1,53 @@
+# Generated by Django 4.2.10 on 2026-10-17 19:30
+
+from django.db import migrations
+from django.utils import timezone
+
+# Beat entries of the stock tasks, see shop.tasks: name, task, minutes.
+PERIODIC_TASKS = [
+    (
+        "Release expired stock reservations",
+        "shop.tasks.release_expired_reservations_task",
+        1,
+    ),
+    (
+        "Reconcile stock leases",
+        "shop.tasks.reconcile_stock_leases_task",
+        5,
+    ),
+]
+
+
+def add_periodic_tasks(apps, schema_editor):
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTasks = apps.get_model("django_celery_beat", "PeriodicTasks")
+    for name, task, minutes in PERIODIC_TASKS:
+        schedule, _ = IntervalSchedule.objects.get_or_create(
+            every=minutes, period="minutes"
+        )
+        PeriodicTask.objects.get_or_create(
+            name=name, defaults={"task": task, "interval": schedule}
+        )
+    # Historical models send no signals, tell the DatabaseScheduler directly.
+    PeriodicTasks.objects.update_or_create(
+        ident=1, defaults={"last_update": timezone.now()}
+    )
+
+
+def remove_periodic_tasks(apps, schema_editor):
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    names = [name for name, _, _ in PERIODIC_TASKS]
+    PeriodicTask.objects.filter(name__in=names).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0022_facetindex_product_ids_idx"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_periodic_tasks, remove_periodic_tasks),
+    ]
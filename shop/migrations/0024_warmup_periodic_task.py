@@ -0,0 +1,43 @@
+# Generated by Django 4.2.10 on 2026-10-17 19:45
+
+from django.db import migrations
+from django.utils import timezone
+
+NAME = "Warm the cache with the hottest catalog pages"
+
+# More often than SHOP_CACHE_TIMEOUT (5 minutes by default), see shop.warmup.
+EVERY_MINUTES = 4
+
+
+def add_periodic_task(apps, schema_editor):
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTasks = apps.get_model("django_celery_beat", "PeriodicTasks")
+    schedule, _ = IntervalSchedule.objects.get_or_create(
+        every=EVERY_MINUTES, period="minutes"
+    )
+    PeriodicTask.objects.get_or_create(
+        name=NAME,
+        defaults={"task": "shop.tasks.warm_cache_task", "interval": schedule},
+    )
+    # Historical models send no signals, tell the DatabaseScheduler directly.
+    PeriodicTasks.objects.update_or_create(
+        ident=1, defaults={"last_update": timezone.now()}
+    )
+
+
+def remove_periodic_task(apps, schema_editor):
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(name=NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0023_stock_periodic_tasks"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_periodic_task, remove_periodic_task),
+    ]
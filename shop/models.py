@@ -2,6 +2,10 @@
 import uuid
 
 # Core Django imports
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -26,6 +30,29 @@ class ActiveQueryset(models.QuerySet):
         return self.filter(active=True)
 
 
+class ProductQueryset(ActiveQueryset):
+    """
+        Custom queryset for products.
+    """
+    def in_category(self, slug, *, descendants=False):
+        """
+            Returns the products of the category with the given slug.
+
+            With ``descendants`` the products of the whole subtree are
+            returned, selected with the MPTT range predicate
+            ``tree_id = node.tree_id AND lft BETWEEN node.lft AND node.rght``
+            so the subtree is resolved by the database in the same statement.
+        """
+        if not descendants:
+            return self.filter(category__slug=slug)
+        node = Category.objects.filter(slug=slug)
+        return self.filter(
+            category__tree_id=models.Subquery(node.values("tree_id")[:1]),
+            category__lft__gte=models.Subquery(node.values("lft")[:1]),
+            category__lft__lte=models.Subquery(node.values("rght")[:1]),
+        )
+
+
 class Category(TimeStampedModel, MPTTModel):
     """
     Category class model.
@@ -47,6 +74,12 @@ class Category(TimeStampedModel, MPTTModel):
         ordering = ["name"]
         indexes = [
             models.Index(fields=["name"]),
+            # Subtree lookups, see ProductQueryset.in_category.
+            models.Index(
+                fields=["tree_id", "lft"],
+                include=["id", "rght"],
+                name="shop_cat_tree_lft_idx",
+            ),
         ]
         verbose_name = "category"
         verbose_name_plural = "categories"
@@ -74,6 +107,7 @@ class ProductImage(TimeStampedModel):
 
     Attributes:
         image_url (ImageField): The URL of the product image. Images are uploaded to a directory structure by date.
+        variants (JSONField): Names of the resized WebP/AVIF derivatives.
         alt_text (CharField): Alternative text for the image for accessibility purposes.
         product_line (ForeignKey): A foreign key reference to the related ProductLine model.
 
@@ -85,6 +119,18 @@ class ProductImage(TimeStampedModel):
         "ProductLine", related_name="images", on_delete=models.CASCADE
     )
     order = OrderField(unique_for_field="product_line",blank=True)
+    # Responsive derivatives, maintained by shop.images.build_image_variants:
+    # {"source": <original name>, "formats": {<format>: {<width>: <name>}}}.
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product_line", "order"],
+                name="shop_productimage_line_order_uniq",
+                violation_error_message="Duplicate value.",
+            ),
+        ]
 
     def clean(self):
         """
@@ -93,10 +139,13 @@ class ProductImage(TimeStampedModel):
         Raises:
             ValidationError: If the 'order' value is not unique within a product line.
         """
-        qs = ProductImage.objects.filter(product_line=self.product_line)
-        for obj in qs:
-            if self.id != obj.id and self.order == obj.order:
-                raise ValidationError("Duplicate value.")
+        if self.order is None:
+            return
+        qs = ProductImage.objects.filter(
+            product_line_id=self.product_line_id, order=self.order,
+        ).exclude(pk=self.pk)
+        if qs.exists():
+            raise ValidationError("Duplicate value.")
 
     def save(self, *args, **kwargs):
         """
@@ -135,7 +184,17 @@ class Product(TimeStampedModel):
         through="ProductAttributeValue",
         related_name="product_attr_value",
     )
-    objects = ActiveQueryset.as_manager()
+    # Maintained by shop.search.rebuild_search_vectors.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Price range of the active lines, maintained by
+    # shop.documents.rebuild_price_ranges.
+    min_price = models.DecimalField(
+        decimal_places=2, max_digits=30, null=True, editable=False,
+    )
+    max_price = models.DecimalField(
+        decimal_places=2, max_digits=30, null=True, editable=False,
+    )
+    objects = ProductQueryset.as_manager()
     class Meta:
         ordering = ["name"]
         indexes = [
@@ -143,6 +202,30 @@ class Product(TimeStampedModel):
             models.Index(fields=["name"]),
             models.Index(fields=["uuid"]),
             models.Index(fields=["-created"]),
+            # Keyset pagination of category listings, see CategoryPagination.
+            models.Index(
+                fields=["category", "-created", "-id"],
+                name="shop_prod_cat_created_idx",
+            ),
+            models.Index(
+                fields=["category", "name", "id"],
+                name="shop_prod_cat_name_idx",
+            ),
+            models.Index(
+                fields=["category", "min_price", "id"],
+                name="shop_prod_cat_price_idx",
+            ),
+            models.Index(
+                fields=["category", "-max_price", "-id"],
+                name="shop_prod_cat_price_desc_idx",
+            ),
+            # Search, see shop.search.search_products.
+            GinIndex(fields=["search_vector"], name="shop_prod_search_idx"),
+            GinIndex(
+                fields=["name"],
+                name="shop_prod_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
         ]
 
     def __str__(self):
@@ -199,16 +282,29 @@ class ProductLine(TimeStampedModel):
     objects = ActiveQueryset.as_manager()
 
     def clean(self):
-        qs = ProductLine.objects.filter(product=self.product)
-        for obj in qs:
-            if self.id != obj.id and self.order == obj.order:
-                raise ValidationError("Duplicate value.")
+        if self.order is None:
+            return
+        qs = ProductLine.objects.filter(
+            product_id=self.product_id, order=self.order,
+        ).exclude(pk=self.pk)
+        if qs.exists():
+            raise ValidationError("Duplicate value.")
     class Meta:
-        ordering = ["stock_qty"]
         indexes = [
-            models.Index(fields=["sku", "active"]),
             models.Index(fields=["-created"]),
         ]
+        constraints = [
+            models.UniqueConstraint(fields=["sku"], name="shop_productline_sku_uniq"),
+            models.CheckConstraint(
+                check=models.Q(stock_qty__gte=0),
+                name="shop_productline_stock_qty_gte_0",
+            ),
+            models.UniqueConstraint(
+                fields=["product", "order"],
+                name="shop_productline_product_order_uniq",
+                violation_error_message="Duplicate value.",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -244,6 +340,11 @@ class AttributeValue(TimeStampedModel):
 class ProductLineAttributeValue(models.Model):
     """
         nameing convention: SourceModel+sourceTragetmodel
+
+        ``product_attribute`` is a copy of ``attribute_value.product_attribute``
+        kept by database triggers (see migration 0014), so that "one value per
+        attribute per product line" is a unique constraint instead of a query
+        on every save.
     """
     product_line = models.ForeignKey(
         'ProductLine', 
@@ -255,29 +356,36 @@ class ProductLineAttributeValue(models.Model):
         related_name="through_pl_av",
         on_delete=models.CASCADE,
     )
+    product_attribute = models.ForeignKey(
+        "ProductAttribute",
+        related_name="through_pl_av",
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+    )
+    # Set by formsets checking all their rows at once, see
+    # ``shop.admin.LineAttributeValueFormSet``.
+    attribute_check_deferred = False
+
     class Meta:
         unique_together = ("attribute_value", "product_line")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product_line", "product_attribute"],
+                name="shop_plav_line_attribute_uniq",
+                violation_error_message="Duplicate attribute exists",
+            ),
+        ]
 
     def clean(self):
-        qs = (
-            ProductLineAttributeValue.objects.filter(
-                attribute_value=self.attribute_value
-            )
-            .filter(product_line=self.product_line)
-            .exists()
-        )
-
-        if not qs:
-            iqs = ProductAttribute.objects.filter(
-                attribute_value__product_line_attribute_value=self.product_line
-            ).values_list("pk", flat=True)
+        from shop.validation import validate_line_attribute_values
 
-            if self.attribute_value.product_attribute.id in list(iqs):
-                raise ValidationError("Duplicate attribute exists")
-
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super(ProductLineAttributeValue, self).save(*args, **kwargs)
+        if self.attribute_check_deferred:
+            return
+        validate_line_attribute_values(
+            [(self.product_line_id, self.attribute_value_id)],
+            exclude=[self.pk] if self.pk else (),
+        )
 
 
 class ProductType(models.Model):
@@ -308,3 +416,181 @@ class ProductTypeAttribute(models.Model):
 
     class Meta:
         unique_together = ("product_type", "attribute")
+
+
+class ProductDocument(models.Model):
+    """
+    Product Document class model.
+
+    Precomputed read model for the product detail endpoint. Holds the final
+    ``ProductSerializer`` payload of a product so that a detail request is a
+    single indexed lookup. Rows are rebuilt by the receivers in
+    ``shop.signals`` whenever one of the models feeding the payload changes.
+
+    Attributes:
+        product (OneToOneField): The product the document was built from.
+        slug (SlugField): Copy of ``Product.slug`` used for the lookup.
+        active (BooleanField): Copy of ``Product.active``.
+        data (JSONField): The serialized product.
+    """
+
+    product = models.OneToOneField(
+        "Product",
+        primary_key=True,
+        related_name="document",
+        on_delete=models.CASCADE,
+    )
+    slug = models.SlugField(max_length=200)
+    active = models.BooleanField(default=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["slug", "active"], name="shop_doc_slug_active_idx"),
+        ]
+
+    def __str__(self):
+        return self.slug
+
+
+class ProductCard(models.Model):
+    """
+    Product Card class model.
+
+    Precomputed listing card of a product: what category and search pages
+    show besides the product's own columns, so that a page is the products
+    query joined to this table instead of fetching and hydrating lines and
+    images. Rebuilt together with ``ProductDocument``; stock changed through
+    ``shop.stock`` catches up on the next rebuild.
+
+    Attributes:
+        product (OneToOneField): The product the card was built from.
+        price (DecimalField): Price of the first line, None without lines.
+        in_stock (BooleanField): Whether an active line has stock.
+        image (JSONField): The serialized ``order=1`` images of the first line.
+    """
+
+    product = models.OneToOneField(
+        "Product",
+        primary_key=True,
+        related_name="card",
+        on_delete=models.CASCADE,
+    )
+    price = models.DecimalField(decimal_places=2, max_digits=30, null=True)
+    in_stock = models.BooleanField(default=False)
+    image = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.product_id)
+
+
+class FacetIndex(models.Model):
+    """
+    Facet Index class model.
+
+    Inverted index from attribute value to the active products carrying it,
+    per category, used by ``shop.facets`` to filter listings and count
+    facets without scanning the attribute tables. Attribute name and value
+    are copied in so a whole category is answered by one indexed query.
+    Maintained by ``shop.facets.rebuild_facet_index``.
+
+    Attributes:
+        category (ForeignKey): The category of the products.
+        attribute_value (ForeignKey): The indexed attribute value.
+        attribute_name (CharField): Copy of ``ProductAttribute.name``.
+        value (CharField): Copy of ``AttributeValue.value``.
+        product_ids (ArrayField): Ids of the products carrying the value,
+            on the product itself or on one of its active lines.
+    """
+
+    category = models.ForeignKey(
+        "Category", related_name="facets", on_delete=models.CASCADE,
+    )
+    attribute_value = models.ForeignKey(
+        "AttributeValue", related_name="facets", on_delete=models.CASCADE,
+    )
+    attribute_name = models.CharField(max_length=120)
+    value = models.CharField(max_length=100)
+    product_ids = ArrayField(models.BigIntegerField(), default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "attribute_value"],
+                name="shop_facet_category_value_uniq",
+            ),
+        ]
+        indexes = [
+            # Rows of the changed products, see shop.facets.rebuild_facet_index.
+            GinIndex(fields=["product_ids"], name="shop_facet_product_ids_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.attribute_name}-{self.value}"
+
+
+class OrderCounter(models.Model):
+    """
+    Order Counter class model.
+
+    Last order value handed out by an ``OrderField`` for one parent, e.g.
+    the last ``ProductLine.order`` of a product. See ``OrderField.allocate``.
+
+    Attributes:
+        scope (CharField): ``<app_label>.<model_name>.<field>`` of the field.
+        parent_id (BigIntegerField): Id of the parent the values belong to.
+        last (PositiveIntegerField): The last allocated value.
+    """
+
+    scope = models.CharField(max_length=100)
+    parent_id = models.BigIntegerField()
+    last = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "parent_id"], name="shop_ordercounter_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.parent_id}={self.last}"
+
+
+class StockReservation(models.Model):
+    """
+    Stock Reservation class model.
+
+    Units of a product line taken out of ``ProductLine.stock_qty`` for a
+    limited time, e.g. while a checkout is in progress. Every line reserved
+    by one ``shop.stock.reserve`` call shares the same ``token``. Committing
+    the reservation deletes the rows and keeps the stock decremented,
+    releasing it (or letting it expire) puts the units back.
+
+    Attributes:
+        token (UUIDField): Identifies the reservation.
+        product_line (ForeignKey): The reserved product line.
+        quantity (PositiveIntegerField): The number of reserved units.
+        expires (DateTimeField): When the units are released if the
+            reservation was not committed.
+    """
+
+    token = models.UUIDField(db_index=True)
+    product_line = models.ForeignKey(
+        "ProductLine", related_name="reservations", on_delete=models.CASCADE,
+    )
+    quantity = models.PositiveIntegerField()
+    expires = models.DateTimeField(db_index=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["token", "product_line"], name="shop_reservation_line_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.token}:{self.product_line_id}x{self.quantity}"
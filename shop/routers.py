@@ -0,0 +1,188 @@
+# Stdlib imports
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Core Django imports
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.db import connections
+from django.db import transaction
+
+# Third-party app imports
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Cookie marking a client that wrote recently and must read from the primary.
+STICKY_COOKIE = "shop_primary"
+
+# Seconds the replica is behind the primary, 0 when it has replayed
+# everything it received (an idle primary does not make a replica lag).
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery()
+        OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_read_alias = ContextVar("shop_read_alias", default=None)
+_health = {}
+
+
+def replica_lag(alias):
+    """
+    Returns the replication lag of ``alias`` in seconds.
+
+    Raises:
+        DatabaseError: If the replica cannot be reached.
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def is_healthy(alias):
+    """
+    Whether ``alias`` is reachable and within ``SHOP_REPLICA_MAX_LAG``.
+
+    The answer is kept for ``SHOP_REPLICA_CHECK_INTERVAL`` seconds per
+    process, so the check costs one query per replica and interval.
+    """
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked is not None and checked[0] > now:
+        return checked[1]
+    try:
+        healthy = replica_lag(alias) <= settings.SHOP_REPLICA_MAX_LAG
+    except DatabaseError:
+        logger.warning("Replica %s unreachable", alias, exc_info=True)
+        healthy = False
+    _health[alias] = (now + settings.SHOP_REPLICA_CHECK_INTERVAL, healthy)
+    return healthy
+
+
+def choose_replica():
+    """
+    Returns a random healthy replica, or None to read from the primary.
+    """
+    healthy = [alias for alias in settings.SHOP_READ_REPLICAS if is_healthy(alias)]
+    return random.choice(healthy) if healthy else None  # noqa: S311
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Send the ``shop`` reads made inside the block to a healthy replica.
+
+    Yields:
+        str | None: The chosen replica, None when all are lagging or down.
+    """
+    token = _read_alias.set(choose_replica())
+    try:
+        yield _read_alias.get()
+    finally:
+        _read_alias.reset(token)
+
+
+@asynccontextmanager
+async def aread_from_replica():
+    """
+    Async version of ``read_from_replica``, the health check runs in a
+    thread. The async ORM calls of the block inherit the choice.
+    """
+    token = _read_alias.set(await sync_to_async(choose_replica)())
+    try:
+        yield _read_alias.get()
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route ``shop`` reads to the replica chosen by ``read_from_replica``.
+
+    Everything else, and every write, goes to the primary. Replicas share
+    the primary's schema through replication and are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "shop":  # noqa: SLF001
+            return _read_alias.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.SHOP_READ_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:  # noqa: SLF001
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.SHOP_READ_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve the safe methods of a viewset from a read replica.
+
+    Reads skip ``ATOMIC_REQUESTS``, which would otherwise open a transaction
+    on the primary for every GET, while writes still run in a transaction of
+    their own. Clients holding the ``shop_primary`` cookie, set by
+    ``PrimaryStickinessMiddleware`` after a write, keep reading from the
+    primary so they see their own changes.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        return transaction.non_atomic_requests(super().as_view(*args, **kwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            with transaction.atomic():
+                return super().dispatch(request, *args, **kwargs)
+        if STICKY_COOKIE in request.COOKIES:
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Pin a client to the primary for ``SHOP_REPLICA_STICKY_SECONDS`` after
+    a successful write, longer than the replicas may lag.
+
+    Disabled when no replica is configured.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SHOP_READ_REPLICAS", []):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < status.HTTP_400_BAD_REQUEST
+        ):
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.SHOP_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,88 @@
+# Core Django imports
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import SearchRank
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import F
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+
+# Weights: name A, category name B, attribute values C, description D.
+SEARCH_VECTOR_SQL = """
+UPDATE shop_product p
+SET search_vector =
+    setweight(to_tsvector(%(config)s::regconfig, p.name), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(
+        (SELECT c.name FROM shop_category c WHERE c.id = p.category_id), ''
+    )), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+        SELECT string_agg(DISTINCT v.value, ' ')
+        FROM shop_attributevalue v
+        WHERE v.id IN (
+            SELECT lv.attribute_value_id
+            FROM shop_productlineattributevalue lv
+            JOIN shop_productline l ON l.id = lv.product_line_id
+            WHERE l.product_id = p.id
+            UNION
+            SELECT pv.attribute_value_id
+            FROM shop_productattributevalue pv
+            WHERE pv.product_id = p.id
+        )
+    ), '')), 'C')
+    || setweight(to_tsvector(%(config)s::regconfig, p.description), 'D')
+WHERE p.id = ANY(%(ids)s)
+"""
+
+
+def rebuild_search_vectors(product_ids):
+    """
+    Recompute ``Product.search_vector`` for the given products.
+
+    The vector covers the name, the category name, the attribute values of
+    the product and of its lines, and the description, in one statement.
+    Kept up to date by ``shop.signals.refresh_products``.
+
+    Args:
+        product_ids (Iterable[int]): Ids of the products.
+
+    Returns:
+        int: The number of products updated.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_VECTOR_SQL,
+            {"config": settings.SHOP_SEARCH_CONFIG, "ids": product_ids},
+        )
+        return cursor.rowcount
+
+
+def search_products(queryset, text):
+    """
+    Filter and rank ``queryset`` by a search text.
+
+    Matches the web search syntax of ``text`` (quoted phrases, ``or``,
+    ``-exclusion``) against the GIN indexed ``search_vector``, and falls
+    back to trigram similarity on the name to tolerate typos. ``rank`` adds
+    up the weighted text rank (0 for products not indexed yet) and the name
+    similarity.
+
+    Args:
+        queryset (QuerySet): The products to search.
+        text (str): The user input.
+
+    Returns:
+        QuerySet: The matching products annotated with ``rank``.
+    """
+    query = SearchQuery(
+        text,
+        search_type="websearch",
+        config=settings.SHOP_SEARCH_CONFIG,
+    )
+    return queryset.annotate(
+        rank=Coalesce(SearchRank(F("search_vector"), query), 0.0)
+        + TrigramSimilarity("name", text),
+    ).filter(Q(search_vector=query) | Q(name__trigram_similar=text))
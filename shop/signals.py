@@ -0,0 +1,391 @@
+# Stdlib imports
+import threading
+
+# Core Django imports
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+# Imports from apps
+from shop.cache import CATEGORIES_TAG
+from shop.cache import SEARCH_TAG
+from shop.cache import category_tag
+from shop.cache import invalidate
+from shop.cache import product_tag
+from shop.documents import rebuild_price_ranges
+from shop.documents import rebuild_product_cards
+from shop.documents import rebuild_product_documents
+from shop.facets import rebuild_facet_index
+from shop.models import AttributeValue
+from shop.models import Category
+from shop.models import Product
+from shop.models import ProductAttribute
+from shop.models import ProductAttributeValue
+from shop.models import ProductImage
+from shop.models import ProductLine
+from shop.models import ProductLineAttributeValue
+from shop.models import ProductType
+from shop.models import ProductTypeAttribute
+from shop.search import rebuild_search_vectors
+from shop.sku import invalidate_skus
+
+
+def _affected_products(instance):  # noqa: PLR0911
+    """
+    Returns the ids of the products whose document depends on ``instance``.
+    """
+    if isinstance(instance, Product):
+        return [instance.pk]
+    if isinstance(instance, ProductLine | ProductAttributeValue):
+        return [instance.product_id]
+    if isinstance(instance, ProductImage | ProductLineAttributeValue):
+        return ProductLine.objects.filter(pk=instance.product_line_id).values_list(
+            "product_id",
+            flat=True,
+        )
+    if isinstance(instance, AttributeValue):
+        return Product.objects.filter(
+            Q(product_line__attribute_value=instance) | Q(attribute_value=instance),
+        ).values_list("id", flat=True)
+    if isinstance(instance, ProductAttribute):
+        return Product.objects.filter(
+            Q(product_line__attribute_value__product_attribute=instance)
+            | Q(attribute_value__product_attribute=instance)
+            | Q(product_type__attribute=instance),
+        ).values_list("id", flat=True)
+    if isinstance(instance, ProductType):
+        return Product.objects.filter(product_type=instance).values_list(
+            "id",
+            flat=True,
+        )
+    if isinstance(instance, ProductTypeAttribute):
+        return Product.objects.filter(
+            product_type_id=instance.product_type_id,
+        ).values_list("id", flat=True)
+    if isinstance(instance, Category):
+        return Product.objects.filter(category=instance).values_list("id", flat=True)
+    return []
+
+
+def _category_tags(category_ids):
+    """
+    Returns the cache tags of the pages of ``category_ids`` and of all their
+    ancestors, whose subtree listings include them.
+    """
+    nodes = Category.objects.filter(pk__in=category_ids).values_list(
+        "tree_id",
+        "lft",
+        "rght",
+    )
+    condition = Q()
+    for tree_id, lft, rght in nodes:
+        condition |= Q(tree_id=tree_id, lft__lte=lft, rght__gte=rght)
+    if not condition:
+        return []
+    slugs = Category.objects.filter(condition).values_list("slug", flat=True)
+    return [category_tag(slug) for slug in slugs]
+
+
+def _product_tags(product_ids):
+    """
+    Returns the cache tags of the detail, category and search pages showing
+    ``product_ids``.
+    """
+    tags = [SEARCH_TAG]
+    category_ids = set()
+    rows = Product.objects.filter(id__in=product_ids).values_list("slug", "category_id")
+    for slug, category_id in rows:
+        tags.append(product_tag(slug))
+        if category_id:
+            category_ids.add(category_id)
+    return tags + _category_tags(category_ids)
+
+
+def refresh_products(product_ids):
+    """
+    Rebuild the documents, listing cards, price ranges, search vectors and
+    facet rows of ``product_ids`` and invalidate the cached responses showing
+    them.
+    """
+    rebuild_product_documents(product_ids)
+    rebuild_product_cards(product_ids)
+    rebuild_price_ranges(product_ids)
+    rebuild_search_vectors(product_ids)
+    categories = Product.objects.filter(id__in=product_ids).values_list(
+        "category_id",
+        flat=True,
+    )
+    rebuild_facet_index(categories, product_ids)
+    # The cached SKU resolutions embed the product slug and active flag.
+    invalidate_skus(
+        ProductLine.objects.filter(product_id__in=product_ids).values_list(
+            "sku",
+            flat=True,
+        ),
+    )
+    invalidate(*_product_tags(product_ids))
+
+
+def refresh_documents(product_ids):
+    """
+    Rebuild the documents and listing cards of ``product_ids`` only, and
+    invalidate the cached responses showing them.
+
+    For changes that leave prices, facets and search vectors alone, such as
+    stock or image derivatives.
+    """
+    product_ids = set(product_ids)
+    if product_ids:
+        rebuild_product_documents(product_ids)
+        rebuild_product_cards(product_ids)
+        invalidate(*_product_tags(product_ids))
+
+
+def refresh_stock(line_ids):
+    """
+    ``refresh_documents`` for the products of ``line_ids``, whose stock
+    changed. Stock writes bypass the model signals, this is what they
+    schedule instead.
+    """
+    refresh_documents(
+        ProductLine.objects.filter(id__in=line_ids).values_list(
+            "product_id",
+            flat=True,
+        ),
+    )
+
+
+class _Batch:
+    """
+    An ``on_commit`` callback calling ``func`` once with every item added
+    to it before the transaction commits.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.items = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.func(self.items)
+
+
+_batches = threading.local()
+
+
+def _schedule(func, items):
+    """
+    Call ``func`` once with everything scheduled for it when the current
+    transaction commits.
+
+    The first call in a transaction registers a ``_Batch``, later ones add
+    their items to it, so a transaction saving many rows still runs
+    ``func`` once. A batch is reused only while the connection's
+    ``on_commit`` queue is the list it was appended to and it has not run:
+    Django replaces that list on commit, rollback and savepoint rollback, so
+    items never leak into another transaction.
+    """
+    items = set(items)
+    if not items:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        func(items)
+        return
+    if not hasattr(_batches, "queued"):
+        _batches.queued = {}
+    queue, batch = _batches.queued.get(func, (None, None))
+    if queue is not connection.run_on_commit or batch.done:
+        batch = _Batch(func)
+        transaction.on_commit(batch)
+        _batches.queued[func] = (connection.run_on_commit, batch)
+    batch.items.update(items)
+
+
+def _invalidate_tags(tags):
+    invalidate(*tags)
+
+
+def _rebuild_stored_facets(pairs):
+    categories = {category_id for category_id, _ in pairs}
+    rebuild_facet_index(categories, {product_id for _, product_id in pairs})
+
+
+def schedule_rebuild(product_ids):
+    """
+    Rebuild the documents of ``product_ids`` once the current transaction
+    commits, together with every other product scheduled in it.
+    """
+    _schedule(refresh_products, product_ids)
+
+
+def _enqueue_stock_refresh(line_ids):
+    # shop.tasks imports the catalog importer, which imports this module.
+    from shop.tasks import refresh_stock_task
+
+    refresh_stock_task.delay(sorted(line_ids))
+
+
+def schedule_stock_refresh(line_ids):
+    """
+    Queue ``refresh_stock`` for ``line_ids`` in Celery once the current
+    transaction commits, one task for every line touched by it.
+    """
+    _schedule(_enqueue_stock_refresh, line_ids)
+
+
+def _enqueue_image_variants(image_ids):
+    # shop.tasks imports the catalog importer, which imports this module.
+    from shop.tasks import build_image_variants_task
+
+    build_image_variants_task.delay(sorted(image_ids))
+
+
+def schedule_invalidate(tags):
+    """
+    Invalidate the cache ``tags`` once the current transaction commits.
+    """
+    _schedule(_invalidate_tags, tags)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductLine)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=ProductLineAttributeValue)
+@receiver(post_save, sender=ProductAttributeValue)
+@receiver(post_save, sender=AttributeValue)
+@receiver(post_save, sender=ProductAttribute)
+@receiver(post_save, sender=ProductType)
+@receiver(post_save, sender=ProductTypeAttribute)
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=ProductLine)
+@receiver(pre_delete, sender=ProductImage)
+@receiver(pre_delete, sender=ProductLineAttributeValue)
+@receiver(pre_delete, sender=ProductAttributeValue)
+@receiver(pre_delete, sender=AttributeValue)
+@receiver(pre_delete, sender=ProductAttribute)
+@receiver(pre_delete, sender=ProductTypeAttribute)
+@receiver(pre_delete, sender=Category)
+def product_document_dependency_changed(sender, instance, *, raw=False, **kwargs):
+    """
+    Rebuild the documents that embed ``instance``.
+
+    Deletes are handled on ``pre_delete`` so the affected products can still
+    be found through the row that is about to disappear.
+    """
+    if raw:
+        return
+    schedule_rebuild(_affected_products(instance))
+
+
+@receiver(m2m_changed, sender=ProductLine.attribute_value.through)
+@receiver(m2m_changed, sender=Product.attribute_value.through)
+@receiver(m2m_changed, sender=ProductType.attribute.through)
+def product_document_m2m_changed(sender, instance, action, **kwargs):
+    """
+    Rebuild the documents affected by ``add``/``remove``/``clear`` on the
+    attribute relations, which bypass the through models' save signals.
+
+    Removals are handled before they happen and additions after, so the
+    links of ``instance`` always cover every affected product.
+    """
+    if action in ("post_add", "pre_remove", "pre_clear"):
+        schedule_rebuild(_affected_products(instance))
+
+
+@receiver(pre_save, sender=ProductLine)
+@receiver(pre_save, sender=ProductImage)
+@receiver(pre_save, sender=ProductLineAttributeValue)
+@receiver(pre_save, sender=ProductAttributeValue)
+def product_dependency_moved(sender, instance, *, raw=False, **kwargs):
+    """
+    Rebuild the product a line, image or attribute value is moved away
+    from; ``post_save`` only reaches the product it is moved to.
+    """
+    if raw or instance.pk is None:
+        return
+    stored = sender.objects.filter(pk=instance.pk)
+    if sender in (ProductLine, ProductAttributeValue):
+        old_products = stored.exclude(product_id=instance.product_id).values_list(
+            "product_id",
+            flat=True,
+        )
+    else:
+        old_lines = stored.exclude(product_line_id=instance.product_line_id)
+        old_products = ProductLine.objects.filter(
+            pk__in=old_lines.values("product_line_id"),
+        ).values_list("product_id", flat=True)
+    schedule_rebuild(old_products)
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_delete, sender=Product)
+def product_cache_invalidate(sender, instance, *, raw=False, **kwargs):
+    """
+    Invalidate the pages showing the product under its stored slug and
+    category, which the new row no longer points to after a move or delete,
+    and rebuild the facets of the stored category.
+    """
+    if raw or instance.pk is None:
+        return
+    schedule_invalidate(_product_tags([instance.pk]))
+    old_category = Product.objects.filter(pk=instance.pk).values_list(
+        "category_id",
+        flat=True,
+    )
+    _schedule(
+        _rebuild_stored_facets,
+        [(category_id, instance.pk) for category_id in old_category],
+    )
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_cache_invalidate(sender, instance, *, raw=False, **kwargs):
+    """
+    Invalidate the category list and the pages of the category and of its
+    old and new ancestors.
+    """
+    if raw:
+        return
+    tags = [CATEGORIES_TAG, category_tag(instance.slug)]
+    if instance.pk is not None:
+        tags.extend(_category_tags([instance.pk]))
+    if instance.parent_id is not None:
+        tags.extend(_category_tags([instance.parent_id]))
+    schedule_invalidate(tags)
+
+
+@receiver(pre_save, sender=ProductLine)
+@receiver(pre_delete, sender=ProductLine)
+def sku_cache_invalidate(sender, instance, *, raw=False, **kwargs):
+    """
+    Drop the cached resolution of the line's stored and new SKU, so neither
+    a renamed SKU nor a SKU cached as unknown outlives the write.
+    """
+    if raw:
+        return
+    skus = {instance.sku}
+    if instance.pk is not None:
+        skus.update(
+            ProductLine.objects.filter(pk=instance.pk).values_list("sku", flat=True),
+        )
+    _schedule(invalidate_skus, skus)
+
+
+@receiver(post_save, sender=ProductImage)
+def product_image_variants(sender, instance, *, raw=False, **kwargs):
+    """
+    Render the derivatives of a new or replaced image in Celery once the
+    transaction commits, in one task for all the images of the transaction.
+    """
+    if raw or not instance.image_url:
+        return
+    if instance.variants.get("source") == instance.image_url.name:
+        return
+    _schedule(_enqueue_image_variants, [instance.pk])
@@ -0,0 +1,85 @@
+# Core Django imports
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+KEY_PREFIX = "shop:sku"
+
+# Answered by the unique index on ``shop_productline.sku`` with a single
+# array parameter, whatever the number of SKUs.
+RESOLVE_SQL = """
+SELECT l.sku, l.price, l.stock_qty, p.slug
+FROM shop_productline l
+JOIN shop_product p ON p.id = l.product_id
+WHERE l.sku = ANY(%s) AND l.active AND p.active
+"""
+
+# Cached for SKUs that do not resolve, so unknown SKUs are not looked up on
+# every call either.
+NOT_FOUND = {}
+
+
+def _key(sku):
+    return f"{KEY_PREFIX}:{sku}"
+
+
+def _fetch(skus):
+    with connection.cursor() as cursor:
+        cursor.execute(RESOLVE_SQL, [list(skus)])
+        rows = cursor.fetchall()
+    return {
+        sku: {
+            "sku": sku,
+            "price": f"{price:.2f}",
+            "stock_qty": stock_qty,
+            "product_slug": slug,
+        }
+        for sku, price, stock_qty, slug in rows
+    }
+
+
+def resolve_skus(skus):
+    """
+    Resolve SKUs to their price, stock and product slug.
+
+    Read-through cache: the SKUs found in the cache are served from it, the
+    others are fetched with one query and cached for
+    ``SHOP_SKU_CACHE_TIMEOUT`` seconds. Entries are dropped when the line or
+    its product is saved; stock changed through ``shop.stock`` is refreshed
+    by the timeout.
+
+    Args:
+        skus (Iterable[str]): The SKUs, duplicates are ignored.
+
+    Returns:
+        tuple[list[dict], list[str]]: The resolved lines and the SKUs that
+        match no active line, both in request order.
+    """
+    skus = list(dict.fromkeys(skus))
+    use_cache = getattr(settings, "SHOP_RESPONSE_CACHE", True)
+    found = {}
+    if use_cache:
+        cached = cache.get_many([_key(sku) for sku in skus])
+        found = {sku: cached[_key(sku)] for sku in skus if _key(sku) in cached}
+
+    missing = [sku for sku in skus if sku not in found]
+    if missing:
+        fetched = _fetch(missing)
+        fetched.update((sku, NOT_FOUND) for sku in missing if sku not in fetched)
+        found.update(fetched)
+        if use_cache:
+            cache.set_many(
+                {_key(sku): value for sku, value in fetched.items()},
+                timeout=getattr(settings, "SHOP_SKU_CACHE_TIMEOUT", 30),
+            )
+
+    results = [found[sku] for sku in skus if found[sku]]
+    not_found = [sku for sku in skus if not found[sku]]
+    return results, not_found
+
+
+def invalidate_skus(skus):
+    """
+    Drop the cached resolution of ``skus``.
+    """
+    cache.delete_many([_key(sku) for sku in skus])
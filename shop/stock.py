@@ -0,0 +1,348 @@
+"""
+Stock reservation engine for ``ProductLine.stock_qty``.
+
+Every change is a single conditional statement (``UPDATE ... SET stock_qty
+= stock_qty - n WHERE stock_qty >= n``), so stock never goes negative and no
+row is read and locked ahead of the write. The ``stock_qty >= 0`` check
+constraint backs this up for writes made elsewhere.
+
+- ``decrement``/``increment`` change the stock of one line directly.
+- ``reserve`` takes the stock of several lines at once, all or nothing, and
+  records a ``StockReservation`` per line, in one statement.
+  ``commit_reservation`` keeps the stock taken, until the TTL is over, and
+  ``release_reservation`` (or ``release_expired_reservations`` once it is)
+  puts it back.
+- Lines listed in ``SHOP_STOCK_HOT_LINES`` are decremented from a Redis
+  counter holding stock leased from Postgres ``SHOP_STOCK_LEASE_SIZE`` units
+  at a time (``StockLeases``), so a flash sale hits the row once per lease
+  instead of once per order. Unused leases go back to Postgres with
+  ``reconcile_stock_leases``.
+
+The statements bypass the model signals on purpose, the service is the
+authority on what can be sold. Product documents and listing cards embed the
+stock, so every write that changes a row queues ``refresh_stock`` for its
+lines once the transaction commits (``schedule_stock_refresh``). Units taken
+from a Redis lease do not change the row and do not refresh anything.
+"""
+
+# Stdlib imports
+import uuid
+from functools import cache
+from functools import partial
+
+# Core Django imports
+from django.conf import settings
+from django.db import connection
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+
+# Third-party app imports
+from redis import Redis
+
+# Imports from apps
+from shop.models import ProductLine
+from shop.models import StockReservation
+from shop.signals import schedule_stock_refresh
+
+RESERVE_SQL = """
+WITH requested (line_id, quantity) AS (
+    SELECT * FROM unnest(%(line_ids)s::bigint[], %(quantities)s::integer[])
+), taken AS (
+    UPDATE shop_productline l
+    SET stock_qty = l.stock_qty - r.quantity
+    FROM requested r
+    WHERE l.id = r.line_id AND l.stock_qty >= r.quantity
+    RETURNING l.id, r.quantity
+)
+INSERT INTO shop_stockreservation (token, product_line_id, quantity, expires, created)
+SELECT %(token)s::uuid, id, quantity, now() + %(ttl)s * interval '1 second', now()
+FROM taken
+RETURNING product_line_id
+"""
+
+RELEASE_SQL = """
+WITH released AS (
+    DELETE FROM shop_stockreservation WHERE {condition}
+    RETURNING product_line_id, quantity
+), restocked AS (
+    UPDATE shop_productline l
+    SET stock_qty = l.stock_qty + r.quantity
+    FROM (
+        SELECT product_line_id, SUM(quantity) AS quantity
+        FROM released GROUP BY product_line_id
+    ) r
+    WHERE l.id = r.product_line_id
+)
+SELECT product_line_id FROM released
+"""
+
+LEASE_SQL = """
+WITH current AS (
+    SELECT id, stock_qty FROM shop_productline WHERE id = %(line_id)s FOR UPDATE
+)
+UPDATE shop_productline l
+SET stock_qty = l.stock_qty - LEAST(c.stock_qty, %(lease)s)
+FROM current c
+WHERE l.id = c.id AND c.stock_qty >= %(quantity)s
+RETURNING LEAST(c.stock_qty, %(lease)s)
+"""
+
+# Decrements KEYS[1] by ARGV[1] if it holds at least that much, returns -1
+# otherwise.
+TAKE_SCRIPT = """
+local available = tonumber(redis.call('GET', KEYS[1]) or '0')
+if available >= tonumber(ARGV[1]) then
+    return redis.call('DECRBY', KEYS[1], ARGV[1])
+end
+return -1
+"""
+
+
+class InsufficientStock(Exception):  # noqa: N818
+    """
+    Raised when a reservation asks for more units than a line has in stock.
+
+    Attributes:
+        line_ids (list[int]): The lines that could not be reserved.
+    """
+
+    def __init__(self, line_ids):
+        self.line_ids = sorted(line_ids)
+        super().__init__(f"Insufficient stock for product lines {self.line_ids}")
+
+
+def increment(line_id, quantity):
+    """
+    Put ``quantity`` units of a product line back in stock.
+    """
+    ProductLine.objects.filter(id=line_id).update(stock_qty=F("stock_qty") + quantity)
+    schedule_stock_refresh([line_id])
+
+
+def decrement(line_id, quantity):
+    """
+    Take ``quantity`` units of a product line out of stock.
+
+    Hot lines are served from their Redis lease, which is not rolled back
+    with the surrounding transaction: decrement them once the order is
+    certain to be saved.
+
+    Args:
+        line_id (int): The product line.
+        quantity (int): The number of units, positive.
+
+    Returns:
+        bool: Whether there was enough stock.
+    """
+    leases = get_stock_leases()
+    if leases is not None and line_id in settings.SHOP_STOCK_HOT_LINES:
+        return leases.decrement(line_id, quantity)
+    updated = ProductLine.objects.filter(id=line_id, stock_qty__gte=quantity).update(
+        stock_qty=F("stock_qty") - quantity,
+    )
+    if updated:
+        schedule_stock_refresh([line_id])
+    return updated == 1
+
+
+def reserve(quantities, ttl=None):
+    """
+    Reserve stock for several product lines in one statement.
+
+    Either every line is reserved or none is. When a hot line falls short,
+    the units leased into Redis for it are returned to its row and the
+    reservation is tried once more. Like ``decrement``, do not run it in a
+    transaction that may roll back the returned units.
+
+    Args:
+        quantities (dict[int, int]): Product line id to number of units.
+        ttl (int, optional): Seconds before the reservation is released,
+            defaults to ``SHOP_STOCK_RESERVATION_TTL``.
+
+    Returns:
+        uuid.UUID: The reservation token.
+
+    Raises:
+        InsufficientStock: If a line does not have enough stock.
+        ValueError: If a quantity is not positive.
+    """
+    if any(quantity <= 0 for quantity in quantities.values()):
+        msg = "Quantities must be positive"
+        raise ValueError(msg)
+    if ttl is None:
+        ttl = settings.SHOP_STOCK_RESERVATION_TTL
+    try:
+        return _reserve(quantities, ttl)
+    except InsufficientStock as exc:
+        leases = get_stock_leases()
+        hot = set(exc.line_ids) & set(settings.SHOP_STOCK_HOT_LINES)
+        if leases is None or not hot or not leases.reconcile(hot):
+            raise
+    return _reserve(quantities, ttl)
+
+
+def _reserve(quantities, ttl):
+    token = uuid.uuid4()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            RESERVE_SQL,
+            {
+                "line_ids": list(quantities),
+                "quantities": list(quantities.values()),
+                "token": str(token),
+                "ttl": ttl,
+            },
+        )
+        reserved = {row[0] for row in cursor.fetchall()}
+        if len(reserved) < len(quantities):
+            raise InsufficientStock(set(quantities) - reserved)
+        schedule_stock_refresh(reserved)
+    return token
+
+
+def commit_reservation(token):
+    """
+    Turn a reservation into a sale, the stock stays decremented.
+
+    Expired reservations are rejected: their units are about to be, or
+    already were, put back on sale by ``release_expired_reservations``.
+
+    Returns:
+        int: The number of reserved lines, 0 if the reservation was already
+        committed, released or has expired.
+    """
+    deleted, _ = StockReservation.objects.filter(
+        token=token,
+        expires__gt=Now(),
+    ).delete()
+    return deleted
+
+
+def _release(condition, params):
+    with connection.cursor() as cursor:
+        cursor.execute(RELEASE_SQL.format(condition=condition), params)
+        line_ids = [row[0] for row in cursor.fetchall()]
+    schedule_stock_refresh(line_ids)
+    return len(line_ids)
+
+
+def release_reservation(token):
+    """
+    Cancel a reservation and put its units back in stock.
+
+    Returns:
+        int: The number of released lines.
+    """
+    return _release("token = %(token)s::uuid", {"token": str(token)})
+
+
+def release_expired_reservations(batch_size=1000):
+    """
+    Release up to ``batch_size`` expired reservations.
+
+    Rows locked by a concurrent commit or release are skipped.
+
+    Returns:
+        int: The number of released lines.
+    """
+    return _release(
+        "id IN (SELECT id FROM shop_stockreservation WHERE expires <= now()"
+        " ORDER BY expires LIMIT %(limit)s FOR UPDATE SKIP LOCKED)",
+        {"limit": batch_size},
+    )
+
+
+class StockLeases:
+    """
+    Redis counters holding stock leased from Postgres for hot lines.
+
+    A decrement first takes the units from the line's counter with an atomic
+    check-and-decrement script. When the counter runs dry a new lease of
+    ``lease_size`` units (or whatever is left) is taken from the row with a
+    conditional update: the order is served from it directly and the rest
+    is added to the counter once the transaction commits, so a rollback
+    leaves both sides untouched. Stock in Redis is already gone from
+    Postgres and can never be sold twice.
+
+    Args:
+        url (str): The Redis URL.
+        lease_size (int): Units leased from Postgres at a time.
+    """
+
+    key_prefix = "shop:stock:lease"
+
+    def __init__(self, url, lease_size):
+        self.client = Redis.from_url(url)
+        self.lease_size = lease_size
+        self.take = self.client.register_script(TAKE_SCRIPT)
+
+    def key(self, line_id):
+        return f"{self.key_prefix}:{line_id}"
+
+    def decrement(self, line_id, quantity):
+        if self.take(keys=[self.key(line_id)], args=[quantity]) >= 0:
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute(
+                LEASE_SQL,
+                {
+                    "line_id": line_id,
+                    "quantity": quantity,
+                    "lease": max(self.lease_size, quantity),
+                },
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return False
+        schedule_stock_refresh([line_id])
+        leftover = row[0] - quantity
+        if leftover:
+            transaction.on_commit(
+                partial(self.client.incrby, self.key(line_id), leftover),
+            )
+        return True
+
+    def reconcile(self, line_ids):
+        """
+        Return the unused leased units of ``line_ids`` to Postgres.
+
+        Returns:
+            int: The number of units returned.
+        """
+        returned = 0
+        for line_id in line_ids:
+            leftover = int(self.client.getdel(self.key(line_id)) or 0)
+            if leftover > 0:
+                increment(line_id, leftover)
+                returned += leftover
+        return returned
+
+
+@cache
+def _stock_leases(url, lease_size):
+    return StockLeases(url, lease_size)
+
+
+def get_stock_leases():
+    """
+    Returns the ``StockLeases`` of ``SHOP_STOCK_REDIS_URL``, or None when
+    hot lines are not configured.
+    """
+    url = getattr(settings, "SHOP_STOCK_REDIS_URL", "")
+    if not url or not getattr(settings, "SHOP_STOCK_HOT_LINES", []):
+        return None
+    return _stock_leases(url, settings.SHOP_STOCK_LEASE_SIZE)
+
+
+def reconcile_stock_leases():
+    """
+    Return the unused leases of every hot line to Postgres.
+
+    Returns:
+        int: The number of units returned.
+    """
+    leases = get_stock_leases()
+    if leases is None:
+        return 0
+    return leases.reconcile(settings.SHOP_STOCK_HOT_LINES)
@@ -0,0 +1,53 @@
+from django.conf import settings
+
+from config import celery_app
+from shop.catalog_import import import_catalog
+from shop.images import build_images_variants
+from shop.signals import refresh_stock
+from shop.stock import reconcile_stock_leases
+from shop.stock import release_expired_reservations
+from shop.warmup import warm_hot_pages
+
+
+@celery_app.task(
+    soft_time_limit=settings.SHOP_IMPORT_SOFT_TIME_LIMIT,
+    time_limit=settings.SHOP_IMPORT_TIME_LIMIT,
+)
+def import_catalog_task(path, fmt=None, batch_size=1000, *, refresh=True):
+    """Import a catalog file, see shop.catalog_import.import_catalog."""
+    return import_catalog(path, fmt=fmt, batch_size=batch_size, refresh=refresh)
+
+
+@celery_app.task()
+def release_expired_reservations_task(batch_size=1000):
+    """Release expired stock reservations, run periodically from beat."""
+    released = 0
+    while True:
+        count = release_expired_reservations(batch_size)
+        released += count
+        if count < batch_size:
+            return released
+
+
+@celery_app.task()
+def reconcile_stock_leases_task():
+    """Return unused hot line leases to Postgres, run periodically from beat."""
+    return reconcile_stock_leases()
+
+
+@celery_app.task()
+def refresh_stock_task(line_ids):
+    """Rebuild the documents and cards of lines whose stock changed."""
+    refresh_stock(line_ids)
+
+
+@celery_app.task()
+def build_image_variants_task(image_ids):
+    """Render the responsive derivatives of product images."""
+    return build_images_variants(image_ids)
+
+
+@celery_app.task()
+def warm_cache_task(limit=None):
+    """Warm the cache with the hottest catalog pages, run periodically from beat."""
+    return warm_hot_pages(limit)
@@ -1,8 +1,15 @@
-from django.urls import reverse
-
 import factory
 
-from shop.models import Product, Category, Brand
+from shop.models import (
+    AttributeValue,
+    Category,
+    Product,
+    ProductAttribute,
+    ProductImage,
+    ProductLine,
+    ProductLineAttributeValue,
+    ProductType,
+)
 
 
 class CategoryFactory(factory.django.DjangoModelFactory):
@@ -24,28 +31,54 @@ class CategoryFactory(factory.django.DjangoModelFactory):
     )  # Uses another CategoryFactory for the 'parent' field
 
 
-class BrandFactory(factory.django.DjangoModelFactory):
+class ProductAttributeFactory(factory.django.DjangoModelFactory):
+    """
+    Factory for creating ProductAttribute model instances for testing.
     """
-    Factory for creating Category model instances for testing.
 
-    This factory generates unique 'name' and 'slug' fields for each instance
-    and uses another CategoryFactory for the 'parent' field, allowing for
-    the creation of a hierarchy of categories.
+    class Meta:
+        model = ProductAttribute
+
+    name = factory.Sequence(lambda n: "attribute_%d" % n)
+
+
+class AttributeValueFactory(factory.django.DjangoModelFactory):
+    """
+    Factory for creating AttributeValue model instances for testing.
     """
 
     class Meta:
-        model = Brand  # Specifies the model to be created by the factory
+        model = AttributeValue
 
-    name = factory.Sequence(lambda n: "brand_%d" % n)
+    value = factory.Sequence(lambda n: "value_%d" % n)
+    product_attribute = factory.SubFactory(ProductAttributeFactory)
+
+
+class ProductTypeFactory(factory.django.DjangoModelFactory):
+    """
+    Factory for creating ProductType model instances for testing.
+
+    Pass ``attributes=[...]`` to link product attributes to the type.
+    """
+
+    class Meta:
+        model = ProductType
+
+    name = factory.Sequence(lambda n: "type_%d" % n)
+
+    @factory.post_generation
+    def attributes(self, create, extracted, **kwargs):
+        if create and extracted:
+            self.attribute.add(*extracted)
 
 
 class ProductFactory(factory.django.DjangoModelFactory):
     """
     Factory for creating Product model instances for testing.
 
-    This factory generates unique 'name' and 'slug' fields for each instance,
-    uses a CategoryFactory for the 'category' field, and uses the Faker library
-    to generate 'description', 'price', and 'available' fields.
+    This factory generates unique 'name' and 'slug' fields for each instance
+    and uses the Faker library to generate the 'description' field. The
+    category is left empty unless one is passed in.
     """
 
     class Meta:
@@ -55,14 +88,103 @@ class ProductFactory(factory.django.DjangoModelFactory):
     name = factory.Sequence(lambda n: "product_%d" % n)
     slug = factory.Sequence(lambda n: "product_%d" % n)
     description = factory.Faker("text")
-    # price = factory.Faker("pydecimal", left_digits=5, right_digits=2, positive=True)
-    available = factory.Faker("pybool")
-    # main_image = None  # Assuming main_image is optional and can be blank
+    product_type = None
+
+
+class ProductLineFactory(factory.django.DjangoModelFactory):
+    """
+    Factory for creating ProductLine model instances for testing.
+
+    Pass ``attribute_values=[...]`` to link attribute values to the line.
+    """
+
+    class Meta:
+        model = ProductLine
+
+    product = factory.SubFactory(ProductFactory)
+    sku = factory.Sequence(lambda n: "SKU-%d" % n)
+    price = factory.Faker("pydecimal", left_digits=4, right_digits=2, positive=True)
+    stock_qty = factory.Faker("pyint", min_value=0, max_value=100)
 
     @factory.post_generation
-    def category(self, create, extracted, **kwargs):
-        if not create:
-            return
-        if extracted:
-            print(extracted)
-            self.category = extracted
+    def attribute_values(self, create, extracted, **kwargs):
+        if create and extracted:
+            ProductLineAttributeValue.objects.bulk_create(
+                ProductLineAttributeValue(product_line=self, attribute_value=value)
+                for value in extracted
+            )
+
+
+class ProductImageFactory(factory.django.DjangoModelFactory):
+    """
+    Factory for creating ProductImage model instances for testing.
+    """
+
+    class Meta:
+        model = ProductImage
+
+    product_line = factory.SubFactory(ProductLineFactory)
+    image_url = factory.Sequence(lambda n: "products/image_%d.jpg" % n)
+    alt_text = factory.Faker("sentence", nb_words=3)
+
+
+def create_category_tree(depth, fanout, parent=None):
+    """
+    Create a category tree ``depth`` levels deep with ``fanout`` children
+    per node below ``parent`` (or a new root).
+
+    Returns:
+        list: Every created category, parents before children.
+    """
+    root = parent or CategoryFactory(parent=None)
+    created = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [
+            CategoryFactory(parent=node) for node in level for _ in range(fanout)
+        ]
+        created.extend(level)
+    return created
+
+
+def create_catalog(  # noqa: PLR0913
+    depth=2,
+    fanout=3,
+    products_per_category=5,
+    lines_per_product=3,
+    images_per_line=2,
+    attributes=3,
+    values_per_attribute=4,
+):
+    """
+    Seed a synthetic catalog of configurable size.
+
+    Every category of a ``depth``/``fanout`` tree gets
+    ``products_per_category`` products sharing one product type with
+    ``attributes`` attributes. Each product gets ``lines_per_product`` lines
+    with one value per attribute and ``images_per_line`` images.
+
+    Returns:
+        dict: The created ``categories`` and ``products``.
+    """
+    product_attributes = ProductAttributeFactory.create_batch(attributes)
+    values = [
+        AttributeValueFactory.create_batch(values_per_attribute, product_attribute=a)
+        for a in product_attributes
+    ]
+    product_type = ProductTypeFactory(attributes=product_attributes)
+    categories = create_category_tree(depth, fanout)
+    products = []
+    for category in categories:
+        for _ in range(products_per_category):
+            product = ProductFactory(category=category, product_type=product_type)
+            products.append(product)
+            for index in range(lines_per_product):
+                line = ProductLineFactory(
+                    product=product,
+                    attribute_values=[
+                        choices[index % len(choices)] for choices in values
+                    ],
+                )
+                ProductImageFactory.create_batch(images_per_line, product_line=line)
+    return {"categories": categories, "products": products}
@@ -0,0 +1,75 @@
+import pytest
+
+from shop.documents import rebuild_product_documents
+from shop.tests.factories import CategoryFactory
+from shop.tests.factories import ProductFactory
+from shop.tests.factories import create_catalog
+
+
+def test_async_product_detail_matches_sync(db, client):
+    product = ProductFactory()
+    rebuild_product_documents([product.id])
+
+    sync = client.get(f"/api/product/{product.slug}/")
+    response = client.get(f"/api/async/product/{product.slug}/")
+
+    assert response.status_code == 200
+    assert response.json() == sync.json()
+    assert response["ETag"] == sync["ETag"]
+
+
+def test_async_product_detail_not_modified(db, client):
+    product = ProductFactory()
+    rebuild_product_documents([product.id])
+    url = f"/api/async/product/{product.slug}/"
+
+    etag = client.get(url)["ETag"]
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_async_category_list_matches_sync(db, client):
+    parent = CategoryFactory(parent=None)
+    CategoryFactory(parent=parent)
+
+    response = client.get("/api/async/categories/")
+
+    assert response.status_code == 200
+    assert response.json() == client.get("/api/categories/").json()
+
+
+def test_async_category_tree(db, client):
+    parent = CategoryFactory(parent=None)
+    CategoryFactory(parent=parent)
+
+    response = client.get("/api/async/categories/tree/")
+
+    assert response.json() == client.get("/api/categories/tree/").json()
+
+
+def test_async_category_products_match_sync(db, client):
+    catalog = create_catalog(depth=1, fanout=2, products_per_category=2)
+    root = catalog["categories"][0]
+    query = "?descendants=true&sort=name&page_size=3"
+
+    sync = client.get(f"/api/product/category/{root.slug}/{query}")
+    response = client.get(f"/api/async/product/category/{root.slug}/{query}")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["results"]) == 3
+    assert data["results"] == sync.json()["results"]
+    assert data["facets"] == sync.json()["facets"]
+
+
+def test_async_category_products_rejects_bad_price(db, client, category):
+    response = client.get(f"/api/async/product/category/{category.slug}/?min_price=x")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("method", ["post", "delete"])
+def test_async_views_are_read_only(db, client, method):
+    response = getattr(client, method)("/api/async/categories/")
+
+    assert response.status_code == 405
@@ -0,0 +1,39 @@
+from shop.benchmarks.runner import compare
+from shop.benchmarks.runner import percentile
+from shop.tests.factories import create_catalog
+
+BASELINE = {
+    "retrieve": {"p50_ms": 10.0, "p99_ms": 20.0, "queries": 1, "alloc_kb": 100.0},
+}
+
+
+def test_percentile():
+    assert percentile(list(range(1, 101)), 50) == 50
+    assert percentile(list(range(1, 101)), 99) == 99
+
+
+def test_compare_flags_query_growth():
+    results = {"retrieve": {**BASELINE["retrieve"], "queries": 2}}
+
+    assert compare(results, BASELINE) == ["retrieve: queries 1 -> 2"]
+
+
+def test_compare_allows_tolerance():
+    results = {"retrieve": {**BASELINE["retrieve"], "p50_ms": 12.0}}
+
+    assert compare(results, BASELINE, tolerance=0.25) == []
+
+
+def test_create_catalog(db):
+    catalog = create_catalog(
+        depth=1,
+        fanout=2,
+        products_per_category=2,
+        lines_per_product=2,
+    )
+
+    assert len(catalog["categories"]) == 3
+    assert len(catalog["products"]) == 6
+    line = catalog["products"][0].product_line.first()
+    assert line.images.count() == 2
+    assert line.attribute_value.count() == 3
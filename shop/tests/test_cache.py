@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+
+from shop.cache import cached
+from shop.cache import invalidate
+from shop.cache import make_key
+from shop.cache import refreshing
+from shop.conditional import make_etag
+
+
+@pytest.fixture(autouse=True)
+def _response_cache(settings):
+    settings.SHOP_RESPONSE_CACHE = True
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_cached_builds_once():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"name": "product_0"}
+
+    assert cached("product", ("product_0",), ["product:product_0"], build) == {
+        "name": "product_0",
+    }
+    cached("product", ("product_0",), ["product:product_0"], build)
+
+    assert len(calls) == 1
+
+
+def test_invalidate_only_affects_tagged_entries():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return len(calls)
+
+    cached("product", ("a",), ["product:a"], build)
+    cached("product", ("b",), ["product:b"], build)
+    invalidate("product:a")
+
+    assert cached("product", ("a",), ["product:a"], build) == 3
+    assert cached("product", ("b",), ["product:b"], build) == 2
+
+
+def test_refreshing_rebuilds_fresh_entries():
+    cached("product", ("a",), ["product:a"], lambda: "old")
+
+    with refreshing():
+        assert cached("product", ("a",), ["product:a"], lambda: "new") == "new"
+    assert cached("product", ("a",), ["product:a"], lambda: "newer") == "new"
+
+
+def test_stale_entry_served_while_rebuild_locked(settings):
+    settings.SHOP_CACHE_TIMEOUT = 0
+    cached("product", ("a",), ["product:a"], lambda: "old")
+    cache.add(f"{make_key('product', ('a',), ['product:a'])}:lock", 1)
+
+    assert cached("product", ("a",), ["product:a"], lambda: "new") == "old"
+
+
+def test_cache_outage_builds_without_waiting(settings, monkeypatch):
+    settings.SHOP_CACHE_LOCK_WAIT = 60
+    monkeypatch.setattr(cache, "get_many", lambda keys: {})
+    monkeypatch.setattr(cache, "get", lambda key: None)
+    monkeypatch.setattr(cache, "add", lambda *args, **kwargs: None)
+
+    assert cached("product", ("a",), ["product:a"], lambda: "fresh") == "fresh"
+    assert make_etag("product", ("a",), ["product:a"]) is None
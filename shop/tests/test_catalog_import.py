@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from shop.catalog_import import CatalogImporter
+from shop.catalog_import import CatalogImportError
+from shop.catalog_import import read_csv
+from shop.models import ProductLine
+
+CSV = """product_slug,product_name,category,sku,price,stock_qty,attributes,images
+shirt,Shirt,category_0,SKU-1,10.00,5,color:red|size:L,a.jpg|b.jpg
+shirt,Shirt,category_0,SKU-2,12.00,3,color:blue,
+mug,Mug,category_0,SKU-3,4.50,9,,
+shirt,Shirt,category_0,SKU-1,10.00,5,,
+"""
+
+
+def test_import_catalog_csv(db, category):
+    importer = CatalogImporter(batch_size=2, refresh=False)
+
+    stats = importer.run(read_csv(io.StringIO(CSV)))
+
+    assert stats == {"products": 2, "lines": 3, "skipped": 1, "batches": 2}
+    shirt_lines = ProductLine.objects.filter(product__slug="shirt").order_by("order")
+    assert [line.order for line in shirt_lines] == [1, 2]
+    first = shirt_lines[0]
+    assert first.product.category == category
+    assert first.images.count() == 2
+    assert sorted(first.attribute_value.values_list("value", flat=True)) == [
+        "L",
+        "red",
+    ]
+
+
+def _rows(prefix, size):
+    return [
+        {
+            "product": {"slug": f"{prefix}-{i}", "category": "category_0"},
+            "sku": f"{prefix}-SKU-{i}",
+            "price": "1.00",
+            "attributes": {"color": f"{prefix}-{i}"},
+            "images": [{"url": f"{prefix}-{i}.jpg"}],
+        }
+        for i in range(size)
+    ]
+
+
+def test_import_batch_queries_do_not_depend_on_size(db, category):
+    importer = CatalogImporter(batch_size=100, refresh=False)
+    importer.import_batch(_rows("warm", 1))
+
+    with CaptureQueriesContext(connection) as small:
+        importer.import_batch(_rows("small", 2))
+    with CaptureQueriesContext(connection) as large:
+        importer.import_batch(_rows("large", 20))
+
+    assert len(large) == len(small)
+    assert ProductLine.objects.count() == 23
+
+
+def test_import_reports_row_field_and_batches(db, category):
+    importer = CatalogImporter(batch_size=2, refresh=False)
+
+    with pytest.raises(CatalogImportError) as info:
+        importer.run(read_csv(io.StringIO(CSV.replace("4.50", "four"))))
+
+    assert (info.value.row, info.value.field, info.value.batches) == (3, "price", 1)
+    assert ProductLine.objects.count() == 2
+
+
+def test_import_command_reports_bad_price(db, category, tmp_path):
+    path = tmp_path / "catalog.csv"
+    path.write_text(CSV.replace("4.50", "four"))
+
+    with pytest.raises(CommandError, match="Row 3, price"):
+        call_command("import_catalog", str(path), "--no-refresh")
@@ -0,0 +1,23 @@
+from shop.category_tree import build_category_tree
+from shop.tests.factories import CategoryFactory
+
+
+def test_build_category_tree_nests_children(db, category, category_1):
+    CategoryFactory(parent=category_1, name="category_leaf")
+
+    tree = build_category_tree()
+
+    root = next(node for node in tree if node["slug"] == category.slug)
+    assert root["children"][0]["slug"] == category_1.slug
+    assert root["children"][0]["children"][0]["name"] == "category_leaf"
+
+
+class TestCategoryTreeEndpoint:
+    endpoint = "/api/categories/tree/"
+
+    def test_etag_not_modified(self, db, client, category):
+        response = client.get(self.endpoint)
+
+        assert response.status_code == 200
+        again = client.get(self.endpoint, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert again.status_code == 304
@@ -0,0 +1,66 @@
+from django.utils.http import http_date
+
+from shop.cache import CATEGORIES_TAG
+from shop.cache import invalidate
+from shop.documents import rebuild_product_documents
+from shop.tests.factories import CategoryFactory
+from shop.tests.factories import ProductFactory
+
+
+def test_product_etag_returns_not_modified(db, client):
+    product = ProductFactory()
+    rebuild_product_documents([product.id])
+    url = f"/api/product/{product.slug}/"
+
+    response = client.get(url)
+    etag = response["ETag"]
+    assert response.status_code == 200
+    assert "Last-Modified" in response
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_categories_last_modified_returns_not_modified(db, client):
+    CategoryFactory(parent=None)
+
+    response = client.get("/api/categories/")
+    last_modified = response["Last-Modified"]
+
+    response = client.get("/api/categories/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+def test_categories_etag_changes_on_invalidate(db, client):
+    CategoryFactory(parent=None)
+    etag = client.get("/api/categories/")["ETag"]
+
+    invalidate(CATEGORIES_TAG)
+
+    response = client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_category_listing_stale_if_modified_since(db, client):
+    category = CategoryFactory(parent=None)
+    product = ProductFactory(category=category)
+    rebuild_product_documents([product.id])
+    url = f"/api/product/category/{category.slug}/"
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+
+    assert response.status_code == 200
+    assert "ETag" in response
+
+
+def test_categories_last_modified_follows_invalidate(db, client):
+    CategoryFactory(parent=None)
+    last_modified = client.get("/api/categories/")["Last-Modified"]
+
+    invalidate(CATEGORIES_TAG)
+
+    response = client.get("/api/categories/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200
+    assert response["Last-Modified"] != last_modified
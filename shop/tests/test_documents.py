@@ -0,0 +1,90 @@
+from unittest import mock
+
+import pytest
+from django.db import transaction
+
+from shop.documents import get_product_documents
+from shop.documents import rebuild_price_ranges
+from shop.documents import rebuild_product_cards
+from shop.documents import rebuild_product_documents
+from shop.models import ProductCard
+from shop.models import ProductDocument
+from shop.tests.factories import ProductFactory
+from shop.tests.factories import ProductLineFactory
+
+
+@pytest.mark.django_db(transaction=True)
+def test_product_document_rebuilt_on_save(product):
+    product.description = "updated"
+    product.save()
+
+    document = ProductDocument.objects.get(product=product)
+    assert document.data["description"] == "updated"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_moved_line_rebuilds_both_products(product):
+    ProductLineFactory(product=product, price="10.00")
+    line = ProductLineFactory(product=product, price="5.00")
+    other = ProductFactory()
+
+    line.product = other
+    line.save()
+
+    product.refresh_from_db()
+    other.refresh_from_db()
+    assert product.min_price == 10
+    assert other.min_price == 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_saves_in_one_transaction_refresh_once(product):
+    with mock.patch("shop.signals.refresh_products") as refresh, transaction.atomic():
+        lines = ProductLineFactory.create_batch(3, product=product)
+        other = ProductFactory()
+        lines[0].product = other
+        lines[0].save()
+
+    refresh.assert_called_once_with({product.id, other.id})
+
+
+def test_get_product_documents_builds_missing(db, product):
+    ProductDocument.objects.all().delete()
+
+    documents = get_product_documents(product.slug)
+
+    assert [d["slug"] for d in documents] == [product.slug]
+    assert ProductDocument.objects.filter(product=product).exists()
+
+
+def test_rebuild_skips_unknown_products(db):
+    assert rebuild_product_documents([0]) == 0
+
+
+def test_rebuild_product_cards(db, product):
+    line = ProductLineFactory(product=product, stock_qty=0)
+
+    assert rebuild_product_cards([product.id, 0]) == 1
+
+    card = ProductCard.objects.get(product=product)
+    assert card.price == line.price
+    assert card.in_stock is False
+    assert card.image == []
+
+    line.stock_qty = 3
+    line.save()
+    rebuild_product_cards([product.id])
+
+    card.refresh_from_db()
+    assert card.in_stock is True
+
+
+def test_rebuild_price_ranges(db, product):
+    ProductLineFactory(product=product, price=5)
+    ProductLineFactory(product=product, price=9)
+    ProductLineFactory(product=product, price=1, active=False)
+
+    assert rebuild_price_ranges([product.id]) == 1
+
+    product.refresh_from_db()
+    assert (product.min_price, product.max_price) == (5, 9)
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from shop.facets import compute_facets
+from shop.facets import parse_filters
+from shop.facets import rebuild_facet_index
+from shop.models import AttributeValue
+from shop.models import FacetIndex
+from shop.models import Product
+from shop.models import ProductAttribute
+from shop.models import ProductAttributeValue
+from shop.tests.factories import ProductFactory
+
+
+def test_parse_filters():
+    assert parse_filters(["Color:Red", "color:blue", "size:L", "broken"]) == {
+        "color": {"red", "blue"},
+        "size": {"l"},
+    }
+
+
+def test_compute_facets(db, category):
+    color = ProductAttribute.objects.create(name="color")
+    red = AttributeValue.objects.create(value="red", product_attribute=color)
+    blue = AttributeValue.objects.create(value="blue", product_attribute=color)
+    red_product, blue_product = ProductFactory.create_batch(2, category=category)
+    ProductAttributeValue.objects.create(product=red_product, attribute_value=red)
+    ProductAttributeValue.objects.create(product=blue_product, attribute_value=blue)
+    rebuild_facet_index([category.id])
+
+    matching, facets = compute_facets(category.slug, parse_filters(["color:red"]))
+
+    assert list(Product.objects.filter(matching)) == [red_product]
+    assert facets["color"] == [
+        {"id": blue.id, "value": "blue", "count": 1},
+        {"id": red.id, "value": "red", "count": 1},
+    ]
+
+
+def test_compute_facets_without_filters(db, category):
+    matching, facets = compute_facets(category.slug, {})
+
+    assert matching is None
+    assert facets == {}
+
+
+def test_compute_facets_price_range(db, category):
+    color = ProductAttribute.objects.create(name="color")
+    red = AttributeValue.objects.create(value="red", product_attribute=color)
+    cheap, expensive = ProductFactory.create_batch(2, category=category)
+    for product, price in ((cheap, 5), (expensive, 50)):
+        ProductAttributeValue.objects.create(product=product, attribute_value=red)
+        Product.objects.filter(id=product.id).update(min_price=price, max_price=price)
+    rebuild_facet_index([category.id])
+
+    _, totals = compute_facets(category.slug, {})
+    _, ranged = compute_facets(category.slug, {}, min_price=Decimal(10))
+
+    assert totals["color"] == [{"id": red.id, "value": "red", "count": 2}]
+    assert ranged["color"] == [{"id": red.id, "value": "red", "count": 1}]
+
+
+def test_rebuild_facet_index_for_products(db, category):
+    color = ProductAttribute.objects.create(name="color")
+    red = AttributeValue.objects.create(value="red", product_attribute=color)
+    first, second = ProductFactory.create_batch(2, category=category)
+    ProductAttributeValue.objects.create(product=first, attribute_value=red)
+    rebuild_facet_index([category.id])
+    ProductAttributeValue.objects.create(product=second, attribute_value=red)
+    first.active = False
+    first.save()
+
+    rebuild_facet_index([category.id], [first.id, second.id])
+
+    assert FacetIndex.objects.get(attribute_value=red).product_ids == [second.id]
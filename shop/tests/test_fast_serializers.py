@@ -0,0 +1,63 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+from shop.api.fast_serializers import CARD_FIELDS
+from shop.api.fast_serializers import serialize_product_cards
+from shop.api.fast_serializers import serialize_products
+from shop.api.serializers import ProductCategorySerializer
+from shop.api.serializers import ProductSerializer
+from shop.documents import rebuild_product_cards
+from shop.models import Product
+from shop.tests.factories import create_catalog
+
+
+def as_json(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+def test_serialize_products_matches_serializer(db):
+    catalog = create_catalog(depth=0, fanout=0, products_per_category=2)
+    product = catalog["products"][0]
+
+    fast = serialize_products([product.id])[product.id]
+    slow = ProductSerializer(product).data
+    slow["product_line"].sort(key=lambda line: line["order"])
+    for line in slow["product_line"]:
+        line["images"].sort(key=lambda image: image["order"])
+
+    assert as_json(fast) == as_json(slow)
+
+
+def test_serialize_product_cards_matches_serializer(db):
+    create_catalog(
+        depth=0,
+        fanout=0,
+        products_per_category=3,
+        lines_per_product=1,
+        images_per_line=1,
+    )
+    products = Product.objects.order_by("id")
+
+    fast = serialize_product_cards(list(products.values(*CARD_FIELDS)))
+    slow = ProductCategorySerializer(products, many=True).data
+
+    assert as_json(fast) == as_json(slow)
+
+
+def test_serialize_product_cards_reads_stored_cards(db, django_assert_num_queries):
+    catalog = create_catalog(
+        depth=0,
+        fanout=0,
+        products_per_category=3,
+        lines_per_product=1,
+        images_per_line=1,
+    )
+    rebuild_product_cards(product.id for product in catalog["products"])
+    products = Product.objects.order_by("id")
+    rows = list(products.values(*CARD_FIELDS))
+
+    with django_assert_num_queries(0):
+        fast = serialize_product_cards(rows)
+
+    assert as_json(fast) == as_json(ProductCategorySerializer(products, many=True).data)
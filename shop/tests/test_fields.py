@@ -0,0 +1,64 @@
+import pytest
+from django.db import IntegrityError
+
+from shop.models import ProductLine
+
+
+def make_line(product, sku, **kwargs):
+    return ProductLine.objects.create(
+        product=product,
+        price="1.00",
+        sku=sku,
+        stock_qty=1,
+        **kwargs,
+    )
+
+
+def test_order_allocated_per_parent(db, product):
+    first = make_line(product, "SKU-1")
+    second = make_line(product, "SKU-2")
+
+    assert (first.order, second.order) == (1, 2)
+
+
+def test_bulk_allocation_is_consecutive(db, product):
+    make_line(product, "SKU-1")
+    field = ProductLine._meta.get_field("order")  # noqa: SLF001
+
+    assert field.allocate({product.id: 3}) == {product.id: 2}
+    assert make_line(product, "SKU-2").order == 5
+
+
+def test_duplicate_order_rejected_by_database(db, product):
+    make_line(product, "SKU-1", order=1)
+
+    with pytest.raises(IntegrityError):
+        make_line(product, "SKU-2", order=1)
+
+
+def test_explicit_order_advances_counter(db, product):
+    make_line(product, "SKU-1", order=3)
+
+    assert make_line(product, "SKU-2").order == 4
+    assert make_line(product, "SKU-3", order=2).order == 2
+    assert make_line(product, "SKU-4").order == 5
+
+
+def test_assign_prepares_bulk_create(db, product, django_assert_num_queries):
+    make_line(product, "SKU-1")
+    lines = [
+        ProductLine(product=product, price="1.00", sku=f"SKU-{n}", stock_qty=1)
+        for n in (2, 3)
+    ]
+    lines.append(
+        ProductLine(product=product, price="1.00", sku="SKU-4", stock_qty=1, order=9),
+    )
+    field = ProductLine._meta.get_field("order")  # noqa: SLF001
+
+    with django_assert_num_queries(2):
+        field.assign(lines)
+    with django_assert_num_queries(1):
+        ProductLine.objects.bulk_create(lines)
+
+    assert [line.order for line in lines] == [2, 3, 9]
+    assert make_line(product, "SKU-5").order == 10
@@ -0,0 +1,63 @@
+import io
+from unittest import mock
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from shop.api.serializers import ProductImageSerailizer
+from shop.images import build_image_variants
+from shop.images import build_images_variants
+from shop.tests.factories import ProductImageFactory
+
+
+@pytest.fixture()
+def image(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.SHOP_IMAGE_FORMATS = ["webp"]
+    settings.SHOP_IMAGE_WIDTHS = [320, 640, 1024]
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 400), "red").save(buffer, "PNG")
+    name = default_storage.save("products/original.png", ContentFile(buffer.getvalue()))
+    return ProductImageFactory(image_url=name)
+
+
+def test_build_image_variants(image):
+    variants = build_image_variants(image.id)
+
+    assert variants["source"] == image.image_url.name
+    assert set(variants["formats"]["webp"]) == {"320", "640"}
+    with default_storage.open(variants["formats"]["webp"]["320"]) as file:
+        assert Image.open(file).size == (320, 160)
+    image.refresh_from_db()
+    assert image.variants == variants
+
+
+def test_build_image_variants_is_idempotent(image):
+    first = build_image_variants(image.id)
+
+    assert build_image_variants(image.id) == first
+
+
+def test_images_of_a_product_refresh_it_once(image):
+    other = ProductImageFactory(
+        image_url=image.image_url.name,
+        product_line=image.product_line,
+    )
+
+    with mock.patch("shop.signals.refresh_documents") as refresh:
+        assert build_images_variants([image.id, other.id]) == 2
+
+    refresh.assert_called_once()
+    assert set(refresh.call_args.args[0]) == {image.product_line.product_id}
+
+
+def test_serializer_exposes_srcset(image):
+    build_image_variants(image.id)
+    image.refresh_from_db()
+
+    data = ProductImageSerailizer(image).data
+
+    assert "variants" not in data
+    assert data["srcset"]["webp"]["640"].endswith("-640w.webp")
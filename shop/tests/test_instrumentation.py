@@ -0,0 +1,38 @@
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from shop.instrumentation import QueryInstrumentationMiddleware
+from shop.instrumentation import track_queries
+from shop.models import Category
+
+
+def test_track_queries_counts_duplicates(db):
+    with track_queries() as stats:
+        list(Category.objects.all())
+        list(Category.objects.all())
+
+    assert stats.count == 2
+    assert stats.duplicates == 1
+    assert stats.duration > 0
+
+
+def test_middleware_disabled_by_default(settings):
+    settings.SHOP_QUERY_INSTRUMENTATION = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        QueryInstrumentationMiddleware(lambda request: HttpResponse())
+
+
+def test_middleware_sets_headers(db, rf, settings):
+    settings.SHOP_QUERY_INSTRUMENTATION = True
+    settings.SHOP_QUERY_INSTRUMENTATION_EXPORT = ["headers"]
+
+    def view(request):
+        list(Category.objects.all())
+        return HttpResponse()
+
+    response = QueryInstrumentationMiddleware(view)(rf.get("/api/categories/"))
+
+    assert response["X-DB-Query-Count"] == "1"
+    assert response["X-DB-Duplicate-Queries"] == "0"
@@ -0,0 +1,33 @@
+import json
+
+from shop.api.fast_serializers import serialize_products
+from shop.api.json_detail import product_detail_json
+from shop.tests.factories import ProductFactory
+from shop.tests.factories import create_catalog
+
+
+def test_product_detail_json_matches_fast_serializer(db):
+    catalog = create_catalog(depth=0, fanout=0, products_per_category=2)
+    product = catalog["products"][0]
+
+    payload = json.loads(product_detail_json(product.slug))
+
+    assert payload == [serialize_products([product.id])[product.id]]
+
+
+def test_product_detail_json_skips_inactive(db):
+    product = ProductFactory(active=False)
+
+    assert json.loads(product_detail_json(product.slug)) == []
+
+
+def test_retrieve_json_agg_mode(db, client, settings):
+    settings.SHOP_PRODUCT_DETAIL_MODE = "json_agg"
+    catalog = create_catalog(depth=0, fanout=0, products_per_category=1)
+    product = catalog["products"][0]
+
+    response = client.get(f"/api/product/{product.slug}/")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    assert response.json()[0]["slug"] == product.slug
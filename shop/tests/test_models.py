@@ -10,21 +10,6 @@ import pytest
 # Imports from your apps
 from shop.api.serializers import CategorySerializer
 
-class TestBrandModel:
-
-    def test_str_method(self, brand):
-        # Arrange
-        # Act
-        # Assert
-        assert brand.__str__() == "brand_0"
-    def test_str_method2(self, brand):
-        # Arrange
-        # Act
-        # Assert
-        assert brand.__str__() == "brand_0"
-
-
-
 def test_category_str(db: None, category: Category):
     c1 = category
     assert str(c1) == "category_0"
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from shop.api.pagination import _after
+from shop.documents import rebuild_price_ranges
+from shop.models import Product
+from shop.tests.factories import ProductFactory
+from shop.tests.factories import ProductLineFactory
+
+
+class TestCategoryProductPagination:
+    def endpoint(self, category):
+        return f"/api/product/category/{category.slug}/"
+
+    def test_pages_cover_every_product_once(self, db, client, category):
+        ProductFactory.create_batch(5, category=category)
+
+        seen = []
+        url = f"{self.endpoint(category)}?page_size=2"
+        while url:
+            body = client.get(url).json()
+            seen.extend(item["slug"] for item in body["results"])
+            url = body["next"]
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_previous_returns_to_first_page(self, db, client, category):
+        ProductFactory.create_batch(4, category=category)
+
+        first = client.get(f"{self.endpoint(category)}?page_size=2&ordering=name")
+        second = client.get(first.json()["next"])
+        back = client.get(second.json()["previous"])
+
+        assert back.json()["results"] == first.json()["results"]
+
+    def priced_products(self, category, prices):
+        products = ProductFactory.create_batch(len(prices), category=category)
+        for product, price in zip(products, prices, strict=True):
+            ProductLineFactory(product=product, price=Decimal(price))
+        ProductFactory(category=category)
+        rebuild_price_ranges(product.id for product in products)
+        return products
+
+    def test_sort_by_price_across_pages(self, db, client, category):
+        self.priced_products(category, ["30.00", "10.00", "20.00"])
+
+        prices = []
+        url = f"{self.endpoint(category)}?page_size=2&sort=-price"
+        while url:
+            body = client.get(url).json()
+            prices.extend(item["price"] for item in body["results"])
+            url = body["next"]
+
+        assert prices == ["30.00", "20.00", "10.00"]
+
+    def test_price_range_filter(self, db, client, category):
+        self.priced_products(category, ["30.00", "10.00", "20.00"])
+
+        body = client.get(
+            f"{self.endpoint(category)}?min_price=15&max_price=25&sort=price",
+        ).json()
+
+        assert [item["price"] for item in body["results"]] == ["20.00"]
+
+    def test_invalid_price(self, db, client, category):
+        response = client.get(f"{self.endpoint(category)}?min_price=cheap")
+
+        assert response.status_code == 400
+
+    def test_invalid_cursor(self, db, client, category):
+        response = client.get(f"{self.endpoint(category)}?cursor=nope")
+
+        assert response.status_code == 404
+
+
+def test_category_listing_with_descendants(db, client, category, category_1):
+    ProductFactory(category=category)
+    ProductFactory(category=category_1)
+
+    direct = client.get(f"/api/product/category/{category.slug}/").json()
+    subtree = client.get(
+        f"/api/product/category/{category.slug}/?descendants=true",
+    ).json()
+
+    assert len(direct["results"]) == 1
+    assert len(subtree["results"]) == 2
+
+
+def test_cursor_filter_is_a_row_comparison(db):
+    newest = Product.objects.filter(_after(("-created", "-id"), ["2024-01-01", 1]))
+    by_name = Product.objects.filter(_after(("name", "id"), ["a", 1]))
+
+    assert '"created", "shop_product"."id") < (' in str(newest.query)
+    assert '"name", "shop_product"."id") > (' in str(by_name.query)
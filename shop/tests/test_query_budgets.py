@@ -0,0 +1,71 @@
+import pytest
+
+from shop.api.pagination import CategoryPagination
+from shop.api.views import ProductViewSet
+from shop.documents import rebuild_product_documents
+from shop.instrumentation import QueryBudgetExceeded
+from shop.tests.factories import CategoryFactory
+from shop.tests.factories import create_catalog
+
+SIZES = [1, 10, 1000]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_retrieve_budget(db, client, size):
+    catalog = create_catalog(
+        depth=0,
+        fanout=0,
+        products_per_category=1,
+        lines_per_product=size,
+        images_per_line=1,
+    )
+    product = catalog["products"][0]
+    rebuild_product_documents([product.id])
+
+    response = client.get(f"/api/product/{product.slug}/")
+
+    assert response.status_code == 200
+    assert len(response.json()[0]["product_line"]) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_category_listing_budget(db, client, django_assert_max_num_queries, size):
+    catalog = create_catalog(
+        depth=0,
+        fanout=0,
+        products_per_category=size,
+        lines_per_product=1,
+        images_per_line=1,
+    )
+    root = catalog["categories"][0]
+
+    # Cards are built on commit, which never comes under ``db``: the page
+    # computes them, the worst case of the budget.
+    with django_assert_max_num_queries(
+        ProductViewSet.query_budgets["list_product_by_category_slug"],
+    ):
+        response = client.get(f"/api/product/category/{root.slug}/?descendants=true")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["results"]) == min(size, CategoryPagination.page_size)
+    assert all("price" in card and "in_stock" in card for card in data["results"])
+    assert "facets" in data
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_category_list_budget(db, client, size):
+    CategoryFactory.create_batch(size, parent=None)
+
+    assert client.get("/api/categories/").status_code == 200
+    assert client.get("/api/categories/tree/").status_code == 200
+
+
+def test_budget_exceeded_raises(db, client, settings, monkeypatch):
+    from shop.api.views import CategoryViewSet
+
+    monkeypatch.setattr(CategoryViewSet, "query_budgets", {"list": 0})
+    CategoryFactory(parent=None)
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/api/categories/")
@@ -0,0 +1,65 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from shop import routers
+from shop.models import Product
+
+
+@pytest.fixture()
+def replica(settings, monkeypatch):
+    settings.SHOP_READ_REPLICAS = ["replica_0"]
+    monkeypatch.setattr(routers, "_health", {})
+    return "replica_0"
+
+
+def test_reads_go_to_primary_outside_block():
+    assert routers.ReplicaRouter().db_for_read(Product) is None
+
+
+def test_read_from_replica_routes_shop_models(replica, monkeypatch):
+    monkeypatch.setattr(routers, "replica_lag", lambda alias: 0)
+    router = routers.ReplicaRouter()
+
+    with routers.read_from_replica() as alias:
+        assert alias == replica
+        assert router.db_for_read(Product) == replica
+        assert router.db_for_read(get_user_model()) is None
+        assert router.db_for_write(Product) == "default"
+
+
+def test_lagging_replica_is_skipped(replica, monkeypatch):
+    monkeypatch.setattr(routers, "replica_lag", lambda alias: 60)
+
+    assert routers.choose_replica() is None
+
+
+def test_unreachable_replica_is_skipped(replica, monkeypatch):
+    def unreachable(alias):
+        raise DatabaseError
+
+    monkeypatch.setattr(routers, "replica_lag", unreachable)
+
+    assert routers.choose_replica() is None
+
+
+def test_write_pins_client_to_primary(replica):
+    middleware = routers.PrimaryStickinessMiddleware(lambda r: HttpResponse(status=201))
+    factory = RequestFactory()
+
+    assert routers.STICKY_COOKIE in middleware(factory.post("/api/product/")).cookies
+    assert routers.STICKY_COOKIE not in middleware(factory.get("/api/product/")).cookies
+
+
+def test_sticky_client_reads_from_primary(db, client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(routers, "choose_replica", lambda: calls.append(1))
+
+    client.get("/api/categories/")
+    assert len(calls) == 1
+
+    client.cookies[routers.STICKY_COOKIE] = "1"
+    client.get("/api/categories/")
+    assert len(calls) == 1
@@ -0,0 +1,66 @@
+from shop.models import Product
+from shop.search import rebuild_search_vectors
+from shop.search import search_products
+from shop.tests.factories import AttributeValueFactory
+from shop.tests.factories import CategoryFactory
+from shop.tests.factories import ProductFactory
+from shop.tests.factories import ProductLineFactory
+
+
+def search(text):
+    return list(
+        search_products(Product.objects.all(), text)
+        .order_by("-rank", "-id")
+        .values_list("name", flat=True),
+    )
+
+
+def test_search_matches_every_source(db):
+    category = CategoryFactory(parent=None, name="Outdoor")
+    by_name = ProductFactory(name="Trail shoe", description="")
+    by_category = ProductFactory(category=category, description="")
+    by_description = ProductFactory(description="Waterproof membrane")
+    by_value = ProductFactory(description="")
+    ProductLineFactory(
+        product=by_value,
+        attribute_values=[AttributeValueFactory(value="Crimson")],
+    )
+    rebuild_search_vectors(
+        [p.id for p in (by_name, by_category, by_description, by_value)],
+    )
+
+    assert search("trail") == [by_name.name]
+    assert search("outdoor") == [by_category.name]
+    assert search("waterproof") == [by_description.name]
+    assert search("crimson") == [by_value.name]
+
+
+def test_search_ranks_name_before_description(db):
+    in_description = ProductFactory(name="Bag", description="A lantern holder")
+    in_name = ProductFactory(name="Lantern", description="")
+    rebuild_search_vectors([in_description.id, in_name.id])
+
+    assert search("lantern") == [in_name.name, in_description.name]
+
+
+def test_search_tolerates_typos(db):
+    product = ProductFactory(name="Headphones", description="")
+    rebuild_search_vectors([product.id])
+
+    assert search("headphnes") == [product.name]
+
+
+def test_search_endpoint_paginates(db, client):
+    products = ProductFactory.create_batch(3, name="Lantern", description="")
+    rebuild_search_vectors([p.id for p in products])
+
+    response = client.get("/api/product/search/?q=lantern&page_size=2")
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 2
+
+    response = client.get(response.json()["next"])
+    assert len(response.json()["results"]) == 1
+
+
+def test_search_endpoint_requires_query(db, client):
+    assert client.get("/api/product/search/?q=").status_code == 400
@@ -0,0 +1,38 @@
+from shop.sku import resolve_skus
+from shop.tests.factories import ProductFactory
+from shop.tests.factories import ProductLineFactory
+
+
+def test_resolve_skus_keeps_request_order(db):
+    first = ProductLineFactory(sku="A-1", stock_qty=3)
+    second = ProductLineFactory(sku="B-2", stock_qty=0)
+
+    results, missing = resolve_skus(["B-2", "nope", "A-1", "B-2"])
+
+    assert [line["sku"] for line in results] == ["B-2", "A-1"]
+    assert results[1] == {
+        "sku": "A-1",
+        "price": f"{first.price:.2f}",
+        "stock_qty": 3,
+        "product_slug": first.product.slug,
+    }
+    assert results[0]["product_slug"] == second.product.slug
+    assert missing == ["nope"]
+
+
+def test_resolve_skus_skips_inactive_products(db):
+    ProductLineFactory(sku="A-1", product=ProductFactory(active=False))
+
+    assert resolve_skus(["A-1"]) == ([], ["A-1"])
+
+
+def test_resolve_endpoint(db, client):
+    ProductLineFactory(sku="A-1")
+    url = "/api/product-lines/resolve/"
+
+    response = client.post(url, {"skus": ["A-1"]}, content_type="application/json")
+    assert response.status_code == 200
+    assert response.json()["results"][0]["sku"] == "A-1"
+
+    response = client.post(url, {"skus": []}, content_type="application/json")
+    assert response.status_code == 400
@@ -0,0 +1,97 @@
+from unittest import mock
+
+import pytest
+
+from shop.models import StockReservation
+from shop.stock import InsufficientStock
+from shop.stock import commit_reservation
+from shop.stock import decrement
+from shop.stock import release_expired_reservations
+from shop.stock import release_reservation
+from shop.stock import reserve
+from shop.tests.factories import ProductLineFactory
+
+
+def stock(line):
+    line.refresh_from_db(fields=["stock_qty"])
+    return line.stock_qty
+
+
+def test_decrement_is_conditional(db):
+    line = ProductLineFactory(stock_qty=3)
+
+    assert decrement(line.id, 2)
+    assert not decrement(line.id, 2)
+    assert stock(line) == 1
+
+
+def test_stock_writes_refresh_documents_on_commit(
+    db,
+    django_capture_on_commit_callbacks,
+):
+    first = ProductLineFactory(stock_qty=5)
+    second = ProductLineFactory(stock_qty=5)
+
+    with mock.patch("shop.tasks.refresh_stock_task.delay") as delay:
+        with django_capture_on_commit_callbacks(execute=True):
+            decrement(first.id, 1)
+            token = reserve({first.id: 1, second.id: 1})
+        with django_capture_on_commit_callbacks(execute=True):
+            release_reservation(token)
+
+    assert delay.call_args_list == [
+        mock.call(sorted([first.id, second.id])),
+        mock.call(sorted([first.id, second.id])),
+    ]
+
+
+def test_reserve_and_commit(db):
+    first = ProductLineFactory(stock_qty=5)
+    second = ProductLineFactory(stock_qty=1)
+
+    token = reserve({first.id: 2, second.id: 1})
+
+    assert stock(first) == 3
+    assert stock(second) == 0
+    assert commit_reservation(token) == 2
+    assert not StockReservation.objects.exists()
+    assert stock(first) == 3
+
+
+def test_reserve_is_all_or_nothing(db):
+    first = ProductLineFactory(stock_qty=5)
+    second = ProductLineFactory(stock_qty=1)
+
+    with pytest.raises(InsufficientStock) as error:
+        reserve({first.id: 2, second.id: 2})
+
+    assert error.value.line_ids == [second.id]
+    assert stock(first) == 5
+    assert not StockReservation.objects.exists()
+
+
+def test_release_reservation_restocks(db):
+    line = ProductLineFactory(stock_qty=4)
+    token = reserve({line.id: 3})
+
+    assert release_reservation(token) == 1
+    assert stock(line) == 4
+    assert commit_reservation(token) == 0
+
+
+def test_release_expired_reservations(db):
+    line = ProductLineFactory(stock_qty=4)
+    reserve({line.id: 1}, ttl=0)
+    reserve({line.id: 1}, ttl=60)
+
+    assert release_expired_reservations() == 1
+    assert stock(line) == 3
+
+
+def test_expired_reservation_cannot_be_committed(db):
+    line = ProductLineFactory(stock_qty=4)
+    token = reserve({line.id: 1}, ttl=0)
+
+    assert commit_reservation(token) == 0
+    assert release_expired_reservations() == 1
+    assert stock(line) == 4
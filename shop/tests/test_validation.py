@@ -0,0 +1,87 @@
+from unittest import mock
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.forms.models import inlineformset_factory
+
+from shop.admin import LineAttributeValueFormSet
+from shop.models import AttributeValue
+from shop.models import ProductAttribute
+from shop.models import ProductLine
+from shop.models import ProductLineAttributeValue
+from shop.validation import find_duplicate_attributes
+from shop.validation import validate_line_attribute_values
+
+
+@pytest.fixture()
+def line(db, product):
+    return ProductLine.objects.create(
+        product=product,
+        price="10.00",
+        sku="SKU-1",
+        stock_qty=1,
+    )
+
+
+@pytest.fixture()
+def colors(db):
+    color = ProductAttribute.objects.create(name="color")
+    return [
+        AttributeValue.objects.create(value=value, product_attribute=color)
+        for value in ("red", "blue")
+    ]
+
+
+def test_duplicates_within_the_set(line, colors):
+    red, blue = colors
+
+    duplicates = find_duplicate_attributes([(line.id, red.id), (line.id, blue.id)])
+
+    assert duplicates == {(line.id, red.product_attribute_id)}
+
+
+def test_duplicates_against_existing_rows(line, colors):
+    red, blue = colors
+    ProductLineAttributeValue.objects.create(product_line=line, attribute_value=red)
+
+    with pytest.raises(ValidationError):
+        validate_line_attribute_values([(line.id, blue.id)])
+
+
+def test_admin_formset_rejects_new_rows_of_one_attribute(line, colors):
+    red, blue = colors
+    FormSet = inlineformset_factory(  # noqa: N806
+        ProductLine,
+        ProductLineAttributeValue,
+        formset=LineAttributeValueFormSet,
+        fields=["attribute_value"],
+    )
+    prefix = FormSet.get_default_prefix()
+    data = {
+        f"{prefix}-TOTAL_FORMS": "2",
+        f"{prefix}-INITIAL_FORMS": "0",
+        f"{prefix}-0-attribute_value": red.id,
+        f"{prefix}-1-attribute_value": blue.id,
+    }
+
+    formset = FormSet(data, instance=line)
+
+    # The rows are checked once by the formset, not one by one by the model.
+    with mock.patch(
+        "shop.validation.find_duplicate_attributes",
+        wraps=find_duplicate_attributes,
+    ) as per_row:
+        assert not formset.is_valid()
+    assert not per_row.called
+    assert formset.non_form_errors() == ["Duplicate attribute exists"]
+
+
+def test_trigger_fills_product_attribute(line, colors):
+    red, _ = colors
+    row = ProductLineAttributeValue.objects.create(
+        product_line=line,
+        attribute_value=red,
+    )
+    row.refresh_from_db()
+
+    assert row.product_attribute_id == red.product_attribute_id
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from shop import warmup
+from shop.documents import rebuild_product_documents
+from shop.tests.factories import ProductFactory
+
+
+def test_product_views_record_access(db, client, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(warmup, "record_access", recorded.append)
+    product = ProductFactory()
+
+    client.get(f"/api/product/{product.slug}/")
+    client.get("/api/categories/")
+
+    assert recorded == [f"http://testserver/api/product/{product.slug}/"]
+
+
+def test_recorded_urls_are_canonical(db, client, monkeypatch, category):
+    recorded = []
+    monkeypatch.setattr(warmup, "record_access", recorded.append)
+
+    client.get(
+        f"/api/product/category/{category.slug}/"
+        "?utm_source=mail&sort=price&attr=size:L&attr=color:red",
+    )
+
+    assert recorded == [
+        f"http://testserver/api/product/category/{category.slug}/"
+        "?attr=color%3Ared&attr=size%3AL&sort=price",
+    ]
+
+
+def test_warm_page_fills_cache(db, client, settings, django_assert_num_queries):
+    settings.SHOP_RESPONSE_CACHE = True
+    product = ProductFactory()
+    rebuild_product_documents([product.id])
+    url = f"/api/product/{product.slug}/"
+
+    assert warmup.warm_page(f"http://testserver{url}")
+
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.json()[0]["slug"] == product.slug
+
+
+def test_warm_page_skips_unknown_paths(db):
+    assert not warmup.warm_page("http://testserver/nowhere/")
+
+
+def test_access_stats_are_buffered():
+    stats = warmup.AccessStats(
+        "redis://localhost:6379/0",
+        days=3,
+        timeout=0.1,
+        flush_interval=60,
+        buffer_size=2,
+    )
+    with mock.patch.object(stats, "record_many") as record_many:
+        stats.add("http://testserver/a/")
+        stats.add("http://testserver/a/")
+        assert not record_many.called
+
+        stats.add("http://testserver/b/")
+        stats.writer.shutdown(wait=True)
+
+    record_many.assert_called_once_with(
+        {"http://testserver/a/": 2, "http://testserver/b/": 1},
+    )
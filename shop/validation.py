@@ -0,0 +1,64 @@
+# Stdlib imports
+from collections import Counter
+
+# Core Django imports
+from django.core.exceptions import ValidationError
+
+# Imports from apps
+from shop.models import AttributeValue
+from shop.models import ProductLineAttributeValue
+
+
+def find_duplicate_attributes(pairs, exclude=()):
+    """
+    Find product lines that would end up with two values of one attribute.
+
+    Checks a whole set of ``(product_line_id, attribute_value_id)`` pairs
+    with two queries regardless of its size: one resolving the attributes of
+    the values, one fetching the existing rows on the same lines and
+    attributes. The ``shop_plav_line_attribute_uniq`` constraint enforces the
+    same rule in the database, this is for reporting errors up front.
+
+    Args:
+        pairs (Iterable[tuple[int, int]]): Rows about to be written.
+        exclude (Iterable[int]): Ids of existing rows being replaced.
+
+    Returns:
+        set: The offending ``(product_line_id, product_attribute_id)`` pairs.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return set()
+    attributes = dict(
+        AttributeValue.objects.filter(
+            id__in={value_id for _, value_id in pairs},
+        ).values_list("id", "product_attribute_id"),
+    )
+    wanted = Counter(
+        (line_id, attributes[value_id])
+        for line_id, value_id in set(pairs)
+        if value_id in attributes
+    )
+    duplicates = {key for key, count in wanted.items() if count > 1}
+    existing = (
+        ProductLineAttributeValue.objects.filter(
+            product_line_id__in={line_id for line_id, _ in wanted},
+            product_attribute_id__in={attribute_id for _, attribute_id in wanted},
+        )
+        .exclude(id__in=list(exclude))
+        .values_list("product_line_id", "product_attribute_id")
+    )
+    duplicates.update(key for key in existing if key in wanted)
+    return duplicates
+
+
+def validate_line_attribute_values(pairs, exclude=()):
+    """
+    Raise if ``pairs`` would give a product line two values of one attribute.
+
+    Raises:
+        ValidationError: If a duplicate attribute exists.
+    """
+    if find_duplicate_attributes(pairs, exclude=exclude):
+        msg = "Duplicate attribute exists"
+        raise ValidationError(msg)
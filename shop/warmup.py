@@ -0,0 +1,333 @@
+"""
+Response cache warm-up of the hottest catalog pages.
+
+The product detail and category listing actions record every URL they
+answer in per-day Redis sorted sets (``AccessStats``), enabled by
+``SHOP_ACCESS_STATS_REDIS_URL``. Requests only bump an in-process counter,
+written to Redis by a background thread every
+``SHOP_ACCESS_STATS_FLUSH_INTERVAL`` seconds or once
+``SHOP_ACCESS_STATS_BUFFER_SIZE`` URLs are pending, so recording never adds
+a Redis round trip to a request. ``warm_hot_pages`` takes the
+``SHOP_WARMUP_PAGES`` most requested URLs of the last
+``SHOP_ACCESS_STATS_DAYS`` days and renders them through their views, so
+the cache keys are exactly those of real traffic, in parallel batches and at
+most ``SHOP_WARMUP_RATE`` pages per second to spare Postgres.
+
+URLs are recorded in a canonical form, with only the query parameters that
+change the response (``access_stats_params``) sorted, so tracking or cache
+busting parameters neither split nor flood the statistics.
+
+Warm-up renders rebuild their cache entries even when still fresh
+(``shop.cache.refreshing``). Run it after a deploy or a cache flush
+(``warm_cache``) and periodically from beat (``warm_cache_task``, every 4
+minutes, registered by migration 0024): with ``SHOP_CACHE_TIMEOUT`` above
+that interval every hot entry is rebuilt before it goes stale.
+"""
+
+# Stdlib imports
+import atexit
+import datetime
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+# Core Django imports
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import Resolver404
+from django.urls import resolve
+from django.utils import timezone
+
+# Third-party app imports
+from redis import Redis
+from redis import RedisError
+
+# Imports from apps
+from shop.cache import refreshing
+from shop.category_tree import get_category_tree
+
+logger = logging.getLogger(__name__)
+
+
+class AccessStats:
+    """
+    Request counts per URL, one Redis sorted set per day.
+
+    Daily sets expire once they leave the window, so the hot set follows
+    the traffic without any cleanup job. ``add`` buffers counts in memory
+    and hands them to a single background thread, ``record_many`` writes
+    them.
+
+    Args:
+        url (str): The Redis URL.
+        days (int): Number of days the hot set is computed over.
+        timeout (float): Socket timeout in seconds, keeps a stalled Redis
+            from holding up the background writes.
+        flush_interval (float): Seconds between two writes of the buffer.
+        buffer_size (int): Number of pending URLs forcing a write.
+    """
+
+    key_prefix = "shop:hits"
+
+    def __init__(  # noqa: PLR0913
+        self,
+        url,
+        days,
+        timeout,
+        flush_interval=5.0,
+        buffer_size=1000,
+    ):
+        self.client = Redis.from_url(
+            url,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+        self.days = days
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.pending = Counter()
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix="shop-access-stats")
+
+    def key(self, day):
+        return f"{self.key_prefix}:{day:%Y%m%d}"
+
+    def record(self, url):
+        """
+        Count one request of ``url``, in a single round trip.
+        """
+        self.record_many({url: 1})
+
+    def record_many(self, counts):
+        """
+        Add ``counts`` (URL to number of requests) to today's set, in a
+        single round trip.
+        """
+        key = self.key(timezone.now().date())
+        pipeline = self.client.pipeline(transaction=False)
+        for url, count in counts.items():
+            pipeline.zincrby(key, count, url)
+        pipeline.expire(key, (self.days + 1) * 86400)
+        pipeline.execute()
+
+    def add(self, url):
+        """
+        Buffer one request of ``url``, writing the buffer in the background
+        when it is due.
+        """
+        with self.lock:
+            self.pending[url] += 1
+            now = time.monotonic()
+            if (
+                len(self.pending) < self.buffer_size
+                and now - self.flushed_at < self.flush_interval
+            ):
+                return
+            counts, self.pending, self.flushed_at = self.pending, Counter(), now
+        self.writer.submit(self.write, counts)
+
+    def flush(self):
+        """
+        Write the buffered counts now, in the calling thread.
+        """
+        with self.lock:
+            counts, self.pending = self.pending, Counter()
+            self.flushed_at = time.monotonic()
+        if counts:
+            self.write(counts)
+
+    def write(self, counts):
+        """
+        ``record_many`` that logs Redis failures: statistics are best
+        effort.
+        """
+        try:
+            self.record_many(counts)
+        except RedisError:
+            logger.warning(
+                "Could not record %d accessed URLs",
+                len(counts),
+                exc_info=True,
+            )
+
+    def top(self, limit):
+        """
+        Returns the ``limit`` most requested URLs of the window, hottest
+        first.
+        """
+        today = timezone.now().date()
+        keys = [self.key(today - datetime.timedelta(days=n)) for n in range(self.days)]
+        rows = self.client.zunion(keys, withscores=True)
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return [url.decode() for url, _ in rows[:limit]]
+
+
+@cache
+def _access_stats(url, days, timeout, flush_interval, buffer_size):
+    stats = AccessStats(url, days, timeout, flush_interval, buffer_size)
+    atexit.register(stats.flush)
+    return stats
+
+
+def get_access_stats():
+    """
+    Returns the ``AccessStats`` of ``SHOP_ACCESS_STATS_REDIS_URL``, or None
+    when access statistics are disabled.
+    """
+    url = getattr(settings, "SHOP_ACCESS_STATS_REDIS_URL", "")
+    if not url:
+        return None
+    return _access_stats(
+        url,
+        settings.SHOP_ACCESS_STATS_DAYS,
+        settings.SHOP_ACCESS_STATS_TIMEOUT,
+        settings.SHOP_ACCESS_STATS_FLUSH_INTERVAL,
+        settings.SHOP_ACCESS_STATS_BUFFER_SIZE,
+    )
+
+
+def record_access(url):
+    """
+    Count one request of ``url``. The count is buffered and written in the
+    background, a Redis failure is logged and never reaches the request.
+    """
+    stats = get_access_stats()
+    if stats is not None:
+        stats.add(url)
+
+
+class AccessStatsMixin:
+    """
+    Record the URLs answered by the ``access_stats_actions`` of a viewset.
+
+    Successful and not modified responses count, requests made by the
+    warm-up itself do not. Query parameters other than
+    ``access_stats_params`` are dropped from the recorded URL.
+    """
+
+    access_stats_actions = ()
+    access_stats_params = ()
+
+    def access_stats_url(self, request):
+        """
+        Returns the canonical URL of ``request``: its known parameters only,
+        sorted.
+        """
+        url = request.build_absolute_uri(request.path)
+        params = sorted(
+            (name, value)
+            for name in self.access_stats_params
+            for value in request.GET.getlist(name)
+        )
+        return f"{url}?{urlencode(params)}" if params else url
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        action = getattr(self, "action_map", {}).get(request.method.lower())
+        if (
+            action in self.access_stats_actions
+            and response.status_code in (200, 304)
+            and not getattr(request, "shop_warmup", False)
+        ):
+            record_access(self.access_stats_url(request))
+        return response
+
+
+def warm_page(url):
+    """
+    Render ``url`` through its view, rebuilding its response cache entries
+    even when they are still fresh.
+
+    Args:
+        url (str): Absolute URL, as recorded by ``AccessStats``.
+
+    Returns:
+        bool: Whether the view answered with a 200.
+    """
+    parts = urlsplit(url)
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return False
+    request = RequestFactory().get(
+        f"{parts.path}?{parts.query}",
+        secure=parts.scheme == "https",
+        HTTP_HOST=parts.netloc,
+    )
+    request.shop_warmup = True
+    try:
+        with refreshing():
+            response = match.func(request, *match.args, **match.kwargs)
+    except Exception:  # noqa: BLE001
+        logger.warning("Warm-up of %s failed", url, exc_info=True)
+        return False
+    return response.status_code == 200  # noqa: PLR2004
+
+
+def _warm_chunk(urls):
+    try:
+        return sum(warm_page(url) for url in urls)
+    finally:
+        # Worker threads have connections of their own.
+        connections.close_all()
+
+
+def warm_pages(urls, batch_size=None, workers=None, rate=None):
+    """
+    Warm ``urls`` in parallel batches, rate limited.
+
+    Every batch is split across ``workers`` threads and the next batch waits
+    until the rate allows it.
+
+    Args:
+        urls (list[str]): Absolute URLs to render.
+        batch_size (int, optional): Pages per batch, defaults to
+            ``SHOP_WARMUP_BATCH_SIZE``.
+        workers (int, optional): Threads per batch, defaults to
+            ``SHOP_WARMUP_WORKERS``.
+        rate (float, optional): Maximum pages per second, defaults to
+            ``SHOP_WARMUP_RATE``. 0 disables the limit.
+
+    Returns:
+        int: The number of pages rendered successfully.
+    """
+    batch_size = batch_size or settings.SHOP_WARMUP_BATCH_SIZE
+    workers = workers or settings.SHOP_WARMUP_WORKERS
+    rate = settings.SHOP_WARMUP_RATE if rate is None else rate
+    warmed = 0
+    with ThreadPoolExecutor(workers) as pool:
+        for start in range(0, len(urls), batch_size):
+            began = time.monotonic()
+            batch = urls[start : start + batch_size]
+            chunks = [batch[n::workers] for n in range(workers)]
+            warmed += sum(pool.map(_warm_chunk, [c for c in chunks if c]))
+            if rate:
+                time.sleep(max(0, len(batch) / rate - (time.monotonic() - began)))
+    return warmed
+
+
+def warm_hot_pages(limit=None, **options):
+    """
+    Warm the category tree and the hottest recorded pages.
+
+    Args:
+        limit (int, optional): Number of pages, defaults to
+            ``SHOP_WARMUP_PAGES``.
+        **options: Passed to ``warm_pages``.
+
+    Returns:
+        int: The number of pages rendered successfully.
+    """
+    get_category_tree()
+    stats = get_access_stats()
+    if stats is None:
+        return 0
+    urls = stats.top(limit or settings.SHOP_WARMUP_PAGES)
+    return warm_pages(urls, **options)